@@ -1,35 +1,47 @@
 """
 Background task API endpoints
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query, Path, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 import uuid
 import asyncio
+import functools
 from datetime import datetime
 
 from app.models.task_models import (
-    BackgroundTaskResponse, BackgroundTaskStatus
+    BackgroundJobType, BackgroundState, BackgroundTaskResponse, BackgroundTaskStatus, FINISHED_STATUSES
 )
-from app.database.database import get_database
+from app.api.dependencies import get_job_engine, get_process_pool, get_store
+from app.database.base import AsyncTaskStore
+from app.database.events import Subscription
+from app.services.jobs import JobEngine, JobQueueFull
+from app.services.processes import ProcessPool, burn_cpu
+from app.utils.responses import FastJSONResponse, ModelJSONResponse, dump_json
 
 # Create router
-router = APIRouter(prefix="/background-tasks", tags=["background-tasks"])
+router = APIRouter(prefix="/background-tasks", tags=["background-tasks"], default_response_class=FastJSONResponse)
 
-# Get database instance
-db = get_database()
+# Idle event streams send a comment this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
 
 
-async def simulate_long_running_task(task_id: str, duration: int = 10):
-    """Simulate a long-running background task"""
+async def simulate_long_running_task(db: AsyncTaskStore, task_id: str, duration: int = 10):
+    """Simulate a long-running background task whose entry was created as queued"""
+    progress = 0
     try:
-        # Create background task entry
-        db.create_background_task(task_id, f"Starting long-running task (duration: {duration}s)")
+        await db.update_background_task(
+            task_id,
+            "running",
+            progress,
+            f"Starting long-running task (duration: {duration}s)"
+        )
 
         # Simulate work with progress updates
         for i in range(duration):
             await asyncio.sleep(1)
             progress = int((i + 1) / duration * 100)
-            db.update_background_task(
+            await db.update_background_task(
                 task_id,
                 "running",
                 progress,
@@ -43,7 +55,7 @@ async def simulate_long_running_task(task_id: str, duration: int = 10):
             "completion_time": datetime.now().isoformat()
         }
 
-        db.update_background_task(
+        await db.update_background_task(
             task_id,
             "completed",
             100,
@@ -51,9 +63,13 @@ async def simulate_long_running_task(task_id: str, duration: int = 10):
             result
         )
 
+    except asyncio.CancelledError:
+        # The job engine is shutting down; record it before stopping
+        await db.update_background_task(task_id, "failed", progress, "Task cancelled by shutdown")
+        raise
     except Exception as e:
         # Handle errors
-        db.update_background_task(
+        await db.update_background_task(
             task_id,
             "failed",
             0,
@@ -61,29 +77,99 @@ async def simulate_long_running_task(task_id: str, duration: int = 10):
         )
 
 
+async def run_cpu_task(db: AsyncTaskStore, processes: ProcessPool, task_id: str, duration: int = 10):
+    """Run a CPU-bound task in a pool process, recording its progress"""
+    progress = 0
+
+    async def on_progress(step_progress: int, message: str):
+        nonlocal progress
+        progress = step_progress
+        await db.update_background_task(task_id, "running", progress, message)
+
+    try:
+        await db.update_background_task(
+            task_id,
+            "running",
+            progress,
+            f"Starting CPU-bound task (duration: {duration}s)"
+        )
+        result = await processes.run(burn_cpu, task_id, duration, on_progress=on_progress)
+        await db.update_background_task(
+            task_id,
+            "completed",
+            100,
+            "Task completed successfully",
+            result
+        )
+    except asyncio.CancelledError:
+        await db.update_background_task(task_id, "failed", progress, "Task cancelled by shutdown")
+        raise
+    except Exception as e:
+        await db.update_background_task(
+            task_id,
+            "failed",
+            progress,
+            f"Task failed: {str(e)}"
+        )
+
+
+def queue_full(error: JobQueueFull) -> HTTPException:
+    """503 telling the client when to try again"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
 @router.post("", response_model=BackgroundTaskResponse)
 async def start_background_task(
-    background_tasks: BackgroundTasks,
-    duration: int = Query(10, ge=1, le=60, description="Task duration in seconds")
+    duration: int = Query(10, ge=1, le=60, description="Task duration in seconds"),
+    job_type: BackgroundJobType = Query(BackgroundJobType.SLEEP,
+                                        description="sleep: wait on the event loop; cpu: compute in a pool process"),
+    db: AsyncTaskStore = Depends(get_store),
+    jobs: JobEngine = Depends(get_job_engine),
+    processes: ProcessPool = Depends(get_process_pool)
 ):
     """
     Start a long-running background task.
 
     - **duration**: Task duration in seconds (1-60 seconds)
+    - **job_type**: `sleep` (default) or `cpu`; CPU jobs run in a process pool
+      of `job_processes` processes so they never block the event loop
 
-    This endpoint demonstrates background task processing with progress tracking.
+    The task waits in a bounded queue until one of the job workers is free.
+    When the queue is full the request fails with 503 and a Retry-After
+    header instead of starting more work.
     """
+    try:
+        jobs.ensure_capacity()
+    except JobQueueFull as e:
+        raise queue_full(e)
     try:
         task_id = str(uuid.uuid4())
-
-        # Add the background task
-        background_tasks.add_task(simulate_long_running_task, task_id, duration)
+        await db.create_background_task(task_id, f"Queued {job_type.value} task (duration: {duration}s)",
+                                        status="queued")
+        if job_type == BackgroundJobType.CPU:
+            job = functools.partial(run_cpu_task, db, processes, task_id, duration)
+        else:
+            job = functools.partial(simulate_long_running_task, db, task_id, duration)
+        dropped = functools.partial(db.update_background_task, task_id, "failed", 0,
+                                    "Task cancelled by shutdown before it started")
+        try:
+            jobs.submit(job, on_dropped=dropped)
+        except JobQueueFull as e:
+            # Others filled the queue while the entry was being written
+            await db.update_background_task(task_id, "failed", 0, "Rejected: job queue is full")
+            raise queue_full(e)
 
         return BackgroundTaskResponse(
             task_id=task_id,
             status="started",
             message=f"Background task started with duration {duration}s"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -93,14 +179,15 @@ async def start_background_task(
 
 @router.get("/{task_id}", response_model=BackgroundTaskStatus)
 async def get_background_task_status(
-    task_id: str = Path(..., description="Background task ID")
+    task_id: str = Path(..., description="Background task ID"),
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Get the status of a background task.
 
     - **task_id**: The ID of the background task
     """
-    bg_task = db.get_background_task(task_id)
+    bg_task = await db.get_background_task(task_id)
     if not bg_task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -109,9 +196,88 @@ async def get_background_task_status(
     return bg_task
 
 
+def sse_event(bg_task: BackgroundTaskStatus) -> bytes:
+    """One Server-Sent Events message carrying a background task status"""
+    return b"event: status\ndata: " + dump_json(bg_task) + b"\n\n"
+
+
+@router.get("/{task_id}/events", response_class=StreamingResponse)
+async def stream_background_task(
+    task_id: str = Path(..., description="Background task ID"),
+    db: AsyncTaskStore = Depends(get_store)
+):
+    """
+    Stream the status of a background task as Server-Sent Events.
+
+    - **task_id**: The ID of the background task
+
+    Sends the current status, then a `status` event each time the task
+    changes, and ends once it has completed or failed (or was evicted).
+    One connection replaces polling GET /background-tasks/{task_id} for
+    the whole job. Changes made by other workers are picked up every
+    SSE_KEEPALIVE_SECONDS.
+    """
+    if not await db.get_background_task(task_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Background task with ID {task_id} not found"
+        )
+
+    async def events():
+        # Subscribe only once the body is being sent: a body that never
+        # starts (the client left first) then holds no subscription. Read
+        # after subscribing so no change falls between the two.
+        with Subscription(db.changes, lambda change: change.key == task_id,
+                          kinds=("background_task",)) as subscription:
+            current = await db.get_background_task(task_id)
+            if current is None:
+                return  # evicted since the check above
+            sent = sse_event(current)
+            yield sent
+            while current.status not in FINISHED_STATUSES:
+                try:
+                    changes = await asyncio.wait_for(subscription.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # The change feed only carries this process's writes; with
+                    # several workers sharing SQLite another one may be running
+                    # the job, so check the store before idling on and send
+                    # the status only if it differs from what was sent.
+                    current = await db.get_background_task(task_id)
+                    if current is None:
+                        return
+                    event = sse_event(current)
+                    if event != sent:
+                        sent = event
+                        yield sent
+                    else:
+                        yield b": keep-alive\n\n"
+                    continue
+                for change in changes:
+                    current = change.data
+                    sent = sse_event(current)
+                    yield sent
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @router.get("", response_model=List[BackgroundTaskStatus])
-async def get_all_background_tasks():
+async def get_all_background_tasks(
+    status: Optional[BackgroundState] = Query(None, description="Only tasks in this state"),
+    page: int = Query(1, ge=1, description="Page number"),
+    page_size: int = Query(50, ge=1, le=100, description="Items per page"),
+    db: AsyncTaskStore = Depends(get_store)
+):
     """
-    Get all background tasks and their statuses.
+    Get background tasks and their statuses, oldest first.
+
+    - **status**: Only tasks that are queued, running, completed or failed
+    - **page**: Page number (starts from 1)
+    - **page_size**: Number of items per page (max 100)
+
+    The X-Total-Count header holds the number of matching tasks. Finished
+    tasks are kept for `background_task_max_age_seconds` and at most
+    `background_task_max_finished` of them, least recently used dropped first.
     """
-    return list(db.background_tasks.values())
\ No newline at end of file
+    bg_tasks, total = await db.get_background_tasks(status.value if status else None, page, page_size)
+    return ModelJSONResponse(bg_tasks, headers={"X-Total-Count": str(total)})
@@ -0,0 +1,94 @@
+"""
+WebSocket change stream for tasks and background tasks
+"""
+import asyncio
+import json
+from typing import List
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+
+from app.api.dependencies import get_store
+from app.core.config import settings
+from app.database.base import AsyncTaskStore
+from app.database.events import Change, SlowConsumer, Subscription
+from app.models.task_models import ChangeSubscription
+from app.utils.responses import dump_json
+
+# Create router
+router = APIRouter(tags=["changes"])
+
+
+def matches(subscription: ChangeSubscription, change: Change) -> bool:
+    if change.kind == "background_task":
+        return change.key in subscription.jobs
+    return any(task_filter.matches(change.data) for task_filter in subscription.tasks)
+
+
+def changes_message(changes: List[Change]) -> str:
+    """One text frame carrying a batch of changes, oldest first"""
+    items = [b'{"kind":"%s","key":%s,"action":"%s","data":%s}'
+             % (change.kind.encode(), json.dumps(change.key).encode(), change.action.encode(),
+                dump_json(change.data))
+             for change in changes]
+    return (b'{"type":"changes","changes":[' + b",".join(items) + b"]}").decode()
+
+
+@router.websocket("/ws/changes")
+async def watch_changes(websocket: WebSocket, db: AsyncTaskStore = Depends(get_store)):
+    """
+    Stream task and background task changes over one connection.
+
+    The client sends a JSON subscription such as
+    `{"jobs": ["<background task id>"], "tasks": [{"status": "active", "tags": ["urgent"]}]}`;
+    each one replaces the previous and is acknowledged with
+    `{"type": "subscribed", ...}`. Matching changes arrive as
+    `{"type": "changes", "changes": [{"kind", "key", "action", "data"}, ...]}`,
+    with everything that accumulated since the last frame batched together.
+    A task change is matched on the task's new state (its last state for a
+    deletion). A client that lets more than `websocket_send_buffer` changes
+    pile up while earlier frames are still being sent is disconnected with
+    close code 1013; one mutation reaching more tasks than that is fine.
+    A binary frame closes the connection with code 1003.
+    """
+    await websocket.accept()
+    current = ChangeSubscription()
+
+    async def receive_subscriptions():
+        nonlocal current
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", status.WS_1000_NORMAL_CLOSURE),
+                                          message.get("reason"))
+            if message.get("text") is None:
+                # receive_text() would fail with a server error on a binary frame
+                await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA,
+                                      reason="Subscriptions must be sent as text frames")
+                return
+            try:
+                current = ChangeSubscription.model_validate_json(message["text"])
+            except ValidationError as e:
+                await websocket.send_json({"type": "error", "detail": e.errors(include_url=False)})
+                continue
+            await websocket.send_text('{"type":"subscribed","subscription":'
+                                      + dump_json(current).decode() + "}")
+
+    async def send_changes(subscription: Subscription):
+        while True:
+            await websocket.send_text(changes_message(await subscription.get()))
+
+    with Subscription(db.changes, lambda change: matches(current, change),
+                      limit=settings.websocket_send_buffer) as subscription:
+        receiver = asyncio.create_task(receive_subscriptions())
+        sender = asyncio.create_task(send_changes(subscription))
+        try:
+            done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+            error = next(iter(done)).exception()
+            if isinstance(error, SlowConsumer):
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Slow consumer")
+            elif error is not None and not isinstance(error, WebSocketDisconnect):
+                raise error
+        finally:
+            receiver.cancel()
+            sender.cancel()
@@ -0,0 +1,63 @@
+"""
+Shared FastAPI dependencies
+"""
+from typing import Optional
+
+from app.core.config import settings
+from app.database.async_store import AsyncStore
+from app.database.base import AsyncTaskStore
+from app.database.database import get_database
+from app.services.jobs import JobEngine
+from app.services.processes import ProcessPool
+
+_store: Optional[AsyncStore] = None
+_jobs: Optional[JobEngine] = None
+_processes: Optional[ProcessPool] = None
+
+
+async def get_store() -> AsyncTaskStore:
+    """Storage backend for the current request
+
+    Declared async so FastAPI resolves it inline rather than in the
+    threadpool. Override it in app.dependency_overrides to swap backends.
+    """
+    global _store
+    if _store is None:
+        _store = AsyncStore.with_threads(get_database(), settings.store_threads)
+    return _store
+
+
+async def shutdown_store():
+    """Finish queued store calls and stop the store's thread pool"""
+    global _store
+    if _store is not None:
+        store, _store = _store, None
+        await store.shutdown()
+
+
+async def get_job_engine() -> JobEngine:
+    """Job engine running background tasks for this process"""
+    global _jobs
+    if _jobs is None:
+        _jobs = JobEngine(settings.job_workers, settings.job_queue_size)
+    return _jobs
+
+
+async def shutdown_job_engine():
+    """Cancel running background jobs and stop the job workers"""
+    if _jobs is not None:
+        await _jobs.shutdown()
+
+
+async def get_process_pool() -> ProcessPool:
+    """Process pool running CPU-bound background jobs"""
+    global _processes
+    if _processes is None:
+        _processes = ProcessPool(settings.job_processes)
+    return _processes
+
+
+def shutdown_process_pool():
+    """Stop the CPU job processes once their current job is done"""
+    if _processes is not None:
+        _processes.shutdown()
@@ -1,16 +1,16 @@
 """
 System API endpoints (health, statistics, root)
 """
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from datetime import datetime
 
-from app.database.database import get_database
+from app.api.dependencies import get_job_engine, get_store
+from app.database.base import AsyncTaskStore
+from app.services.jobs import JobEngine
+from app.utils.responses import FastJSONResponse
 
 # Create router
-router = APIRouter(tags=["system"])
-
-# Get database instance
-db = get_database()
+router = APIRouter(tags=["system"], default_response_class=FastJSONResponse)
 
 
 @router.get("/", response_model=dict)
@@ -26,7 +26,10 @@ async def root():
             "task_by_id": "/tasks/{task_id}",
             "tasks_by_status": "/tasks/status/{status}",
             "background_tasks": "/background-tasks",
-            "statistics": "/statistics"
+            "changes": "/ws/changes",
+            "statistics": "/statistics",
+            "lock_statistics": "/statistics/locks",
+            "job_statistics": "/statistics/jobs"
         }
     }
 
@@ -42,18 +45,48 @@ async def health_check():
 
 
 @router.get("/statistics", response_model=dict)
-async def get_task_statistics():
+async def get_task_statistics(
+    verify: bool = Query(False, description="Recount all tasks and compare with the maintained counters"),
+    db: AsyncTaskStore = Depends(get_store)
+):
     """
-    Get task statistics including counts by status.
+    Get task statistics including counts by status, priority and tag.
+
+    - **verify**: Also run a full recount and report any counter mismatches (slow on large tables)
     """
     try:
-        stats = db.get_task_statistics()
-        return {
+        stats = await db.get_task_statistics()
+        response = {
             "statistics": stats,
             "timestamp": datetime.now().isoformat()
         }
+        if verify:
+            response["consistency"] = await db.check_task_statistics()
+        return response
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving statistics: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/statistics/locks", response_model=dict)
+async def get_lock_statistics(db: AsyncTaskStore = Depends(get_store)):
+    """
+    Get database lock acquisition counts and wait times, per lock and mode.
+    """
+    return {
+        "locks": await db.get_lock_statistics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/statistics/jobs", response_model=dict)
+async def get_job_statistics(jobs: JobEngine = Depends(get_job_engine)):
+    """
+    Get background job queue depth, worker utilisation and job counts.
+    """
+    return {
+        "jobs": jobs.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
@@ -1,20 +1,29 @@
 """
 Task-related API endpoints
 """
-from fastapi import APIRouter, HTTPException, Query, Path, status
-from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Path, status
+# Routes filtering on a `status` query parameter shadow the module
+from fastapi import status as http_status
+from collections import defaultdict
+from typing import Any, List, Optional
+from pydantic import TypeAdapter, ValidationError
 
 from app.models.task_models import (
     TaskCreate, TaskUpdate, TaskResponse, TasksResponse,
-    TaskStatus, TaskPriority, SuccessResponse
+    TaskStatus, TaskPriority, TagMode, SuccessResponse,
+    BulkCreateResponse, BulkItemError, BulkOperationResponse
 )
-from app.database.database import get_database
+from app.core.config import settings
+from app.api.dependencies import get_store
+from app.database.base import AsyncTaskStore
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.responses import FastJSONResponse, ModelJSONResponse
 
 # Create router
-router = APIRouter(prefix="/tasks", tags=["tasks"])
+router = APIRouter(prefix="/tasks", tags=["tasks"], default_response_class=FastJSONResponse)
 
-# Get database instance
-db = get_database()
+# Validates a whole bulk payload in one pass
+task_create_list = TypeAdapter(List[TaskCreate])
 
 
 @router.get("", response_model=TasksResponse)
@@ -22,8 +31,11 @@ async def get_tasks(
     status: Optional[TaskStatus] = Query(None, description="Filter by task status"),
     priority: Optional[TaskPriority] = Query(None, description="Filter by task priority"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
+    tag_mode: TagMode = Query(TagMode.ANY, description="Match tasks with any or all of the tags"),
     page: int = Query(1, ge=1, description="Page number"),
-    page_size: int = Query(10, ge=1, le=100, description="Items per page")
+    page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor returned as next_cursor by a previous page"),
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Get all tasks with optional filtering and pagination.
@@ -31,34 +43,67 @@ async def get_tasks(
     - **status**: Filter by task status (active, completed, archived)
     - **priority**: Filter by task priority (low, medium, high)
     - **tags**: Filter by tags (can specify multiple)
+    - **tag_mode**: `any` (default) matches tasks with at least one of the tags, `all` tasks with every one
     - **page**: Page number (starts from 1)
     - **page_size**: Number of items per page (max 100)
+    - **cursor**: Continue after a previous page (keyset pagination, ignores page)
     """
+    cursor_key = None
+    if cursor is not None:
+        try:
+            cursor_key = decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
     try:
-        tasks, total = db.get_tasks(
-            status=status,
-            priority=priority,
-            tags=tags,
-            page=page,
-            page_size=page_size
-        )
+        if cursor_key is not None:
+            # Fetch one extra task to learn whether another page follows
+            tasks, total = await db.get_tasks(
+                status=status,
+                priority=priority,
+                tags=tags,
+                tag_mode=tag_mode,
+                page_size=page_size + 1,
+                cursor=cursor_key
+            )
+            has_more = len(tasks) > page_size
+            tasks = tasks[:page_size]
+        else:
+            tasks, total = await db.get_tasks(
+                status=status,
+                priority=priority,
+                tags=tags,
+                tag_mode=tag_mode,
+                page=page,
+                page_size=page_size
+            )
+            has_more = page * page_size < total
+
+        next_cursor = None
+        if has_more and tasks:
+            next_cursor = encode_cursor(tasks[-1].created_at, tasks[-1].id)
 
-        return TasksResponse(
+        return ModelJSONResponse(TasksResponse.model_construct(
             tasks=tasks,
             total=total,
-            page=page,
-            page_size=page_size
-        )
+            page=page if cursor_key is None else None,
+            page_size=page_size,
+            next_cursor=next_cursor
+        ))
     except Exception as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving tasks: {str(e)}"
         )
 
 
 @router.get("/status/{task_status}", response_model=List[TaskResponse])
 async def get_tasks_by_status(
-    task_status: TaskStatus = Path(..., description="Task status to filter by")
+    task_status: TaskStatus = Path(..., description="Task status to filter by"),
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Get tasks filtered by status.
@@ -66,8 +111,8 @@ async def get_tasks_by_status(
     - **task_status**: The status to filter by (active, completed, archived)
     """
     try:
-        tasks = db.get_tasks_by_status(task_status)
-        return tasks
+        tasks = await db.get_tasks_by_status(task_status)
+        return ModelJSONResponse(tasks)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -77,24 +122,25 @@ async def get_tasks_by_status(
 
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
-    task_id: int = Path(..., gt=0, description="Task ID to retrieve")
+    task_id: int = Path(..., gt=0, description="Task ID to retrieve"),
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Get a specific task by ID.
 
     - **task_id**: The ID of the task to retrieve
     """
-    task = db.get_task(task_id)
+    task = await db.get_task(task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with ID {task_id} not found"
         )
-    return task
+    return ModelJSONResponse(task)
 
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
-async def create_task(task: TaskCreate):
+async def create_task(task: TaskCreate, db: AsyncTaskStore = Depends(get_store)):
     """
     Create a new task.
 
@@ -107,7 +153,7 @@ async def create_task(task: TaskCreate):
     """
     try:
         task_data = task.model_dump()
-        new_task = db.create_task(task_data)
+        new_task = await db.create_task(task_data)
         return new_task
     except ValueError as e:
         raise HTTPException(
@@ -121,10 +167,131 @@ async def create_task(task: TaskCreate):
         )
 
 
+@router.post("/bulk", response_model=BulkCreateResponse)
+async def create_tasks_bulk(
+    items: List[Any] = Body(..., description="Tasks to create, each shaped like POST /tasks"),
+    db: AsyncTaskStore = Depends(get_store)
+):
+    """
+    Create many tasks in one request.
+
+    Items are validated as a batch; valid items are created under a single
+    store operation and invalid ones are reported by position.
+
+    - **items**: List of tasks (same fields as POST /tasks)
+    """
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.bulk_max_items} items per bulk request"
+        )
+
+    errors = []
+    try:
+        valid = task_create_list.validate_python(items)
+    except ValidationError as e:
+        # Group errors by item, then revalidate only the items that passed
+        by_index = defaultdict(list)
+        for error in e.errors(include_url=False, include_context=False, include_input=False):
+            by_index[error["loc"][0]].append({**error, "loc": list(error["loc"][1:])})
+        errors = [BulkItemError(index=index, errors=item_errors)
+                  for index, item_errors in sorted(by_index.items())]
+        valid = task_create_list.validate_python(
+            [item for index, item in enumerate(items) if index not in by_index]
+        )
+
+    try:
+        created = await db.create_tasks([task.model_dump() for task in valid])
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error creating tasks: {str(e)}"
+        )
+
+    return BulkCreateResponse(
+        created=len(created),
+        ids=[task.id for task in created],
+        errors=errors
+    )
+
+
+def require_filter(status, priority, tags):
+    """Reject bulk changes that would match every task"""
+    if not (status or priority or tags):
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="At least one of status, priority or tags is required"
+        )
+
+
+@router.put("/bulk", response_model=BulkOperationResponse)
+async def update_tasks_bulk(
+    task_update: TaskUpdate,
+    status: Optional[TaskStatus] = Query(None, description="Only update tasks with this status"),
+    priority: Optional[TaskPriority] = Query(None, description="Only update tasks with this priority"),
+    tags: Optional[List[str]] = Query(None, description="Only update tasks with these tags"),
+    tag_mode: TagMode = Query(TagMode.ANY, description="Match tasks with any or all of the tags"),
+    db: AsyncTaskStore = Depends(get_store)
+):
+    """
+    Apply the same update to every task matching the filters.
+
+    - **status** / **priority** / **tags** / **tag_mode**: Filters, as for GET /tasks (at least one required)
+    - **body**: Fields to update, as for PUT /tasks/{task_id}
+    """
+    require_filter(status, priority, tags)
+
+    update_data = task_update.model_dump(exclude_unset=True)
+    if not update_data:
+        raise HTTPException(
+            status_code=http_status.HTTP_400_BAD_REQUEST,
+            detail="No fields provided for update"
+        )
+
+    try:
+        affected = await db.update_tasks_where(update_data, status=status, priority=priority, tags=tags,
+                                               tag_mode=tag_mode)
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error updating tasks: {str(e)}"
+        )
+
+    return BulkOperationResponse(affected=affected, message=f"{affected} tasks updated")
+
+
+@router.delete("/bulk", response_model=BulkOperationResponse)
+async def delete_tasks_bulk(
+    status: Optional[TaskStatus] = Query(None, description="Only delete tasks with this status"),
+    priority: Optional[TaskPriority] = Query(None, description="Only delete tasks with this priority"),
+    tags: Optional[List[str]] = Query(None, description="Only delete tasks with these tags"),
+    tag_mode: TagMode = Query(TagMode.ANY, description="Match tasks with any or all of the tags"),
+    db: AsyncTaskStore = Depends(get_store)
+):
+    """
+    Delete every task matching the filters.
+
+    - **status** / **priority** / **tags** / **tag_mode**: Filters, as for GET /tasks (at least one required)
+    """
+    require_filter(status, priority, tags)
+
+    try:
+        affected = await db.delete_tasks_where(status=status, priority=priority, tags=tags,
+                                               tag_mode=tag_mode)
+    except Exception as e:
+        raise HTTPException(
+            status_code=http_status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error deleting tasks: {str(e)}"
+        )
+
+    return BulkOperationResponse(affected=affected, message=f"{affected} tasks deleted")
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_task(
     task_id: int = Path(..., gt=0, description="Task ID to update"),
-    task_update: TaskUpdate = None
+    task_update: TaskUpdate = None,
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Update an existing task.
@@ -137,25 +304,18 @@ async def update_task(
     - **due_date**: New task due date (optional)
     - **tags**: New task tags (optional)
     """
-    # Check if task exists
-    if not db.get_task(task_id):
+    # Get only non-null fields to update
+    update_data = task_update.model_dump(exclude_unset=True) if task_update else {}
+
+    if not update_data:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with ID {task_id} not found"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No fields provided for update"
         )
 
+    # A single store call both checks existence and applies the update
     try:
-        # Get only non-null fields to update
-        update_data = task_update.model_dump(exclude_unset=True)
-
-        if not update_data:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No fields provided for update"
-            )
-
-        updated_task = db.update_task(task_id, update_data)
-        return updated_task
+        updated_task = await db.update_task(task_id, update_data)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -167,35 +327,37 @@ async def update_task(
             detail=f"Error updating task: {str(e)}"
         )
 
+    if updated_task is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found"
+        )
+    return updated_task
+
 
 @router.delete("/{task_id}", response_model=SuccessResponse)
 async def delete_task(
-    task_id: int = Path(..., gt=0, description="Task ID to delete")
+    task_id: int = Path(..., gt=0, description="Task ID to delete"),
+    db: AsyncTaskStore = Depends(get_store)
 ):
     """
     Delete a task by ID.
 
     - **task_id**: The ID of the task to delete
     """
-    if not db.get_task(task_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with ID {task_id} not found"
-        )
-
     try:
-        success = db.delete_task(task_id)
-        if success:
-            return SuccessResponse(
-                message=f"Task {task_id} deleted successfully"
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to delete task"
-            )
+        deleted = await db.delete_task(task_id)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting task: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found"
+        )
+    return SuccessResponse(
+        message=f"Task {task_id} deleted successfully"
+    )
@@ -21,12 +21,46 @@ class Settings(BaseSettings):
     allowed_methods: list = ["*"]
     allowed_headers: list = ["*"]
 
-    # Database settings (for future use)
-    database_url: Optional[str] = None
+    # Database settings
+    database_url: Optional[str] = None  # sqlite:///<path> selects SQLite; unset keeps tasks in memory
+    sqlite_mmap_size_mb: int = 256  # SQLite pages read through a shared memory map; 0 disables
+    database_lock_mode: str = "rw"  # "rw" (concurrent readers) or "exclusive"
+    database_engine: str = "rows"  # in-memory indexes: "rows" (sorted id lists) or "columnar" (needs numpy)
+    database_shards: int = 1  # >1 partitions in-memory tasks by id across independent shards
+    response_cache_size: int = 10000  # in-memory response models kept for recently read tasks; 0 disables
+
+    # Write-ahead log (in-memory database only; disabled when wal_path is unset)
+    wal_path: Optional[str] = None
+    wal_fsync_mode: str = "interval"  # "always", "group", "interval" or "off"
+    wal_fsync_interval_ms: int = 50
+
+    # Snapshots (in-memory database only; disabled when snapshot_path is unset)
+    snapshot_path: Optional[str] = None
+    snapshot_interval_seconds: int = 300
+
+    # Threads running blocking store calls off the event loop
+    store_threads: int = 8
+
+    # Background jobs: concurrent workers and jobs allowed to wait for one
+    job_workers: int = 4
+    job_queue_size: int = 100
+    job_processes: int = 2  # pool processes for CPU-bound jobs, spawned on the first one
+
+    # Retention of finished (completed or failed) background tasks; 0 disables a limit
+    background_task_max_age_seconds: int = 3600
+    background_task_max_finished: int = 1000  # least recently used ones beyond this are dropped
+    background_task_sweep_interval_seconds: int = 60
+
+    # Change stream: changes a WebSocket client may leave unsent before it is dropped
+    websocket_send_buffer: int = 10000
+
+    # Bulk operations
+    bulk_max_items: int = 10000
 
     # Server settings
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = 1  # uvicorn worker processes; more than one needs database_url
 
     class Config:
         env_file = ".env"
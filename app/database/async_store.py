@@ -0,0 +1,145 @@
+"""
+Awaitable wrapper that keeps blocking store calls off the event loop
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import FrozenSet, List, Optional, Tuple
+
+from app.database.base import TaskStore
+from app.database.events import ChangeFeed
+from app.database.locks import WouldBlock, nonblocking
+from app.models.task_models import TaskResponse, TaskStatus, TaskPriority, TagMode, BackgroundTaskStatus
+
+
+class AsyncStore:
+    """AsyncTaskStore over a synchronous TaskStore
+
+    Calls run on a bounded thread pool, except the methods the backend lists
+    in its ``inline_methods`` attribute: in-memory reads where a thread hop
+    would cost more than the call. Those run on the event loop only if
+    their locks are free right away; when a writer holds or is waiting for
+    one (a bulk update, a log fsync, a snapshot) they go to the pool
+    instead of stalling the loop. Without an executor every call runs
+    inline on the event loop.
+    """
+
+    def __init__(self, store: TaskStore, executor: Optional[ThreadPoolExecutor] = None):
+        self.store = store
+        self._executor = executor
+        self._inline: FrozenSet[str] = getattr(store, "inline_methods", frozenset())
+
+    @property
+    def changes(self) -> ChangeFeed:
+        """The wrapped store's change feed"""
+        return self.store.changes
+
+    @classmethod
+    def with_threads(cls, store: TaskStore, max_workers: int) -> "AsyncStore":
+        """Wrap a store with its own pool of max_workers threads"""
+        return cls(store, ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="store"))
+
+    async def _call(self, name: str, *args, **kwargs):
+        method = getattr(self.store, name)
+        if self._executor is None:
+            return method(*args, **kwargs)
+        if name in self._inline:
+            try:
+                with nonblocking():
+                    return method(*args, **kwargs)
+            except WouldBlock:
+                pass
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, *args, **kwargs))
+
+    async def create_task(self, task_data: dict) -> TaskResponse:
+        return await self._call("create_task", task_data)
+
+    async def create_tasks(self, tasks_data: List[dict]) -> List[TaskResponse]:
+        return await self._call("create_tasks", tasks_data)
+
+    async def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        return await self._call("get_task", task_id)
+
+    async def get_tasks(self,
+                        status: Optional[TaskStatus] = None,
+                        priority: Optional[TaskPriority] = None,
+                        tags: Optional[List[str]] = None,
+                        page: int = 1,
+                        page_size: int = 10,
+                        cursor: Optional[Tuple[datetime, int]] = None,
+                        tag_mode: TagMode = TagMode.ANY) -> Tuple[List[TaskResponse], int]:
+        return await self._call("get_tasks", status=status, priority=priority, tags=tags,
+                                page=page, page_size=page_size, cursor=cursor, tag_mode=tag_mode)
+
+    async def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]:
+        return await self._call("get_tasks_by_status", status)
+
+    async def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]:
+        return await self._call("update_task", task_id, update_data)
+
+    async def update_tasks_where(self,
+                                 update_data: dict,
+                                 status: Optional[TaskStatus] = None,
+                                 priority: Optional[TaskPriority] = None,
+                                 tags: Optional[List[str]] = None,
+                                 tag_mode: TagMode = TagMode.ANY) -> int:
+        return await self._call("update_tasks_where", update_data,
+                                status=status, priority=priority, tags=tags, tag_mode=tag_mode)
+
+    async def delete_task(self, task_id: int) -> bool:
+        return await self._call("delete_task", task_id)
+
+    async def delete_tasks_where(self,
+                                 status: Optional[TaskStatus] = None,
+                                 priority: Optional[TaskPriority] = None,
+                                 tags: Optional[List[str]] = None,
+                                 tag_mode: TagMode = TagMode.ANY) -> int:
+        return await self._call("delete_tasks_where", status=status, priority=priority, tags=tags,
+                                tag_mode=tag_mode)
+
+    async def get_task_statistics(self) -> dict:
+        return await self._call("get_task_statistics")
+
+    async def check_task_statistics(self) -> dict:
+        return await self._call("check_task_statistics")
+
+    async def create_background_task(self, task_id: str, message: str,
+                                     status: str = "running") -> BackgroundTaskStatus:
+        return await self._call("create_background_task", task_id, message, status)
+
+    async def update_background_task(self, task_id: str, status: str,
+                                     progress: int, message: str,
+                                     result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]:
+        return await self._call("update_background_task", task_id, status, progress, message, result)
+
+    async def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]:
+        return await self._call("get_background_task", task_id)
+
+    async def get_background_tasks(self,
+                                   status: Optional[str] = None,
+                                   page: int = 1,
+                                   page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]:
+        return await self._call("get_background_tasks", status, page, page_size)
+
+    async def evict_background_tasks(self,
+                                     finished_before: Optional[datetime] = None,
+                                     keep_finished: Optional[int] = None) -> int:
+        return await self._call("evict_background_tasks", finished_before, keep_finished)
+
+    async def get_lock_statistics(self) -> dict:
+        return await self._call("get_lock_statistics")
+
+    async def clear_all(self):
+        return await self._call("clear_all")
+
+    async def close(self):
+        """Let queued calls finish, then close the store"""
+        await self.shutdown()
+        await asyncio.to_thread(self.store.close)
+
+    async def shutdown(self):
+        """Stop the thread pool once queued calls have finished, leaving the store open"""
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True)
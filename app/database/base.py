@@ -0,0 +1,204 @@
+"""
+Storage protocols shared by every database backend
+"""
+from datetime import datetime
+from typing import List, Optional, Protocol, Tuple, runtime_checkable
+
+from app.database.events import ChangeFeed
+from app.models.task_models import TaskResponse, TaskStatus, TaskPriority, TagMode, BackgroundTaskStatus
+
+
+@runtime_checkable
+class TaskStore(Protocol):
+    """Operations the API needs from a storage backend
+
+    Semantics every backend must share (checked by the conformance suite in
+    tests/store_conformance.py):
+
+    - ids are positive, ascending in creation order and not reused until
+      clear_all()
+    - listings are newest first, ordered by (created_at, id)
+    - a tags filter matches tasks carrying any of the tags, or all of them
+      with tag_mode=TagMode.ALL
+    - updates skip None values and always refresh updated_at
+    - returned models are shared and must not be mutated by callers
+    - committed task and background task changes are published to ``changes``,
+      one batch per mutation
+    - only completed or failed background tasks are ever evicted; "recently
+      used" means finished or read, or just finished where reads are not tracked
+    """
+
+    changes: ChangeFeed
+
+    def create_task(self, task_data: dict) -> TaskResponse:
+        """Create a new task"""
+        ...
+
+    def create_tasks(self, tasks_data: List[dict]) -> List[TaskResponse]:
+        """Create many tasks in one operation, in order"""
+        ...
+
+    def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        """Get a task by ID"""
+        ...
+
+    def get_tasks(self,
+                  status: Optional[TaskStatus] = None,
+                  priority: Optional[TaskPriority] = None,
+                  tags: Optional[List[str]] = None,
+                  page: int = 1,
+                  page_size: int = 10,
+                  cursor: Optional[Tuple[datetime, int]] = None,
+                  tag_mode: TagMode = TagMode.ANY) -> Tuple[List[TaskResponse], int]:
+        """Get one page of matching tasks and the total number of matches"""
+        ...
+
+    def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]:
+        """Get every task with a status, newest first"""
+        ...
+
+    def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]:
+        """Update a task, returning None if it does not exist"""
+        ...
+
+    def update_tasks_where(self,
+                           update_data: dict,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Update every task matching the filters, returning how many changed"""
+        ...
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task, returning False if it does not exist"""
+        ...
+
+    def delete_tasks_where(self,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Delete every task matching the filters, returning how many were removed"""
+        ...
+
+    def get_task_statistics(self) -> dict:
+        """Get task counts overall, by status, by priority and by tag"""
+        ...
+
+    def check_task_statistics(self) -> dict:
+        """Recount task statistics the slow way and report any mismatches"""
+        ...
+
+    def create_background_task(self, task_id: str, message: str,
+                               status: str = "running") -> BackgroundTaskStatus:
+        """Create a background task entry; status is "queued" for a job not yet started"""
+        ...
+
+    def update_background_task(self, task_id: str, status: str,
+                               progress: int, message: str,
+                               result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]:
+        """Update a background task, returning None if it does not exist"""
+        ...
+
+    def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]:
+        """Get a background task status"""
+        ...
+
+    def get_background_tasks(self,
+                             status: Optional[str] = None,
+                             page: int = 1,
+                             page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]:
+        """Get one page of background tasks, oldest first, and the total number of matches"""
+        ...
+
+    def evict_background_tasks(self,
+                               finished_before: Optional[datetime] = None,
+                               keep_finished: Optional[int] = None) -> int:
+        """Remove expired, then least recently used, finished background tasks; returns how many"""
+        ...
+
+    def get_lock_statistics(self) -> dict:
+        """Get lock wait statistics; always includes the backend's "mode" """
+        ...
+
+    def clear_all(self):
+        """Clear all data (for testing)"""
+        ...
+
+    def close(self):
+        """Release files and connections held by the store"""
+        ...
+
+
+@runtime_checkable
+class AsyncTaskStore(Protocol):
+    """Awaitable counterpart of TaskStore used by the API routes
+
+    Same operations and semantics as TaskStore; implementations must not
+    block the event loop while a call waits on locks, disk or the network.
+    """
+
+    changes: ChangeFeed
+
+    async def create_task(self, task_data: dict) -> TaskResponse: ...
+
+    async def create_tasks(self, tasks_data: List[dict]) -> List[TaskResponse]: ...
+
+    async def get_task(self, task_id: int) -> Optional[TaskResponse]: ...
+
+    async def get_tasks(self,
+                        status: Optional[TaskStatus] = None,
+                        priority: Optional[TaskPriority] = None,
+                        tags: Optional[List[str]] = None,
+                        page: int = 1,
+                        page_size: int = 10,
+                        cursor: Optional[Tuple[datetime, int]] = None,
+                        tag_mode: TagMode = TagMode.ANY) -> Tuple[List[TaskResponse], int]: ...
+
+    async def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]: ...
+
+    async def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]: ...
+
+    async def update_tasks_where(self,
+                                 update_data: dict,
+                                 status: Optional[TaskStatus] = None,
+                                 priority: Optional[TaskPriority] = None,
+                                 tags: Optional[List[str]] = None,
+                                 tag_mode: TagMode = TagMode.ANY) -> int: ...
+
+    async def delete_task(self, task_id: int) -> bool: ...
+
+    async def delete_tasks_where(self,
+                                 status: Optional[TaskStatus] = None,
+                                 priority: Optional[TaskPriority] = None,
+                                 tags: Optional[List[str]] = None,
+                                 tag_mode: TagMode = TagMode.ANY) -> int: ...
+
+    async def get_task_statistics(self) -> dict: ...
+
+    async def check_task_statistics(self) -> dict: ...
+
+    async def create_background_task(self, task_id: str, message: str,
+                                     status: str = "running") -> BackgroundTaskStatus: ...
+
+    async def update_background_task(self, task_id: str, status: str,
+                                     progress: int, message: str,
+                                     result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]: ...
+
+    async def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]: ...
+
+    async def get_background_tasks(self,
+                                   status: Optional[str] = None,
+                                   page: int = 1,
+                                   page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]: ...
+
+    async def evict_background_tasks(self,
+                                     finished_before: Optional[datetime] = None,
+                                     keep_finished: Optional[int] = None) -> int: ...
+
+    async def get_lock_statistics(self) -> dict: ...
+
+    async def clear_all(self): ...
+
+    async def close(self): ...
@@ -0,0 +1,308 @@
+"""
+Chunked bitmaps of task ids for the tag index
+"""
+import bisect
+from array import array
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+# Roaring-style split: the high bits of an id pick a chunk, the low bits an
+# offset inside it, so empty id ranges cost nothing.
+CHUNK_SHIFT = 16
+CHUNK_BITS = 1 << CHUNK_SHIFT
+CHUNK_MASK = CHUNK_BITS - 1
+CHUNK_BYTES = CHUNK_BITS // 8
+
+# A chunk holds either a sorted array of 16-bit offsets (2 bytes per id) or
+# a bitset int (CHUNK_BYTES whatever its count). Roaring switches at 4096
+# ids, where the two sizes meet; here unions and intersections of arrays
+# run per id in the interpreter while bitsets combine in C, so chunks turn
+# into bitsets earlier, at ARRAY_MAX ids (at most 8 bytes per id). They
+# turn back below ARRAY_MIN, so ids added and removed around one size do
+# not convert a chunk back and forth.
+ARRAY_MAX = 1024
+ARRAY_MIN = ARRAY_MAX // 2
+
+Chunk = Union[array, int]
+
+# Positions of the set bits of every byte value, ascending
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+# Below this many wanted bits, peeling the highest bit off one at a time
+# beats decoding the whole chunk
+_PEEL_LIMIT = 64
+
+
+def _offsets(chunk: int) -> List[int]:
+    """Every offset set in a bitset chunk, ascending"""
+    offsets = []
+    data = chunk.to_bytes(CHUNK_BYTES, "little")
+    for position, value in enumerate(data):
+        if value:
+            offsets.extend(position * 8 + bit for bit in _BYTE_BITS[value])
+    return offsets
+
+
+def _top_offsets(chunk: int, count: int) -> List[int]:
+    """The count highest offsets set in a bitset chunk, descending"""
+    if count > _PEEL_LIMIT:
+        return _offsets(chunk)[::-1][:count]
+    offsets = []
+    while chunk and len(offsets) < count:
+        bit = chunk.bit_length() - 1
+        offsets.append(bit)
+        chunk ^= 1 << bit
+    return offsets
+
+
+def _bits(offsets: Iterable[int]) -> int:
+    """Bitset chunk holding the given offsets"""
+    data = bytearray(CHUNK_BYTES)
+    for offset in offsets:
+        data[offset >> 3] |= 1 << (offset & 7)
+    return int.from_bytes(data, "little")
+
+
+def _as_bits(chunk: Chunk) -> int:
+    return chunk if type(chunk) is int else _bits(chunk)
+
+
+def _count(chunk: Chunk) -> int:
+    return chunk.bit_count() if type(chunk) is int else len(chunk)
+
+
+def _packed(offsets: Iterable[int]) -> Chunk:
+    """The smaller container for a set of offsets"""
+    offsets = sorted(set(offsets))
+    return array("H", offsets) if len(offsets) <= ARRAY_MAX else _bits(offsets)
+
+
+def _shrunk(chunk: int) -> Chunk:
+    """A bitset chunk, turned back into an array once it is sparse enough"""
+    return array("H", _offsets(chunk)) if chunk.bit_count() < ARRAY_MIN else chunk
+
+
+def _member(chunk: Chunk, probes: int) -> Callable[[int], bool]:
+    """Fast membership test for probes offsets against one chunk"""
+    if type(chunk) is int:
+        data = chunk.to_bytes(CHUNK_BYTES, "little")
+        return lambda offset: data[offset >> 3] >> (offset & 7) & 1
+    if probes * 8 < len(chunk):
+        # A few probes into a long array: binary search beats building a set
+        def contains(offset: int) -> bool:
+            index = bisect.bisect_left(chunk, offset)
+            return index < len(chunk) and chunk[index] == offset
+        return contains
+    return set(chunk).__contains__
+
+
+class Bitmap:
+    """Set of non-negative ints split into 65536-id chunks
+
+    Sparse chunks are sorted arrays of 16-bit offsets; dense ones are one
+    Python int used as a bitset, which gives C-speed |, & and bit_count, so
+    unions and intersections of dense chunks cost a few word operations per
+    64 ids instead of a hash or list operation per id.
+    """
+
+    __slots__ = ("_chunks", "_size")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._chunks: Dict[int, Chunk] = {}
+        # Kept current by every mutation; popcounts over whole chunks are
+        # too slow to repeat for each len()
+        self._size = 0
+        self.update(ids)
+
+    @staticmethod
+    def _group(ids: Iterable[int]) -> Dict[int, List[int]]:
+        """Group ids into their offsets per chunk key"""
+        grouped: Dict[int, List[int]] = {}
+        for task_id in ids:
+            offsets = grouped.get(task_id >> CHUNK_SHIFT)
+            if offsets is None:
+                offsets = grouped[task_id >> CHUNK_SHIFT] = []
+            offsets.append(task_id & CHUNK_MASK)
+        return grouped
+
+    def add(self, task_id: int):
+        key = task_id >> CHUNK_SHIFT
+        offset = task_id & CHUNK_MASK
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            self._chunks[key] = array("H", (offset,))
+        elif type(chunk) is int:
+            added = chunk | 1 << offset
+            if added == chunk:
+                return
+            self._chunks[key] = added
+        else:
+            # Ids mostly arrive in ascending order, so this is usually an append
+            index = bisect.bisect_left(chunk, offset)
+            if index < len(chunk) and chunk[index] == offset:
+                return
+            chunk.insert(index, offset)
+            if len(chunk) > ARRAY_MAX:
+                self._chunks[key] = _bits(chunk)
+        self._size += 1
+
+    def discard(self, task_id: int):
+        key = task_id >> CHUNK_SHIFT
+        offset = task_id & CHUNK_MASK
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            return
+        if type(chunk) is int:
+            removed = chunk & ~(1 << offset)
+            if removed == chunk:
+                return
+            self._chunks[key] = _shrunk(removed)
+        else:
+            index = bisect.bisect_left(chunk, offset)
+            if index == len(chunk) or chunk[index] != offset:
+                return
+            del chunk[index]
+            if not chunk:
+                del self._chunks[key]
+        self._size -= 1
+
+    def update(self, ids: Iterable[int]):
+        """Add many ids, touching each chunk once"""
+        for key, offsets in self._group(ids).items():
+            chunk = self._chunks.get(key)
+            before = _count(chunk) if chunk is not None else 0
+            if chunk is None:
+                added = _packed(offsets)
+            elif type(chunk) is int:
+                added = chunk | _bits(offsets)
+            else:
+                added = _packed([*chunk, *offsets])
+            self._chunks[key] = added
+            self._size += _count(added) - before
+
+    def difference_update(self, ids: Iterable[int]):
+        """Remove many ids, touching each chunk once"""
+        for key, offsets in self._group(ids).items():
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                continue
+            before = _count(chunk)
+            if type(chunk) is int:
+                removed = _shrunk(chunk & ~_bits(offsets))
+            else:
+                gone = set(offsets)
+                removed = array("H", [offset for offset in chunk if offset not in gone])
+            self._size -= before - _count(removed)
+            if removed:
+                self._chunks[key] = removed
+            else:
+                del self._chunks[key]
+
+    @classmethod
+    def union(cls, bitmaps: List["Bitmap"]) -> "Bitmap":
+        """Ids in any of the bitmaps; the result may share chunks with them"""
+        result = cls()
+        grouped: Dict[int, List[Chunk]] = {}
+        for bitmap in bitmaps:
+            for key, chunk in bitmap._chunks.items():
+                grouped.setdefault(key, []).append(chunk)
+        chunks = result._chunks
+        for key, parts in grouped.items():
+            if len(parts) == 1:
+                chunks[key] = parts[0]
+            elif any(type(part) is int for part in parts):
+                merged = 0
+                for part in parts:
+                    merged |= _as_bits(part)
+                chunks[key] = merged
+            else:
+                chunks[key] = _packed(offset for part in parts for offset in part)
+        result._size = sum(_count(chunk) for chunk in chunks.values())
+        return result
+
+    @classmethod
+    def intersection(cls, bitmaps: List["Bitmap"]) -> "Bitmap":
+        """Ids in every one of the bitmaps"""
+        result = cls()
+        if not bitmaps:
+            return result
+        smallest, *others = sorted(bitmaps, key=lambda bitmap: len(bitmap._chunks))
+        for key, chunk in smallest._chunks.items():
+            parts = [chunk]
+            for other in others:
+                part = other._chunks.get(key)
+                if part is None:
+                    break
+                parts.append(part)
+            else:
+                arrays = [part for part in parts if type(part) is not int]
+                if arrays:
+                    # Probe the shortest array's offsets against every other chunk
+                    shortest = min(arrays, key=len)
+                    tests = [_member(part, len(shortest)) for part in parts if part is not shortest]
+                    common: Chunk = array("H", [offset for offset in shortest
+                                                if all(test(offset) for test in tests)])
+                else:
+                    common = parts[0]
+                    for part in parts[1:]:
+                        common &= part
+                if common:
+                    result._chunks[key] = common
+                    result._size += _count(common)
+        return result
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __contains__(self, task_id: int) -> bool:
+        chunk = self._chunks.get(task_id >> CHUNK_SHIFT)
+        if chunk is None:
+            return False
+        offset = task_id & CHUNK_MASK
+        if type(chunk) is int:
+            return bool(chunk >> offset & 1)
+        index = bisect.bisect_left(chunk, offset)
+        return index < len(chunk) and chunk[index] == offset
+
+    def __iter__(self) -> Iterator[int]:
+        """Ids in ascending order"""
+        for key in sorted(self._chunks):
+            chunk = self._chunks[key]
+            base = key << CHUNK_SHIFT
+            yield from (base + offset for offset in (_offsets(chunk) if type(chunk) is int else chunk))
+
+    def descending(self, skip: int, limit: int, before: Optional[int] = None) -> List[int]:
+        """Up to limit ids, newest first, after skipping the skip highest
+
+        With before, only ids below it are considered. Whole chunks are
+        skipped by their counts, and only the chunks holding the requested
+        ids are decoded.
+        """
+        ids: List[int] = []
+        for key in sorted(self._chunks, reverse=True):
+            chunk = self._chunks[key]
+            if before is not None:
+                if key > before >> CHUNK_SHIFT:
+                    continue
+                if key == before >> CHUNK_SHIFT:
+                    if type(chunk) is int:
+                        chunk &= (1 << (before & CHUNK_MASK)) - 1
+                    else:
+                        chunk = chunk[:bisect.bisect_left(chunk, before & CHUNK_MASK)]
+            count = _count(chunk)
+            if skip >= count:
+                skip -= count
+                continue
+            wanted = skip + limit - len(ids)
+            if type(chunk) is int:
+                offsets = _top_offsets(chunk, wanted)
+            else:
+                offsets = chunk[max(0, count - wanted):][::-1]
+            base = key << CHUNK_SHIFT
+            ids.extend(base + offset for offset in offsets[skip:])
+            skip = 0
+            if len(ids) >= limit:
+                break
+        return ids
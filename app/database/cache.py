@@ -0,0 +1,50 @@
+"""
+Bounded cache of validated task response models
+"""
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from app.models.task_models import TaskResponse
+
+
+class ResponseCache:
+    """Least recently used response models by task id, at most maxsize of them
+
+    A response model costs several times the record it is built from, so
+    only the tasks being read stay cached. Readers run concurrently under
+    the database's read lock, so the LRU order has a mutex of its own.
+    A maxsize of 0 disables caching.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[int, TaskResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, task_id: int) -> Optional[TaskResponse]:
+        with self._lock:
+            response = self._entries.get(task_id)
+            if response is not None:
+                self._entries.move_to_end(task_id)
+            return response
+
+    def put(self, task_id: int, response: TaskResponse):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._entries[task_id] = response
+            self._entries.move_to_end(task_id)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, task_id: int):
+        with self._lock:
+            self._entries.pop(task_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,256 @@
+"""
+Columnar task indexes evaluated with NumPy
+
+Optional engine: needs numpy, which is not a core dependency.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.database.bitmap import Bitmap
+from app.database.database import InMemoryDatabase
+from app.database.records import TaskRecord
+from app.database.snapshot import PRIORITIES, STATUSES
+from app.models.task_models import TaskStatus, TaskPriority, TagMode
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+
+INITIAL_CAPACITY = 1024
+
+
+class ColumnarDatabase(InMemoryDatabase):
+    """InMemoryDatabase with NumPy columns beside its id-list indexes
+
+    Status and priority are small-int columns and every tag has a boolean
+    column, with one row per task this store has indexed. Rows are kept in
+    id order (ids follow creation order, so row order is also created_at
+    order) and a sorted row -> id column maps them back, so a shard of a
+    sharded store holds only its own rows rather than every id handed
+    out. Queries combining several criteria become boolean masks instead
+    of Python loops over the smallest bucket; response models are built
+    only for the returned page. A single criterion is already answered by
+    its sorted bucket, and statistics by the bucket sizes, so those keep
+    using the id-list indexes. Rows, the write-ahead log and snapshots are
+    unchanged.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if np is None:
+            raise RuntimeError("The columnar engine needs numpy: pip install numpy")
+        self._row_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self._used = 0
+        self._alive = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._status = np.zeros(INITIAL_CAPACITY, dtype=np.int8)
+        self._priority = np.zeros(INITIAL_CAPACITY, dtype=np.int8)
+        self._tags: Dict[str, "np.ndarray"] = {}
+        super().__init__(*args, **kwargs)
+
+    def _columns(self) -> List["np.ndarray"]:
+        return [self._row_ids, self._alive, self._status, self._priority, *self._tags.values()]
+
+    def _set_columns(self, columns: List["np.ndarray"]):
+        self._row_ids, self._alive, self._status, self._priority, *tag_columns = columns
+        self._tags = dict(zip(self._tags, tag_columns))
+
+    def _reserve(self, rows: int):
+        """Grow every column so rows rows fit, doubling the capacity"""
+        capacity = len(self._alive)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+
+        def grow(column):
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            return grown
+
+        self._set_columns([grow(column) for column in self._columns()])
+
+    def _tag_column(self, tag: str):
+        column = self._tags.get(tag)
+        if column is None:
+            column = self._tags[tag] = np.zeros(len(self._alive), dtype=bool)
+        return column
+
+    def _rows(self, ids: "np.ndarray") -> "np.ndarray":
+        """Rows of ascending task ids, adding rows for the ones not stored yet
+
+        A task keeps its row while it is updated (unindexed and indexed
+        again); a deleted task leaves an empty row. New ids normally come
+        after every stored one and are appended; a sharded store can hand a
+        shard a lower id late, and then the rows are merged back into id
+        order.
+        """
+        used = self._used
+        if used and ids[0] <= self._row_ids[used - 1]:
+            rows = np.searchsorted(self._row_ids[:used], ids)
+            known = rows < used
+            known[known] = self._row_ids[rows[known]] == ids[known]
+            if known.all():
+                return rows
+            self._merge_rows(ids[~known])
+            return np.searchsorted(self._row_ids[:self._used], ids)
+        self._reserve(used + len(ids))
+        self._row_ids[used:used + len(ids)] = ids
+        self._used = used + len(ids)
+        return np.arange(used, used + len(ids))
+
+    def _merge_rows(self, ids: "np.ndarray"):
+        """Add empty rows for new ids that sort before stored ones"""
+        used = self._used
+        self._reserve(used + len(ids))
+        row_ids = np.concatenate((self._row_ids[:used], ids))
+        order = np.argsort(row_ids, kind="stable")
+
+        def merged(column):
+            grown = np.zeros(len(column), dtype=column.dtype)
+            grown[:used] = column[:used]  # the new rows start empty
+            grown[:used + len(ids)] = grown[order]
+            return grown
+
+        columns = [merged(column) for column in self._columns()]
+        columns[0][:used + len(ids)] = row_ids[order]
+        self._set_columns(columns)
+        self._used = used + len(ids)
+
+    def _row(self, task_id: int) -> int:
+        used = self._used
+        if used and task_id <= self._row_ids[used - 1]:
+            return int(self._rows(np.array([task_id], dtype=np.int64))[0])
+        self._reserve(used + 1)
+        self._row_ids[used] = task_id
+        self._used = used + 1
+        return used
+
+    def _index_task(self, task: TaskRecord):
+        """Add a task to the id-list indexes and write its values into its row"""
+        super()._index_task(task)
+        row = self._row(task.id)
+        self._alive[row] = True
+        self._status[row] = _STATUS_CODES[task.status]
+        self._priority[row] = _PRIORITY_CODES[task.priority]
+        for tag in task.tags:
+            self._tag_column(tag)[row] = True
+
+    def _unindex_task(self, task: TaskRecord):
+        """Remove a task from the id-list indexes, mark its row empty and clear its tag bits"""
+        super()._unindex_task(task)
+        row = self._row(task.id)
+        self._alive[row] = False
+        for tag in task.tags:
+            self._tags[tag][row] = False
+
+    def _task_rows(self, tasks: List[TaskRecord]) -> Dict[int, int]:
+        """Row of each task, by id"""
+        ids = np.unique(np.fromiter((task.id for task in tasks), dtype=np.int64, count=len(tasks)))
+        return dict(zip(ids.tolist(), self._rows(ids).tolist()))
+
+    def _index_tasks(self, tasks: List[TaskRecord]):
+        """Index many tasks, with one fancy-indexed assignment per column"""
+        super()._index_tasks(tasks)
+        if not tasks:
+            return
+        rows_by_id = self._task_rows(tasks)
+        rows = [rows_by_id[task.id] for task in tasks]
+        self._alive[rows] = True
+        self._status[rows] = np.fromiter((_STATUS_CODES[task.status] for task in tasks),
+                                         dtype=np.int8, count=len(tasks))
+        self._priority[rows] = np.fromiter((_PRIORITY_CODES[task.priority] for task in tasks),
+                                           dtype=np.int8, count=len(tasks))
+        for tag, tag_ids in self._group_tags(tasks).items():
+            self._tag_column(tag)[[rows_by_id[task_id] for task_id in tag_ids]] = True
+
+    def _unindex_tasks(self, tasks: List[TaskRecord]):
+        """Unindex many tasks, with one fancy-indexed assignment per column"""
+        super()._unindex_tasks(tasks)
+        if not tasks:
+            return
+        rows_by_id = self._task_rows(tasks)
+        self._alive[list(rows_by_id.values())] = False
+        for tag, tag_ids in self._group_tags(tasks).items():
+            self._tags[tag][[rows_by_id[task_id] for task_id in tag_ids]] = False
+
+    def _mask(self,
+              status: Optional[TaskStatus] = None,
+              priority: Optional[TaskPriority] = None,
+              tags: Optional[List[str]] = None,
+              tag_mode: TagMode = TagMode.ANY):
+        """Boolean mask over the used rows, set where the task matches"""
+        end = self._used
+        mask = self._alive[:end].copy()
+        if status:
+            mask &= self._status[:end] == _STATUS_CODES[status]
+        if priority:
+            mask &= self._priority[:end] == _PRIORITY_CODES[priority]
+        if tags and tag_mode == TagMode.ALL:
+            for tag in set(tags):
+                column = self._tags.get(tag)
+                if column is None:
+                    mask[:] = False
+                    break
+                mask &= column[:end]
+        elif tags:
+            tagged = np.zeros(end, dtype=bool)
+            for tag in set(tags):
+                column = self._tags.get(tag)
+                if column is not None:
+                    tagged |= column[:end]
+            mask &= tagged
+        return mask
+
+    @staticmethod
+    def _criteria(status: Optional[TaskStatus],
+                  priority: Optional[TaskPriority],
+                  tags: Optional[List[str]]) -> int:
+        """How many index buckets a query combines"""
+        return bool(status) + bool(priority) + len(set(tags or ()))
+
+    def _matching_ids(self,
+                      status: Optional[TaskStatus] = None,
+                      priority: Optional[TaskPriority] = None,
+                      tags: Optional[List[str]] = None,
+                      tag_mode: TagMode = TagMode.ANY) -> Union[List[int], Bitmap]:
+        """Resolve filters to matching task ids in ascending (creation) order"""
+        if self._criteria(status, priority, tags) <= 1:
+            return super()._matching_ids(status, priority, tags, tag_mode)
+        return self._row_ids[np.flatnonzero(self._mask(status, priority, tags, tag_mode))].tolist()
+
+    def _page_ids(self,
+                  status: Optional[TaskStatus],
+                  priority: Optional[TaskPriority],
+                  tags: Optional[List[str]],
+                  page: int,
+                  page_size: int,
+                  cursor: Optional[Tuple[datetime, int]],
+                  tag_mode: TagMode) -> Tuple[List[int], int]:
+        """Ids of one page, newest first, and the number of matches
+
+        The mask is counted for the total and only the page's ids are
+        turned into Python ints.
+        """
+        if self._criteria(status, priority, tags) <= 1:
+            # One sorted bucket (or the ordered id list) already is the answer
+            return super()._page_ids(status, priority, tags, page, page_size, cursor, tag_mode)
+
+        mask = self._mask(status, priority, tags, tag_mode)
+        total = int(np.count_nonzero(mask))
+        if cursor is not None:
+            rows = np.flatnonzero(mask[:np.searchsorted(self._row_ids[:self._used], cursor[1])])
+            page_rows = rows[max(0, len(rows) - page_size):]
+        else:
+            rows = np.flatnonzero(mask)
+            end = len(rows) - (page - 1) * page_size
+            page_rows = rows[max(0, end - page_size):max(end, 0)]
+        return self._row_ids[page_rows[::-1]].tolist(), total
+
+    def _clear_tasks(self):
+        super()._clear_tasks()
+        self._used = 0
+        self._alive[:] = False
+        self._tags.clear()
@@ -1,181 +1,781 @@
+from collections import Counter, OrderedDict, defaultdict
 from datetime import datetime
-from typing import Dict, List, Optional
-from app.models.task_models import TaskResponse, TaskStatus, TaskPriority, BackgroundTaskStatus
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from app.models.task_models import (
+    TaskResponse, TaskStatus, TaskPriority, TagMode, BackgroundTaskStatus, FINISHED_STATUSES
+)
+from app.core.config import settings
+from app.database.base import TaskStore
+from app.database.bitmap import Bitmap
+from app.database.cache import ResponseCache
+from app.database.events import Change, ChangeFeed
+from app.database.locks import ExclusiveLock, make_lock
+from app.database.records import TaskRecord, intern_tags
+from app.database.sqlite import SQLiteDatabase, sqlite_path
+from app.database.snapshot import capture_task, read_snapshot, write_snapshot
+from app.database.wal import WriteAheadLog, decode_task_fields
+import bisect
 import threading
+from itertools import islice
 
 
 class InMemoryDatabase:
     """Simple in-memory database for storing tasks and background tasks"""
 
-    def __init__(self):
-        self.tasks: Dict[int, dict] = {}
+    # Index lookups that never wait on I/O and build at most a page of
+    # models; AsyncStore runs these on the event loop while their lock is
+    # free and in its thread pool while a writer holds or waits for it.
+    # Unbounded reads (get_tasks_by_status builds every match) would stall
+    # all other requests, and writes can wait on the log's fsync or behind
+    # a snapshot, so those always go to the pool.
+    inline_methods = frozenset({
+        "get_task", "get_tasks", "get_task_statistics",
+        "get_background_task", "get_background_tasks", "get_lock_statistics"
+    })
+
+    def __init__(self,
+                 lock_mode: str = "rw",
+                 wal: Optional[WriteAheadLog] = None,
+                 snapshot_path: Optional[str] = None,
+                 response_cache_size: int = 10_000):
+        self.tasks: Dict[int, TaskRecord] = {}
         self.background_tasks: Dict[str, BackgroundTaskStatus] = {}
+        # Ids of finished background tasks, least recently used first;
+        # finishing or reading one moves it to the end
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
         self.next_task_id: int = 1
-        self.lock = threading.Lock()
+
+        # Validated response models of recently read tasks, shared by every
+        # read until the task changes or drops out of the LRU. Callers must
+        # not mutate them.
+        self._responses = ResponseCache(response_cache_size)
+
+        # Bumped by every task mutation; lets the snapshotter skip idle periods
+        self.version: int = 0
+
+        # Tasks and background tasks are guarded separately so job progress
+        # updates never contend with task traffic.
+        self.lock = make_lock(lock_mode)
+        self.background_lock = ExclusiveLock()
+
+        # Committed changes for in-process subscribers (event streams)
+        self.changes = ChangeFeed()
+
+        # Ids are handed out in creation order, so keeping every id list
+        # sorted ascending also keeps it sorted by created_at.
+        self._ordered_ids: List[int] = []
+
+        # Secondary indexes: field value -> sorted ids of the tasks holding it.
+        # Tags are many and combined by ANY/ALL queries, so they get bitmaps
+        # whose unions and intersections work a chunk at a time.
+        self._status_index: Dict[TaskStatus, List[int]] = defaultdict(list)
+        self._priority_index: Dict[TaskPriority, List[int]] = defaultdict(list)
+        self._tag_index: Dict[str, Bitmap] = defaultdict(Bitmap)
+        self._indexes = (self._status_index, self._priority_index)
+
+        # Recovery: load the latest snapshot, then replay the log records
+        # written after it, before the database serves anything.
+        snapshot_lsn = 0
+        if snapshot_path:
+            snapshot = read_snapshot(snapshot_path)
+            if snapshot is not None:
+                snapshot_lsn = snapshot.lsn
+                self._load_tasks(snapshot.tasks)
+                self.next_task_id = snapshot.next_task_id
+
+        # Mutations are logged under the write lock
+        self.wal = wal
+        if wal is not None:
+            wal.advance(snapshot_lsn)
+            for record in wal.replay():
+                if record["lsn"] > snapshot_lsn:
+                    self._apply_record(record)
+            wal.open()
+
+    @staticmethod
+    def _insert_id(bucket: List[int], task_id: int):
+        """Insert an id into a sorted bucket (an append for new tasks)"""
+        if not bucket or bucket[-1] < task_id:
+            bucket.append(task_id)
+        else:
+            bisect.insort(bucket, task_id)
+
+    @staticmethod
+    def _remove_id(bucket: List[int], task_id: int):
+        """Remove an id from a sorted bucket"""
+        position = bisect.bisect_left(bucket, task_id)
+        if position < len(bucket) and bucket[position] == task_id:
+            del bucket[position]
+
+    @staticmethod
+    def _index_keys(task: TaskRecord):
+        """Yield (index position in self._indexes, key) for each id bucket a task is in"""
+        yield 0, task.status
+        yield 1, task.priority
+
+    def _index_task(self, task: TaskRecord):
+        """Add a task to the secondary indexes"""
+        task_id = task.id
+        for position, key in self._index_keys(task):
+            self._insert_id(self._indexes[position][key], task_id)
+        for tag in task.tags:
+            self._tag_index[tag].add(task_id)
+
+    def _unindex_task(self, task: TaskRecord):
+        """Remove a task from the secondary indexes"""
+        task_id = task.id
+        for position, key in self._index_keys(task):
+            index = self._indexes[position]
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            self._remove_id(bucket, task_id)
+            if not bucket:
+                del index[key]
+        for tag in task.tags:
+            bitmap = self._tag_index.get(tag)
+            if bitmap is None:
+                continue
+            bitmap.discard(task_id)
+            if not bitmap:
+                del self._tag_index[tag]
+
+    @staticmethod
+    def _few(ids, bucket: List[int]) -> bool:
+        """Whether per-id bisects beat one pass over the whole bucket"""
+        return len(ids) * 32 < len(bucket)
+
+    @staticmethod
+    def _group_tags(tasks: List[TaskRecord]) -> Dict[str, List[int]]:
+        """Map each tag to the ids of the given tasks carrying it"""
+        tagged: Dict[str, List[int]] = defaultdict(list)
+        for task in tasks:
+            for tag in task.tags:
+                tagged[tag].append(task.id)
+        return tagged
+
+    def _index_tasks(self, tasks: List[TaskRecord]):
+        """Add many tasks to the indexes, merging into each bucket once"""
+        additions: Dict[tuple, List[int]] = defaultdict(list)
+        for task in tasks:
+            for entry in self._index_keys(task):
+                additions[entry].append(task.id)
+        for (position, key), ids in additions.items():
+            bucket = self._indexes[position][key]
+            if self._few(ids, bucket):
+                for task_id in ids:
+                    self._insert_id(bucket, task_id)
+            else:
+                bucket.extend(ids)
+                bucket.sort()
+        for tag, ids in self._group_tags(tasks).items():
+            self._tag_index[tag].update(ids)
+
+    def _unindex_tasks(self, tasks: List[TaskRecord]):
+        """Remove many tasks from the indexes with one pass per affected bucket"""
+        removals: Dict[tuple, Set[int]] = defaultdict(set)
+        for task in tasks:
+            for entry in self._index_keys(task):
+                removals[entry].add(task.id)
+        for (position, key), ids in removals.items():
+            index = self._indexes[position]
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            if self._few(ids, bucket):
+                for task_id in ids:
+                    self._remove_id(bucket, task_id)
+            else:
+                bucket = index[key] = [task_id for task_id in bucket if task_id not in ids]
+            if not bucket:
+                del index[key]
+        for tag, ids in self._group_tags(tasks).items():
+            bitmap = self._tag_index.get(tag)
+            if bitmap is None:
+                continue
+            bitmap.difference_update(ids)
+            if not bitmap:
+                del self._tag_index[tag]
+
+    def _matching_ids(self,
+                      status: Optional[TaskStatus] = None,
+                      priority: Optional[TaskPriority] = None,
+                      tags: Optional[List[str]] = None,
+                      tag_mode: TagMode = TagMode.ANY) -> Union[List[int], Bitmap]:
+        """Resolve filters to matching task ids in ascending (creation) order
+
+        The result is a sorted id list or, for a tag-only query, a tag
+        bitmap. It may be an index bucket itself and must only be read
+        while the lock is held.
+        """
+        tasks = self.tasks
+        # (sorted candidate ids, filter narrowing an id list to this criterion)
+        candidates: List[Tuple[Union[List[int], Bitmap], Callable[[Iterable[int]], List[int]]]] = []
+
+        if status:
+            candidates.append((self._status_index.get(status, []),
+                               lambda ids: [i for i in ids if tasks[i].status == status]))
+
+        if priority:
+            candidates.append((self._priority_index.get(priority, []),
+                               lambda ids: [i for i in ids if tasks[i].priority == priority]))
+
+        if tags:
+            # ANY: a task carries at least one requested tag; ALL: every one
+            wanted = set(tags)
+            bitmaps = [self._tag_index[tag] for tag in wanted if tag in self._tag_index]
+            # With a single tag both modes select the same set, so it takes
+            # the ANY branch and reuses the bitmap without copying it
+            if tag_mode == TagMode.ALL and len(wanted) > 1:
+                tagged = Bitmap.intersection(bitmaps) if len(bitmaps) == len(wanted) else Bitmap()
+                candidates.append((tagged,
+                                   lambda ids: [i for i in ids if wanted.issubset(tasks[i].tags)]))
+            else:
+                tagged = bitmaps[0] if len(bitmaps) == 1 else Bitmap.union(bitmaps)
+                candidates.append((tagged,
+                                   lambda ids: [i for i in ids if not wanted.isdisjoint(tasks[i].tags)]))
+
+        if not candidates:
+            return self._ordered_ids
+
+        # Walk the smallest bucket and narrow it by the remaining filters
+        candidates.sort(key=lambda candidate: len(candidate[0]))
+        ids = candidates[0][0]
+        for _, narrow in candidates[1:]:
+            ids = narrow(ids)
+        return ids
+
+    @staticmethod
+    def _page_desc(ids: Union[List[int], Bitmap], page: int, page_size: int) -> List[int]:
+        """Slice one page out of ascending ids, newest first"""
+        if isinstance(ids, Bitmap):
+            return ids.descending((page - 1) * page_size, page_size)
+        end = len(ids) - (page - 1) * page_size
+        if end <= 0:
+            return []
+        start = max(0, end - page_size)
+        return ids[start:end][::-1]
+
+    @staticmethod
+    def _seek_desc(ids: Union[List[int], Bitmap], cursor: Tuple[datetime, int], limit: int) -> List[int]:
+        """Return up to limit ids ordered before the cursor key, newest first
+
+        Ids follow (created_at, id) order, so the cursor id alone locates the
+        position even if the task it came from has since been deleted.
+        """
+        if isinstance(ids, Bitmap):
+            return ids.descending(0, limit, before=max(cursor[1], 0))
+        end = bisect.bisect_left(ids, cursor[1])
+        return ids[max(0, end - limit):end][::-1]
+
+    def _log(self, record: dict) -> Optional[int]:
+        """Record a mutation in the write-ahead log; the caller holds the write lock"""
+        self.version += 1
+        if self.wal is None:
+            return None
+        return self.wal.append(record)
+
+    def _commit(self, lsn: Optional[int]):
+        """Wait for a logged mutation to become durable, after the lock is released"""
+        if lsn is not None:
+            self.wal.commit(lsn)
+
+    def _store_task(self, task: TaskRecord):
+        """Add a complete task row to the table and indexes"""
+        task_id = task.id
+        self.tasks[task_id] = task
+        self._insert_id(self._ordered_ids, task_id)
+        self._index_task(task)
+        if task_id >= self.next_task_id:
+            self.next_task_id = task_id + 1
+
+    def _load_tasks(self, tasks: List[TaskRecord]):
+        """Fill an empty table from rows already in id order"""
+        self.tasks = {task.id: task for task in tasks}
+        self._ordered_ids = list(self.tasks)
+        self._index_tasks(tasks)
+
+    def _response(self, task_id: int) -> TaskResponse:
+        """Return the cached response model for a stored task, building it on a miss"""
+        response = self._responses.get(task_id)
+        if response is None:
+            response = TaskResponse(**self.tasks[task_id].as_dict())
+            self._responses.put(task_id, response)
+        return response
+
+    def _publish_tasks(self, action: str, task_ids: List[int]):
+        """Publish one batch of task changes; the caller holds the write lock
+
+        Deletions must publish before the rows are removed.
+        """
+        if self.changes.wants("task") and task_ids:
+            self.changes.publish([Change("task", task_id, action, self._response(task_id))
+                                  for task_id in task_ids])
+
+    def _insert_task(self, task_data: dict, now: datetime, task_id: Optional[int] = None) -> TaskResponse:
+        """Store a new task; the caller must hold the write lock"""
+        task = TaskRecord(
+            self.next_task_id if task_id is None else task_id,
+            task_data["title"],
+            task_data.get("description"),
+            task_data.get("status", TaskStatus.ACTIVE),
+            task_data.get("priority", TaskPriority.MEDIUM),
+            task_data.get("due_date"),
+            intern_tags(task_data.get("tags", ())),
+            now,
+            now
+        )
+        self._store_task(task)
+        # Not cached: a bulk create would push out the tasks being read
+        return TaskResponse(**task.as_dict())
 
     def create_task(self, task_data: dict) -> TaskResponse:
         """Create a new task"""
-        with self.lock:
-            task_id = self.next_task_id
-            self.next_task_id += 1
-
-            now = datetime.now()
-            task = {
-                "id": task_id,
-                "title": task_data["title"],
-                "description": task_data.get("description"),
-                "status": task_data.get("status", TaskStatus.ACTIVE),
-                "priority": task_data.get("priority", TaskPriority.MEDIUM),
-                "due_date": task_data.get("due_date"),
-                "tags": task_data.get("tags", []),
-                "created_at": now,
-                "updated_at": now
-            }
-
-            self.tasks[task_id] = task
-            return TaskResponse(**task)
+        with self.lock.write():
+            response = self._insert_task(task_data, datetime.now())
+            lsn = self._log({"op": "create", "tasks": [self.tasks[response.id].as_dict()]})
+            self._publish_tasks("created", [response.id])
+        self._commit(lsn)
+        return response
+
+    def create_tasks(self,
+                     tasks_data: List[dict],
+                     task_ids: Optional[List[int]] = None,
+                     now: Optional[datetime] = None) -> List[TaskResponse]:
+        """Create many tasks under a single lock acquisition
+
+        task_ids and now are for callers that hand out ids across several
+        databases (ShardedDatabase); ids must follow creation order.
+        """
+        with self.lock.write():
+            if now is None:
+                now = datetime.now()
+            if task_ids is None:
+                responses = [self._insert_task(task_data, now) for task_data in tasks_data]
+            else:
+                responses = [self._insert_task(task_data, now, task_id)
+                             for task_data, task_id in zip(tasks_data, task_ids)]
+            lsn = None
+            if responses:
+                lsn = self._log({"op": "create", "tasks": [self.tasks[r.id].as_dict() for r in responses]})
+                self._publish_tasks("created", [r.id for r in responses])
+        self._commit(lsn)
+        return responses
 
     def get_task(self, task_id: int) -> Optional[TaskResponse]:
         """Get a task by ID"""
-        with self.lock:
-            task = self.tasks.get(task_id)
-            if task:
-                return TaskResponse(**task)
-            return None
+        with self.lock.read():
+            if task_id not in self.tasks:
+                return None
+            return self._response(task_id)
 
     def get_tasks(self,
                   status: Optional[TaskStatus] = None,
                   priority: Optional[TaskPriority] = None,
                   tags: Optional[List[str]] = None,
                   page: int = 1,
-                  page_size: int = 10) -> tuple[List[TaskResponse], int]:
-        """Get tasks with filtering and pagination"""
-        with self.lock:
-            tasks = list(self.tasks.values())
-
-            # Apply filters
-            if status:
-                tasks = [task for task in tasks if task["status"] == status]
-
-            if priority:
-                tasks = [task for task in tasks if task["priority"] == priority]
-
-            if tags:
-                tasks = [task for task in tasks
-                        if any(tag in task["tags"] for tag in tags)]
-
-            # Sort by created_at descending
-            tasks.sort(key=lambda x: x["created_at"], reverse=True)
-
-            total = len(tasks)
-
-            # Apply pagination
-            start = (page - 1) * page_size
-            end = start + page_size
-            paginated_tasks = tasks[start:end]
-
-            return [TaskResponse(**task) for task in paginated_tasks], total
+                  page_size: int = 10,
+                  cursor: Optional[Tuple[datetime, int]] = None,
+                  tag_mode: TagMode = TagMode.ANY) -> tuple[List[TaskResponse], int]:
+        """Get tasks with filtering and pagination
+
+        With a cursor, (created_at, id) of the last task already seen, the
+        page holds the page_size tasks that follow it and page is ignored.
+        tag_mode picks whether tasks need any or all of the tags.
+        """
+        with self.lock.read():
+            page_ids, total = self._page_ids(status, priority, tags, page, page_size, cursor, tag_mode)
+            return [self._response(task_id) for task_id in page_ids], total
+
+    def _page_ids(self,
+                  status: Optional[TaskStatus],
+                  priority: Optional[TaskPriority],
+                  tags: Optional[List[str]],
+                  page: int,
+                  page_size: int,
+                  cursor: Optional[Tuple[datetime, int]],
+                  tag_mode: TagMode) -> Tuple[List[int], int]:
+        """Ids of one page, newest first, and the number of matches; the caller holds the read lock"""
+        # Apply filters through the secondary indexes
+        ids = self._matching_ids(status, priority, tags, tag_mode)
+        total = len(ids)
+
+        # Apply pagination, newest first
+        if cursor is not None:
+            return self._seek_desc(ids, cursor, page_size), total
+        return self._page_desc(ids, page, page_size), total
+
+    def _apply_update(self, task: TaskRecord, update_data: dict, now: datetime):
+        """Apply non-null fields to a stored task and drop its cached response"""
+        task.update(update_data, now)
+        self._responses.pop(task.id)
+
+    def _update_tasks(self, tasks: List[TaskRecord], update_data: dict, now: datetime):
+        """Apply one update to many tasks, reindexing each bucket once"""
+        self._unindex_tasks(tasks)
+        for task in tasks:
+            self._apply_update(task, update_data, now)
+        self._index_tasks(tasks)
+
+    def _delete_ids(self, ids: Set[int]):
+        """Remove many tasks, rebuilding the ordered id list once"""
+        tasks = [self.tasks.pop(task_id) for task_id in ids]
+        for task_id in ids:
+            self._responses.pop(task_id)
+        if self._few(ids, self._ordered_ids):
+            for task_id in ids:
+                self._remove_id(self._ordered_ids, task_id)
+        else:
+            self._ordered_ids = [task_id for task_id in self._ordered_ids
+                                 if task_id not in ids]
+        self._unindex_tasks(tasks)
+
+    @staticmethod
+    def _update_record(ids: List[int], update_data: dict, now: datetime) -> dict:
+        fields = {field: value for field, value in update_data.items() if value is not None}
+        return {"op": "update", "ids": ids, "fields": fields, "updated_at": now}
 
     def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]:
-        """Update a task"""
-        with self.lock:
+        """Update a task, returning None if it does not exist"""
+        with self.lock.write():
             if task_id not in self.tasks:
                 return None
 
             task = self.tasks[task_id]
-
-            # Update fields
-            for field, value in update_data.items():
-                if value is not None:
-                    task[field] = value
-
-            task["updated_at"] = datetime.now()
-
-            return TaskResponse(**task)
+            now = datetime.now()
+            self._unindex_task(task)
+            self._apply_update(task, update_data, now)
+            self._index_task(task)
+            response = self._response(task_id)
+            lsn = self._log(self._update_record([task_id], update_data, now))
+            self._publish_tasks("updated", [task_id])
+        self._commit(lsn)
+        return response
+
+    def update_tasks_where(self,
+                           update_data: dict,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Update every task matching the filters, returning how many changed"""
+        with self.lock.write():
+            ids = list(self._matching_ids(status, priority, tags, tag_mode))
+            now = datetime.now()
+            self._update_tasks([self.tasks[task_id] for task_id in ids], update_data, now)
+            lsn = self._log(self._update_record(ids, update_data, now)) if ids else None
+            self._publish_tasks("updated", ids)
+        self._commit(lsn)
+        return len(ids)
 
     def delete_task(self, task_id: int) -> bool:
-        """Delete a task"""
-        with self.lock:
-            if task_id in self.tasks:
-                del self.tasks[task_id]
-                return True
-            return False
+        """Delete a task, returning False if it does not exist"""
+        with self.lock.write():
+            if task_id not in self.tasks:
+                return False
+            self._publish_tasks("deleted", [task_id])
+            task = self.tasks.pop(task_id)
+            self._responses.pop(task_id)
+            self._remove_id(self._ordered_ids, task_id)
+            self._unindex_task(task)
+            lsn = self._log({"op": "delete", "ids": [task_id]})
+        self._commit(lsn)
+        return True
+
+    def delete_tasks_where(self,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Delete every task matching the filters, returning how many were removed"""
+        with self.lock.write():
+            ids = set(self._matching_ids(status, priority, tags, tag_mode))
+            self._publish_tasks("deleted", sorted(ids))
+            self._delete_ids(ids)
+            lsn = self._log({"op": "delete", "ids": sorted(ids)}) if ids else None
+        self._commit(lsn)
+        return len(ids)
+
+    def _apply_record(self, record: dict):
+        """Replay one write-ahead log record"""
+        op = record["op"]
+        if op == "create":
+            for task in record["tasks"]:
+                self._store_task(TaskRecord.from_dict(decode_task_fields(task)))
+        elif op == "update":
+            tasks = [self.tasks[task_id] for task_id in record["ids"]]
+            updated_at = datetime.fromisoformat(record["updated_at"])
+            self._update_tasks(tasks, decode_task_fields(record["fields"]), updated_at)
+        elif op == "delete":
+            self._delete_ids(set(record["ids"]))
+        elif op == "clear":
+            self._clear_tasks()
+        else:
+            raise ValueError(f"Unknown write-ahead log operation: {op!r}")
 
     def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]:
         """Get tasks filtered by status"""
-        with self.lock:
-            tasks = [task for task in self.tasks.values()
-                    if task["status"] == status]
-            tasks.sort(key=lambda x: x["created_at"], reverse=True)
-            return [TaskResponse(**task) for task in tasks]
+        with self.lock.read():
+            ids = self._status_index.get(status, [])
+            return [self._response(task_id) for task_id in reversed(ids)]
+
+    def _index_counts(self) -> dict:
+        """Read task counts off the index bucket sizes"""
+        return {
+            "total": len(self.tasks),
+            "active": len(self._status_index.get(TaskStatus.ACTIVE, ())),
+            "completed": len(self._status_index.get(TaskStatus.COMPLETED, ())),
+            "archived": len(self._status_index.get(TaskStatus.ARCHIVED, ())),
+            "by_priority": {priority.value: len(self._priority_index.get(priority, ()))
+                            for priority in TaskPriority},
+            "by_tag": {tag: len(bitmap) for tag, bitmap in self._tag_index.items()}
+        }
+
+    def _recount(self) -> dict:
+        """Count tasks from scratch with a full pass over the table"""
+        statuses = Counter(task.status for task in self.tasks.values())
+        priorities = Counter(task.priority for task in self.tasks.values())
+        tags = Counter(tag for task in self.tasks.values() for tag in task.tags)
+        return {
+            "total": len(self.tasks),
+            "active": statuses.get(TaskStatus.ACTIVE, 0),
+            "completed": statuses.get(TaskStatus.COMPLETED, 0),
+            "archived": statuses.get(TaskStatus.ARCHIVED, 0),
+            "by_priority": {priority.value: priorities.get(priority, 0)
+                            for priority in TaskPriority},
+            "by_tag": dict(tags)
+        }
 
     def get_task_statistics(self) -> dict:
-        """Get task statistics"""
-        with self.lock:
-            total = len(self.tasks)
-            active = sum(1 for task in self.tasks.values()
-                        if task["status"] == TaskStatus.ACTIVE)
-            completed = sum(1 for task in self.tasks.values()
-                           if task["status"] == TaskStatus.COMPLETED)
-            archived = sum(1 for task in self.tasks.values()
-                          if task["status"] == TaskStatus.ARCHIVED)
-
-            return {
-                "total": total,
-                "active": active,
-                "completed": completed,
-                "archived": archived
-            }
-
-    def create_background_task(self, task_id: str, message: str) -> BackgroundTaskStatus:
+        """Get task statistics
+
+        The index buckets are kept current by every mutation, so their sizes
+        double as counters and this does not scan the task table.
+        """
+        with self.lock.read():
+            return self._index_counts()
+
+    def check_task_statistics(self) -> dict:
+        """Recompute task statistics from scratch and compare them to the counters"""
+        with self.lock.read():
+            counters = self._index_counts()
+            actual = self._recount()
+
+        mismatches = {}
+        for key in ("total", "active", "completed", "archived"):
+            if counters[key] != actual[key]:
+                mismatches[key] = {"counter": counters[key], "actual": actual[key]}
+        for group in ("by_priority", "by_tag"):
+            for key in counters[group].keys() | actual[group].keys():
+                counted = counters[group].get(key, 0)
+                recounted = actual[group].get(key, 0)
+                if counted != recounted:
+                    mismatches[f"{group}.{key}"] = {"counter": counted, "actual": recounted}
+
+        return {
+            "consistent": not mismatches,
+            "mismatches": mismatches
+        }
+
+    def create_background_task(self, task_id: str, message: str,
+                               status: str = "running") -> BackgroundTaskStatus:
         """Create a background task entry"""
-        with self.lock:
+        with self.background_lock.write():
             bg_task = BackgroundTaskStatus(
                 task_id=task_id,
-                status="running",
+                status=status,
                 progress=0,
                 message=message,
                 started_at=datetime.now()
             )
             self.background_tasks[task_id] = bg_task
+            self._finished.pop(task_id, None)
+            if self.changes.wants("background_task"):
+                self.changes.publish([Change("background_task", task_id, "created", bg_task)])
             return bg_task
 
     def update_background_task(self, task_id: str, status: str,
                              progress: int, message: str,
                              result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]:
         """Update a background task"""
-        with self.lock:
+        with self.background_lock.write():
             if task_id not in self.background_tasks:
                 return None
 
-            bg_task = self.background_tasks[task_id]
-            bg_task.status = status
-            bg_task.progress = progress
-            bg_task.message = message
-            bg_task.result = result
-
-            if status in ["completed", "failed"]:
-                bg_task.completed_at = datetime.now()
-
+            # Readers serialize stored models without the lock, so an update
+            # swaps in a new model instead of changing fields one by one
+            update = {"status": status, "progress": progress, "message": message, "result": result}
+            if status in FINISHED_STATUSES:
+                update["completed_at"] = datetime.now()
+                self._finished[task_id] = None
+                self._finished.move_to_end(task_id)
+            else:
+                self._finished.pop(task_id, None)
+            bg_task = self.background_tasks[task_id] = self.background_tasks[task_id].model_copy(update=update)
+
+            if self.changes.wants("background_task"):
+                self.changes.publish([Change("background_task", task_id, "updated", bg_task)])
             return bg_task
 
     def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]:
         """Get a background task status"""
-        with self.lock:
+        # The background lock is exclusive, so a read may reorder the LRU
+        with self.background_lock.read():
+            if task_id in self._finished:
+                self._finished.move_to_end(task_id)
             return self.background_tasks.get(task_id)
 
+    def get_background_tasks(self,
+                             status: Optional[str] = None,
+                             page: int = 1,
+                             page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]:
+        """Get one page of background tasks, oldest first, and the total number of matches"""
+        start = (page - 1) * page_size
+        with self.background_lock.read():
+            if status is None:
+                total = len(self.background_tasks)
+                return list(islice(self.background_tasks.values(), start, start + page_size)), total
+            matches = [bg_task for bg_task in self.background_tasks.values() if bg_task.status == status]
+        return matches[start:start + page_size], len(matches)
+
+    def evict_background_tasks(self,
+                               finished_before: Optional[datetime] = None,
+                               keep_finished: Optional[int] = None) -> int:
+        """Remove finished background tasks, returning how many were removed
+
+        Drops those completed before finished_before, then the least
+        recently used beyond keep_finished. Queued and running tasks stay.
+        """
+        with self.background_lock.write():
+            evicted = []
+            if finished_before is not None:
+                evicted = [task_id for task_id in self._finished
+                           if self.background_tasks[task_id].completed_at < finished_before]
+                for task_id in evicted:
+                    del self._finished[task_id]
+            if keep_finished is not None:
+                while len(self._finished) > keep_finished:
+                    evicted.append(self._finished.popitem(last=False)[0])
+            removed = [self.background_tasks.pop(task_id) for task_id in evicted]
+            if removed and self.changes.wants("background_task"):
+                self.changes.publish([Change("background_task", bg_task.task_id, "deleted", bg_task)
+                                      for bg_task in removed])
+            return len(removed)
+
+    def get_lock_statistics(self) -> dict:
+        """Get lock acquisition counts and wait times"""
+        return {
+            "mode": self.lock.mode,
+            "tasks": self.lock.stats(),
+            "background_tasks": self.background_lock.stats()
+        }
+
+    def _clear_tasks(self):
+        self.tasks.clear()
+        self._responses.clear()
+        self._ordered_ids.clear()
+        self._status_index.clear()
+        self._priority_index.clear()
+        self._tag_index.clear()
+        self.next_task_id = 1
+
     def clear_all(self):
         """Clear all data (for testing)"""
-        with self.lock:
-            self.tasks.clear()
+        with self.lock.write(), self.background_lock.write():
+            self._clear_tasks()
             self.background_tasks.clear()
-            self.next_task_id = 1
-
-
-# Global database instance
-db = InMemoryDatabase()
-
-
-def get_database():
-    """Get the database instance"""
-    return db
\ No newline at end of file
+            self._finished.clear()
+            lsn = self._log({"op": "clear"})
+        self._commit(lsn)
+
+    def snapshot(self, path: str):
+        """Write a snapshot of the task table and drop the log records it covers
+
+        Writers are paused only while rows are copied out; encoding and
+        writing the file happen after the lock is released. Record fields
+        are replaced rather than mutated, so the shallow copy is stable.
+        """
+        with self.lock.read():
+            tasks = self.tasks
+            rows = [capture_task(tasks[task_id]) for task_id in self._ordered_ids]
+            next_task_id = self.next_task_id
+            lsn = 0
+            if self.wal is not None:
+                lsn = self.wal.lsn
+                self.wal.rotate()
+
+        write_snapshot(path, lsn, next_task_id, rows)
+        if self.wal is not None:
+            self.wal.discard_rotated()
+
+    def close(self):
+        """Flush and close the write-ahead log, if any"""
+        if self.wal is not None:
+            with self.lock.write():
+                self.wal.close()
+
+
+def create_database() -> TaskStore:
+    """Build the database described by the settings
+
+    database_url selects SQLite (sqlite:///<path>); otherwise tasks live in
+    memory, optionally sharded and backed by a write-ahead log and snapshots.
+    """
+    if settings.database_url:
+        return SQLiteDatabase(sqlite_path(settings.database_url), mmap_size_mb=settings.sqlite_mmap_size_mb)
+
+    database_class = InMemoryDatabase
+    if settings.database_engine == "columnar":
+        # Imported here: the columnar engine extends InMemoryDatabase
+        from app.database.columnar import ColumnarDatabase
+        database_class = ColumnarDatabase
+    elif settings.database_engine != "rows":
+        raise ValueError(f"Unknown database engine: {settings.database_engine!r} (expected 'rows' or 'columnar')")
+
+    # Imported here: the sharded store is built from InMemoryDatabase
+    from app.database.sharded import ShardedDatabase, check_shard_count
+    if settings.database_shards > 1:
+        return ShardedDatabase(
+            shards=settings.database_shards,
+            lock_mode=settings.database_lock_mode,
+            wal_path=settings.wal_path,
+            wal_fsync_mode=settings.wal_fsync_mode,
+            wal_fsync_interval=settings.wal_fsync_interval_ms / 1000,
+            snapshot_path=settings.snapshot_path,
+            response_cache_size=settings.response_cache_size,
+            database_class=database_class
+        )
+
+    for path in (settings.wal_path, settings.snapshot_path):
+        if path:
+            check_shard_count(path, 1)
+
+    wal = None
+    if settings.wal_path:
+        wal = WriteAheadLog(
+            settings.wal_path,
+            fsync_mode=settings.wal_fsync_mode,
+            fsync_interval=settings.wal_fsync_interval_ms / 1000
+        )
+    return database_class(
+        lock_mode=settings.database_lock_mode,
+        wal=wal,
+        snapshot_path=settings.snapshot_path,
+        response_cache_size=settings.response_cache_size
+    )
+
+
+# Global database instance, built on first use: importing this module (as
+# spawned CPU-pool processes do) must not replay the log or open it for append
+_db: Optional[TaskStore] = None
+_db_lock = threading.Lock()
+
+
+def get_database() -> TaskStore:
+    """Get the database instance, creating it on first use"""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = create_database()
+    return _db
@@ -0,0 +1,141 @@
+"""
+Change notifications published by the stores
+"""
+import asyncio
+import threading
+from typing import Callable, Collection, FrozenSet, List, NamedTuple, Optional, Tuple, Union
+
+from pydantic import BaseModel
+
+
+class Change(NamedTuple):
+    """One committed change to a task or background task"""
+    kind: str  # "task" or "background_task"
+    key: Union[int, str]  # task id or background task id
+    action: str  # "created", "updated" or "deleted"
+    data: BaseModel  # state after the change; the last state for a deletion
+
+
+# Every kind of change a store publishes
+KINDS = ("task", "background_task")
+
+
+class SlowConsumer(Exception):
+    """Raised by Subscription.get once more changes piled up than its limit allows"""
+
+
+class ChangeFeed:
+    """Fan-out of store changes to in-process subscribers
+
+    Each mutation publishes its changes as one batch of a single kind (a
+    bulk update is one batch of many). Stores publish while still holding
+    the lock that ordered the mutation, so every subscriber sees one key's
+    changes in commit order. Callbacks run on the publishing thread and
+    must only hand the batch off. Subscribers name the kinds they want, and
+    stores ask wants(kind) first so they skip building changes nobody
+    reads: a job watcher must not make every task write build responses.
+    """
+
+    def __init__(self):
+        self._subscribers: List[Tuple[Callable[[List[Change]], None], FrozenSet[str]]] = []
+        self._kinds: FrozenSet[str] = frozenset()
+        self._lock = threading.Lock()
+
+    def wants(self, kind: str) -> bool:
+        """Whether any subscriber takes changes of this kind"""
+        return kind in self._kinds
+
+    def subscribe(self, callback: Callable[[List[Change]], None],
+                  kinds: Collection[str] = KINDS) -> Callable[[], None]:
+        """Call callback with every published batch of the given kinds; returns the unsubscribe function"""
+        with self._lock:
+            self._set_subscribers([*self._subscribers, (callback, frozenset(kinds))])
+
+        def unsubscribe():
+            with self._lock:
+                self._set_subscribers([subscriber for subscriber in self._subscribers
+                                       if subscriber[0] is not callback])
+
+        return unsubscribe
+
+    def _set_subscribers(self, subscribers: List[Tuple[Callable[[List[Change]], None], FrozenSet[str]]]):
+        """Replace the subscriber list; the caller holds the lock"""
+        self._subscribers = subscribers
+        self._kinds = frozenset().union(*(kinds for _, kinds in subscribers))
+
+    def publish(self, changes: List[Change]):
+        # Subscribing replaces the list, so iterating a snapshot needs no lock
+        kind = changes[0].kind
+        for callback, kinds in self._subscribers:
+            if kind in kinds:
+                callback(changes)
+
+
+class Subscription:
+    """Changes matching a predicate, queued for the event loop that subscribed
+
+    With a limit, a consumer that lets more than that many changes pile up
+    while it is busy elsewhere (sending the last batch, say) is cut off with
+    SlowConsumer rather than buffering without bound. Changes arriving while
+    it waits in get(), or while nothing is pending, are always accepted: it
+    takes them all at once, so one mutation touching more tasks than the
+    limit does not cut off a consumer that keeps up. Only changes of the
+    given kinds reach accept. Use as a context manager so the feed drops
+    the subscription on exit.
+    """
+
+    def __init__(self, feed: ChangeFeed, accept: Callable[[Change], bool], limit: Optional[int] = None,
+                 kinds: Collection[str] = KINDS):
+        self._loop = asyncio.get_running_loop()
+        self._accept = accept
+        self.limit = limit
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._buffered = 0
+        self._waiting = False
+        self.overflowed = False
+        self._unsubscribe = feed.subscribe(self._deliver, kinds)
+
+    def _deliver(self, changes: List[Change]):
+        """Runs on the publishing thread"""
+        matched = [change for change in changes if self._accept(change)]
+        if matched:
+            try:
+                self._loop.call_soon_threadsafe(self._buffer, matched)
+            except RuntimeError:
+                pass  # the loop has closed
+
+    def _buffer(self, changes: List[Change]):
+        """Runs on the subscriber's loop"""
+        if self.overflowed:
+            return
+        if (self.limit is not None and self._buffered and not self._waiting
+                and self._buffered + len(changes) > self.limit):
+            self.overflowed = True
+            self._unsubscribe()
+            self._queue.put_nowait([])  # wake the consumer to find out
+            return
+        self._buffered += len(changes)
+        self._queue.put_nowait(changes)
+
+    async def get(self) -> List[Change]:
+        """Wait for matching changes and take every one queued so far, oldest first"""
+        self._waiting = True
+        try:
+            changes = list(await self._queue.get())
+        finally:
+            self._waiting = False
+        while not self._queue.empty():
+            changes.extend(self._queue.get_nowait())
+        if self.overflowed:
+            raise SlowConsumer(f"More than {self.limit} changes waiting to be sent")
+        self._buffered -= len(changes)
+        return changes
+
+    def close(self):
+        self._unsubscribe()
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,187 @@
+"""
+Instrumented locks for the in-memory database
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class WouldBlock(Exception):
+    """Raised instead of waiting for a lock inside nonblocking()"""
+
+
+class _State(threading.local):
+    nonblocking = False
+
+
+_state = _State()
+
+
+@contextmanager
+def nonblocking() -> Iterator[None]:
+    """Make lock acquisitions on this thread raise WouldBlock rather than wait
+
+    Lets a caller that must not stall (the event loop) try a read and hand
+    it to a thread when the lock is busy.
+    """
+    _state.nonblocking = True
+    try:
+        yield
+    finally:
+        _state.nonblocking = False
+
+
+class LockStats:
+    """Acquisition count and wait time for one lock mode
+
+    Only updated while the owning lock's internal state is protected, so no
+    extra synchronisation is needed.
+    """
+
+    __slots__ = ("acquisitions", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.acquisitions = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, waited: float):
+        self.acquisitions += 1
+        self.total_wait += waited
+        if waited > self.max_wait:
+            self.max_wait = waited
+
+    def as_dict(self) -> dict:
+        return {
+            "acquisitions": self.acquisitions,
+            "total_wait_ms": round(self.total_wait * 1000, 3),
+            "avg_wait_us": round(self.total_wait / self.acquisitions * 1e6, 3) if self.acquisitions else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 3)
+        }
+
+
+class _Guard:
+    """Context manager binding an acquire/release pair"""
+
+    __slots__ = ("_acquire", "_release")
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._release()
+
+
+class ExclusiveLock:
+    """Single mutex shared by readers and writers"""
+
+    mode = "exclusive"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"read": LockStats(), "write": LockStats()}
+        self._read_guard = _Guard(self._acquire_read, self._lock.release)
+        self._write_guard = _Guard(self._acquire_write, self._lock.release)
+
+    def _acquire(self, stats: LockStats):
+        start = time.perf_counter()
+        if not self._lock.acquire(blocking=False):
+            if _state.nonblocking:
+                raise WouldBlock
+            self._lock.acquire()
+        stats.record(time.perf_counter() - start)
+
+    def _acquire_read(self):
+        self._acquire(self._stats["read"])
+
+    def _acquire_write(self):
+        self._acquire(self._stats["write"])
+
+    def read(self) -> _Guard:
+        """Hold the lock for reading"""
+        return self._read_guard
+
+    def write(self) -> _Guard:
+        """Hold the lock for writing"""
+        return self._write_guard
+
+    def stats(self) -> Dict[str, dict]:
+        """Return wait statistics per lock mode"""
+        return {name: stats.as_dict() for name, stats in self._stats.items()}
+
+    def reset_stats(self):
+        """Zero the wait statistics"""
+        self._stats["read"].__init__()
+        self._stats["write"].__init__()
+
+
+class ReadWriteLock(ExclusiveLock):
+    """Many concurrent readers or one writer
+
+    Writers are preferred: once a writer is waiting, new readers queue behind
+    it so a steady read load cannot starve mutations.
+    """
+
+    mode = "rw"
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._read_guard = _Guard(self._acquire_read, self._release_read)
+        self._write_guard = _Guard(self._acquire_write, self._release_write)
+
+    def _acquire_read(self):
+        start = time.perf_counter()
+        with self._cond:
+            if _state.nonblocking and (self._writer or self._waiting_writers):
+                raise WouldBlock
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+            self._stats["read"].record(time.perf_counter() - start)
+
+    def _release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def _acquire_write(self):
+        start = time.perf_counter()
+        with self._cond:
+            if _state.nonblocking and (self._writer or self._readers):
+                raise WouldBlock
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+            self._stats["write"].record(time.perf_counter() - start)
+
+    def _release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+
+LOCK_MODES = {
+    ExclusiveLock.mode: ExclusiveLock,
+    ReadWriteLock.mode: ReadWriteLock
+}
+
+
+def make_lock(mode: str) -> ExclusiveLock:
+    """Create a lock for the given mode ("exclusive" or "rw")"""
+    try:
+        return LOCK_MODES[mode]()
+    except KeyError:
+        raise ValueError(f"Unknown lock mode: {mode!r} (expected one of {sorted(LOCK_MODES)})")
@@ -0,0 +1,81 @@
+"""
+Compact in-memory task rows
+"""
+import sys
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from app.models.task_models import TaskStatus, TaskPriority
+
+# Stored task fields, in snapshot row order
+FIELDS = ("id", "title", "description", "status", "priority",
+          "due_date", "tags", "created_at", "updated_at")
+
+
+def intern_tags(tags: Iterable[str]) -> Tuple[str, ...]:
+    """Store tags as a tuple of interned strings, each tag once
+
+    A tag appears on many tasks; interning keeps one string per distinct
+    tag instead of one per task that carries it. Repeats are dropped
+    (first position wins) so per-tag counts match the tag index.
+    """
+    return tuple(sys.intern(tag) for tag in dict.fromkeys(tags))
+
+
+class TaskRecord:
+    """One stored task
+
+    Slots instead of a per-task dict: the nine fields sit in a fixed
+    array, with no hash table and no per-instance key storage. Status and
+    priority are shared enum members and tasks created together share one
+    timestamp object, so neither costs anything per task.
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self,
+                 id: int,
+                 title: str,
+                 description: Optional[str],
+                 status: TaskStatus,
+                 priority: TaskPriority,
+                 due_date: Optional[datetime],
+                 tags: Tuple[str, ...],
+                 created_at: datetime,
+                 updated_at: datetime):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.status = status
+        self.priority = priority
+        self.due_date = due_date
+        self.tags = tags
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_dict(cls, task: dict) -> "TaskRecord":
+        """Build a record from a complete task dict"""
+        return cls(task["id"], task["title"], task["description"], task["status"], task["priority"],
+                   task["due_date"], intern_tags(task["tags"]), task["created_at"], task["updated_at"])
+
+    def as_dict(self) -> dict:
+        """The task as a field -> value dict, for response models and log records"""
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": self.status,
+            "priority": self.priority,
+            "due_date": self.due_date,
+            "tags": self.tags,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at
+        }
+
+    def update(self, fields: dict, now: datetime):
+        """Apply non-null fields and stamp updated_at"""
+        for field, value in fields.items():
+            if value is not None:
+                setattr(self, field, intern_tags(value) if field == "tags" else value)
+        self.updated_at = now
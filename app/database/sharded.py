@@ -0,0 +1,307 @@
+"""
+Hash-sharded task store built from independent in-memory databases
+"""
+import heapq
+import itertools
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+
+from app.database.database import InMemoryDatabase
+from app.database.events import ChangeFeed
+from app.database.locks import LockStats
+from app.database.wal import WriteAheadLog
+from app.models.task_models import TaskResponse, TaskStatus, TaskPriority, TagMode, BackgroundTaskStatus
+
+
+def _newest_first(task: TaskResponse) -> int:
+    # Ids are handed out together with created_at, so id order is creation order
+    return task.id
+
+
+def shard_path(path: str, index: int) -> str:
+    """File used by one shard for a store-wide WAL or snapshot path"""
+    return f"{path}.shard{index}"
+
+
+def check_shard_count(path: str, shards: int):
+    """Refuse a WAL or snapshot path written with a different shard count
+
+    Tasks are routed to shards by id, so reopening the files under another
+    count would look tasks up in the wrong shard. A sharded store records
+    its count in <path>.shards; files from before that existed are counted
+    by their .shard<N> suffixes, and a plain <path> means one shard.
+    """
+    manifest = f"{path}.shards"
+    if os.path.exists(manifest):
+        with open(manifest) as f:
+            recorded = int(f.read())
+    else:
+        directory, name = os.path.split(os.path.abspath(path))
+        suffix = re.compile(re.escape(name) + r"\.shard(\d+)")
+        # A directory that does not exist yet holds no files to count
+        names = os.listdir(directory) if os.path.isdir(directory) else []
+        indexes = [int(match.group(1)) for match in map(suffix.fullmatch, names) if match]
+        recorded = max(indexes) + 1 if indexes else (1 if os.path.exists(path) else None)
+    if recorded is not None and recorded != shards:
+        raise ValueError(f"{path} was written with {recorded} shard(s) but database_shards is {shards}; "
+                         f"start with database_shards={recorded} or move the files away")
+    if shards > 1 and not os.path.exists(manifest):
+        os.makedirs(os.path.dirname(os.path.abspath(manifest)), exist_ok=True)
+        with open(f"{manifest}.tmp", "w") as f:
+            f.write(str(shards))
+        os.replace(f"{manifest}.tmp", manifest)
+
+
+class ShardedDatabase:
+    """Tasks partitioned by id across independent InMemoryDatabase shards
+
+    Each shard (an InMemoryDatabase, or a subclass such as the columnar
+    engine) has its own lock, indexes and (optionally) write-ahead log
+    and snapshot, so operations on different shards never contend. Single
+    task operations go to one shard; queries fan out and merge. A query
+    locks one shard at a time, so it may observe a write on one shard and
+    not yet on another.
+    """
+
+    inline_methods = InMemoryDatabase.inline_methods
+
+    def __init__(self,
+                 shards: int = 4,
+                 lock_mode: str = "rw",
+                 wal_path: Optional[str] = None,
+                 wal_fsync_mode: str = "interval",
+                 wal_fsync_interval: float = 0.05,
+                 snapshot_path: Optional[str] = None,
+                 response_cache_size: int = 10_000,
+                 database_class: Type[InMemoryDatabase] = InMemoryDatabase):
+        if shards < 1:
+            raise ValueError("A sharded database needs at least one shard")
+        for path in (wal_path, snapshot_path):
+            if path:
+                check_shard_count(path, shards)
+        self.shards: List[InMemoryDatabase] = [
+            database_class(
+                lock_mode=lock_mode,
+                wal=WriteAheadLog(shard_path(wal_path, index), wal_fsync_mode, wal_fsync_interval)
+                if wal_path else None,
+                snapshot_path=shard_path(snapshot_path, index) if snapshot_path else None,
+                # The cache size is for the whole store
+                response_cache_size=-(-response_cache_size // shards)
+            )
+            for index in range(shards)
+        ]
+
+        # One feed for the whole store: every shard publishes into it
+        self.changes = ChangeFeed()
+        for shard in self.shards:
+            shard.changes = self.changes
+
+        # Ids and created_at are assigned together so id order stays
+        # creation order across shards
+        self._id_lock = threading.Lock()
+        self.next_task_id = max(shard.next_task_id for shard in self.shards)
+
+    def _shard(self, task_id: int) -> InMemoryDatabase:
+        return self.shards[task_id % len(self.shards)]
+
+    def _allocate(self, count: int) -> Tuple[List[int], datetime]:
+        with self._id_lock:
+            first = self.next_task_id
+            self.next_task_id += count
+            return list(range(first, first + count)), datetime.now()
+
+    @property
+    def version(self) -> int:
+        """Total mutations across shards; lets the snapshotter skip idle periods"""
+        return sum(shard.version for shard in self.shards)
+
+    def create_task(self, task_data: dict) -> TaskResponse:
+        """Create a new task"""
+        (task_id,), now = self._allocate(1)
+        return self._shard(task_id).create_tasks([task_data], task_ids=[task_id], now=now)[0]
+
+    def create_tasks(self, tasks_data: List[dict]) -> List[TaskResponse]:
+        """Create many tasks, one batch per shard"""
+        if not tasks_data:
+            return []
+        task_ids, now = self._allocate(len(tasks_data))
+        batches: Dict[int, Tuple[list, list]] = defaultdict(lambda: ([], []))
+        for task_data, task_id in zip(tasks_data, task_ids):
+            data, ids = batches[task_id % len(self.shards)]
+            data.append(task_data)
+            ids.append(task_id)
+
+        created = {}
+        for index, (data, ids) in batches.items():
+            for response in self.shards[index].create_tasks(data, task_ids=ids, now=now):
+                created[response.id] = response
+        return [created[task_id] for task_id in task_ids]
+
+    def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        """Get a task by ID"""
+        return self._shard(task_id).get_task(task_id)
+
+    def get_tasks(self,
+                  status: Optional[TaskStatus] = None,
+                  priority: Optional[TaskPriority] = None,
+                  tags: Optional[List[str]] = None,
+                  page: int = 1,
+                  page_size: int = 10,
+                  cursor: Optional[Tuple[datetime, int]] = None,
+                  tag_mode: TagMode = TagMode.ANY) -> tuple[List[TaskResponse], int]:
+        """Get tasks with filtering and pagination
+
+        Every shard returns the ids of its newest matches up to the end of
+        the requested page; a k-way merge of those sorted runs picks the
+        page's ids, and only those become response models. A task deleted
+        between the two steps is left out of the page.
+        """
+        if cursor is not None:
+            skip, limit = 0, page_size
+        else:
+            skip, limit = (page - 1) * page_size, page * page_size
+
+        runs, total = [], 0
+        for shard in self.shards:
+            with shard.lock.read():
+                ids, count = shard._page_ids(status, priority, tags, 1, limit, cursor, tag_mode)
+            runs.append(ids)
+            total += count
+
+        # Descending ids are newest first (see _newest_first)
+        page_ids = list(itertools.islice(heapq.merge(*runs, reverse=True), skip, limit))
+        by_shard: Dict[int, List[int]] = defaultdict(list)
+        for task_id in page_ids:
+            by_shard[task_id % len(self.shards)].append(task_id)
+        responses = {}
+        for index, ids in by_shard.items():
+            shard = self.shards[index]
+            with shard.lock.read():
+                responses.update((task_id, shard._response(task_id)) for task_id in ids if task_id in shard.tasks)
+        return [responses[task_id] for task_id in page_ids if task_id in responses], total
+
+    def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]:
+        """Get tasks filtered by status"""
+        runs = [shard.get_tasks_by_status(status) for shard in self.shards]
+        return list(heapq.merge(*runs, key=_newest_first, reverse=True))
+
+    def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]:
+        """Update a task, returning None if it does not exist"""
+        return self._shard(task_id).update_task(task_id, update_data)
+
+    def update_tasks_where(self,
+                           update_data: dict,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Update every task matching the filters, returning how many changed"""
+        return sum(shard.update_tasks_where(update_data, status=status, priority=priority, tags=tags,
+                                            tag_mode=tag_mode)
+                   for shard in self.shards)
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task, returning False if it does not exist"""
+        return self._shard(task_id).delete_task(task_id)
+
+    def delete_tasks_where(self,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Delete every task matching the filters, returning how many were removed"""
+        return sum(shard.delete_tasks_where(status=status, priority=priority, tags=tags, tag_mode=tag_mode)
+                   for shard in self.shards)
+
+    def get_task_statistics(self) -> dict:
+        """Sum the per-shard counters"""
+        totals = Counter()
+        by_priority, by_tag = Counter(), Counter()
+        for shard in self.shards:
+            stats = shard.get_task_statistics()
+            for key in ("total", "active", "completed", "archived"):
+                totals[key] += stats[key]
+            by_priority.update(stats["by_priority"])
+            by_tag.update(stats["by_tag"])
+        return {
+            **{key: totals[key] for key in ("total", "active", "completed", "archived")},
+            "by_priority": {priority.value: by_priority[priority.value] for priority in TaskPriority},
+            "by_tag": dict(by_tag)
+        }
+
+    def check_task_statistics(self) -> dict:
+        """Recount every shard and report mismatches by shard"""
+        mismatches = {}
+        for index, shard in enumerate(self.shards):
+            for key, mismatch in shard.check_task_statistics()["mismatches"].items():
+                mismatches[f"shard{index}.{key}"] = mismatch
+        return {
+            "consistent": not mismatches,
+            "mismatches": mismatches
+        }
+
+    # Background tasks are few and not task data; the first shard holds them
+
+    def create_background_task(self, task_id: str, message: str,
+                               status: str = "running") -> BackgroundTaskStatus:
+        """Create a background task entry"""
+        return self.shards[0].create_background_task(task_id, message, status)
+
+    def update_background_task(self, task_id: str, status: str,
+                               progress: int, message: str,
+                               result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]:
+        """Update a background task"""
+        return self.shards[0].update_background_task(task_id, status, progress, message, result)
+
+    def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]:
+        """Get a background task status"""
+        return self.shards[0].get_background_task(task_id)
+
+    def get_background_tasks(self,
+                             status: Optional[str] = None,
+                             page: int = 1,
+                             page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]:
+        """Get one page of background tasks, oldest first, and the total number of matches"""
+        return self.shards[0].get_background_tasks(status, page, page_size)
+
+    def evict_background_tasks(self,
+                               finished_before: Optional[datetime] = None,
+                               keep_finished: Optional[int] = None) -> int:
+        """Remove expired and least recently used finished background tasks"""
+        return self.shards[0].evict_background_tasks(finished_before, keep_finished)
+
+    def get_lock_statistics(self) -> dict:
+        """Get lock wait statistics summed over the shards and for each shard"""
+        combined = {"read": LockStats(), "write": LockStats()}
+        for shard in self.shards:
+            for name, stats in shard.lock._stats.items():
+                combined[name].acquisitions += stats.acquisitions
+                combined[name].total_wait += stats.total_wait
+                combined[name].max_wait = max(combined[name].max_wait, stats.max_wait)
+        return {
+            "mode": self.shards[0].lock.mode,
+            "tasks": {name: stats.as_dict() for name, stats in combined.items()},
+            "background_tasks": self.shards[0].background_lock.stats(),
+            "shards": [shard.lock.stats() for shard in self.shards]
+        }
+
+    def snapshot(self, path: str):
+        """Snapshot every shard to its own file next to path"""
+        for index, shard in enumerate(self.shards):
+            shard.snapshot(shard_path(path, index))
+
+    def clear_all(self):
+        """Clear all data (for testing)"""
+        with self._id_lock:
+            for shard in self.shards:
+                shard.clear_all()
+            self.next_task_id = 1
+
+    def close(self):
+        """Flush and close every shard's write-ahead log"""
+        for shard in self.shards:
+            shard.close()
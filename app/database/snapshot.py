@@ -0,0 +1,160 @@
+"""
+Binary snapshots of the task table and the background snapshotter
+"""
+import logging
+import marshal
+import mmap
+import operator
+import os
+import struct
+import threading
+from datetime import datetime
+from typing import List, NamedTuple, Optional
+
+from app.database.records import FIELDS, TaskRecord, intern_tags
+from app.models.task_models import TaskStatus, TaskPriority
+
+MAGIC = b"TASKSNAP"
+VERSION = 1
+# magic, version, lsn covered by the snapshot, next task id, row count
+HEADER = struct.Struct("<8sHQQQ")
+
+# Enums are stored as their position in these tuples
+STATUSES = tuple(TaskStatus)
+PRIORITIES = tuple(TaskPriority)
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+_PRIORITY_CODES = {priority: code for code, priority in enumerate(PRIORITIES)}
+
+# Row layout on disk; capture_task copies a stored task in this order
+capture_task = operator.attrgetter(*FIELDS)
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    lsn: int
+    next_task_id: int
+    tasks: List[TaskRecord]
+
+
+def _encode_datetime(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _decode_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+def encode_task(row: tuple) -> tuple:
+    """Pack a row from capture_task into a marshal-friendly tuple"""
+    task_id, title, description, status, priority, due_date, tags, created_at, updated_at = row
+    return (
+        task_id,
+        title,
+        description,
+        _STATUS_CODES[status],
+        _PRIORITY_CODES[priority],
+        _encode_datetime(due_date),
+        tuple(tags),
+        created_at.isoformat(),
+        updated_at.isoformat()
+    )
+
+
+def decode_task(row: tuple) -> TaskRecord:
+    """Unpack a tuple written by encode_task"""
+    task_id, title, description, status, priority, due_date, tags, created_at, updated_at = row
+    return TaskRecord(
+        task_id,
+        title,
+        description,
+        STATUSES[status],
+        PRIORITIES[priority],
+        _decode_datetime(due_date),
+        intern_tags(tags),
+        datetime.fromisoformat(created_at),
+        datetime.fromisoformat(updated_at)
+    )
+
+
+def write_snapshot(path: str, lsn: int, next_task_id: int, rows: List[tuple]):
+    """Atomically write rows from capture_task to path"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as snapshot:
+        snapshot.write(HEADER.pack(MAGIC, VERSION, lsn, next_task_id, len(rows)))
+        marshal.dump([encode_task(row) for row in rows], snapshot)
+        snapshot.flush()
+        os.fsync(snapshot.fileno())
+    os.replace(temp_path, path)
+
+    # Persist the rename itself
+    directory_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(directory_fd)
+    finally:
+        os.close(directory_fd)
+
+
+def read_snapshot(path: str) -> Optional[Snapshot]:
+    """Load a snapshot through mmap, or return None if there is none"""
+    if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+        return None
+
+    with open(path, "rb") as snapshot, \
+            mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, lsn, next_task_id, count = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} task snapshot")
+        # Unmarshal straight from the mapping without copying the file
+        with memoryview(mapped) as view:
+            rows = marshal.loads(view[HEADER.size:])
+
+    if len(rows) != count:
+        raise ValueError(f"{path} is truncated: expected {count} rows, found {len(rows)}")
+    return Snapshot(lsn, next_task_id, [decode_task(row) for row in rows])
+
+
+class Snapshotter:
+    """Background thread that snapshots a database at a fixed interval
+
+    A snapshot is only written when the database changed since the last one.
+    """
+
+    def __init__(self, db, path: str, interval: float):
+        self.db = db
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_version = db.version
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="snapshotter", daemon=True)
+        self._thread.start()
+
+    def snapshot_if_changed(self) -> bool:
+        """Write a snapshot if the database changed; return whether one was written"""
+        version = self.db.version
+        if version == self._last_version:
+            return False
+        self.db.snapshot(self.path)
+        self._last_version = version
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.snapshot_if_changed()
+            except Exception:
+                # Keep the thread alive; the write-ahead log still has everything
+                logger.exception("Snapshot to %s failed", self.path)
+
+    def stop(self, final_snapshot: bool = True):
+        """Stop the thread, optionally writing one last snapshot"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if final_snapshot:
+            self.snapshot_if_changed()
@@ -0,0 +1,616 @@
+"""
+SQLite storage backend with the same interface as InMemoryDatabase
+
+State lives in one database file, so several uvicorn worker processes can
+share it without an external server. Readers in every process map the
+file into memory, and SQLite's WAL index (the -shm file) and file locks
+coordinate them; only writers serialise.
+"""
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from app.database.events import Change, ChangeFeed
+from app.database.locks import ExclusiveLock
+from app.models.task_models import (
+    TaskResponse, TaskStatus, TaskPriority, TagMode, BackgroundTaskStatus, FINISHED_STATUSES
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    due_date TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (priority, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_created_at ON tasks (created_at);
+
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id INTEGER NOT NULL REFERENCES tasks (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (task_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags (tag, task_id);
+
+CREATE TABLE IF NOT EXISTS background_tasks (
+    task_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL,
+    message TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    completed_at TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_background_tasks_status ON background_tasks (status, started_at);
+"""
+
+TASK_COLUMNS = "id, title, description, status, priority, due_date, created_at, updated_at"
+UPDATABLE_FIELDS = ("title", "description", "status", "priority", "due_date")
+
+INSERT_TASK = ("INSERT INTO tasks (title, description, status, priority, due_date, created_at, updated_at) "
+               "VALUES (?, ?, ?, ?, ?, ?, ?)")
+INSERT_TAG = "INSERT INTO task_tags (task_id, position, tag) VALUES (?, ?, ?)"
+DELETE_TAGS = "DELETE FROM task_tags WHERE task_id = ?"
+SELECT_TASK = f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?"
+DELETE_TASK = "DELETE FROM tasks WHERE id = ?"
+
+BACKGROUND_COLUMNS = "task_id, status, progress, message, started_at, completed_at, result"
+BACKGROUND_FINISHED = "status IN (%s)" % ", ".join(f"'{status}'" for status in FINISHED_STATUSES)
+
+# Ids per tag lookup, well under SQLite's host parameter limit
+TAG_BATCH_SIZE = 500
+
+
+def sqlite_path(url: str) -> str:
+    """Extract the file path from a sqlite:/// URL
+
+    Follows the SQLAlchemy convention: sqlite:///tasks.db is relative to
+    the working directory and sqlite:////var/lib/tasks.db is absolute.
+    """
+    prefix = "sqlite:///"
+    if not url.startswith(prefix) or len(url) == len(prefix):
+        raise ValueError(f"Unsupported database URL: {url!r} (expected sqlite:///<path>)")
+    return url[len(prefix):]
+
+
+def _timestamp(value: datetime) -> str:
+    # Fixed width so text order matches time order
+    return value.isoformat(timespec="microseconds")
+
+
+def _optional_datetime(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, (TaskStatus, TaskPriority)) else value
+
+
+class SQLiteDatabase:
+    """SQLite-backed database for storing tasks and background tasks"""
+
+    # Everything else reads or writes the file; AsyncStore offloads it
+    inline_methods = frozenset({"get_lock_statistics"})
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000, mmap_size_mb: int = 256):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        # Reads through a shared memory map of the file instead of copying
+        # pages into each connection's private cache, so every worker
+        # process serves reads from the same OS page cache
+        self.mmap_size_mb = mmap_size_mb
+
+        # sqlite3 connections are not shared between threads; each thread
+        # gets its own, and each connection caches its prepared statements.
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # SQLite allows one writer at a time; queueing writers of this
+        # process here keeps them from spinning on SQLITE_BUSY and records
+        # how long they waited.
+        self.lock = ExclusiveLock()
+
+        # Changes made through this process only; other workers sharing the
+        # file publish to their own feeds
+        self.changes = ChangeFeed()
+
+        with self.lock.write():
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path,
+                isolation_level=None,  # transactions are managed explicitly
+                check_same_thread=False,
+                cached_statements=256
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+            connection.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+            connection.execute(f"PRAGMA mmap_size = {int(self.mmap_size_mb) * 1024 * 1024}")
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a write transaction, taking the database write lock up front"""
+        with self.lock.write():
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _where(status: Optional[TaskStatus] = None,
+               priority: Optional[TaskPriority] = None,
+               tags: Optional[List[str]] = None,
+               tag_mode: TagMode = TagMode.ANY) -> Tuple[List[str], list]:
+        """Build WHERE clauses and parameters for the task filters"""
+        clauses, params = [], []
+        if status:
+            clauses.append("status = ?")
+            params.append(_enum_value(status))
+        if priority:
+            clauses.append("priority = ?")
+            params.append(_enum_value(priority))
+        if tags:
+            # ANY: a task carries at least one requested tag; ALL: every one
+            wanted = sorted(set(tags))
+            placeholders = ", ".join("?" * len(wanted))
+            if tag_mode == TagMode.ALL:
+                clauses.append(f"id IN (SELECT task_id FROM task_tags WHERE tag IN ({placeholders}) "
+                               f"GROUP BY task_id HAVING COUNT(DISTINCT tag) = ?)")
+                params.extend(wanted)
+                params.append(len(wanted))
+            else:
+                clauses.append(f"id IN (SELECT task_id FROM task_tags WHERE tag IN ({placeholders}))")
+                params.extend(wanted)
+        return clauses, params
+
+    @staticmethod
+    def _sql_where(clauses: List[str]) -> str:
+        return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+    def _responses(self, connection: sqlite3.Connection, rows: List[tuple]) -> List[TaskResponse]:
+        """Turn task rows into response models, fetching their tags in one query"""
+        if not rows:
+            return []
+        ids = [row[0] for row in rows]
+        tags: Dict[int, List[str]] = {task_id: [] for task_id in ids}
+        for start in range(0, len(ids), TAG_BATCH_SIZE):
+            batch = ids[start:start + TAG_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            for task_id, tag in connection.execute(
+                    f"SELECT task_id, tag FROM task_tags WHERE task_id IN ({placeholders}) "
+                    f"ORDER BY task_id, position", batch):
+                tags[task_id].append(tag)
+
+        return [
+            TaskResponse(
+                id=task_id,
+                title=title,
+                description=description,
+                status=status,
+                priority=priority,
+                due_date=due_date,
+                tags=tags[task_id],
+                created_at=created_at,
+                updated_at=updated_at
+            )
+            for task_id, title, description, status, priority, due_date, created_at, updated_at in rows
+        ]
+
+    def _fetch_task(self, connection: sqlite3.Connection, task_id: int) -> Optional[TaskResponse]:
+        row = connection.execute(SELECT_TASK, (task_id,)).fetchone()
+        if row is None:
+            return None
+        return self._responses(connection, [row])[0]
+
+    def _fetch_tasks(self, connection: sqlite3.Connection, ids: List[int]) -> List[TaskResponse]:
+        rows = []
+        for start in range(0, len(ids), TAG_BATCH_SIZE):
+            batch = ids[start:start + TAG_BATCH_SIZE]
+            placeholders = ", ".join("?" * len(batch))
+            rows.extend(connection.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders}) ORDER BY id", batch))
+        return self._responses(connection, rows)
+
+    def _publish_tasks(self, action: str, responses: List[TaskResponse]):
+        """Publish one batch of task changes from inside the write transaction"""
+        if self.changes.wants("task") and responses:
+            self.changes.publish([Change("task", response.id, action, response) for response in responses])
+
+    @staticmethod
+    def _insert_tags(connection: sqlite3.Connection, task_id: int, tags: List[str]):
+        connection.executemany(INSERT_TAG, [(task_id, position, tag)
+                                            for position, tag in enumerate(dict.fromkeys(tags))])
+
+    def _insert_task(self, connection: sqlite3.Connection, task_data: dict, now: str) -> int:
+        cursor = connection.execute(INSERT_TASK, (
+            task_data["title"],
+            task_data.get("description"),
+            _enum_value(task_data.get("status", TaskStatus.ACTIVE)),
+            _enum_value(task_data.get("priority", TaskPriority.MEDIUM)),
+            _optional_datetime(task_data.get("due_date")),
+            now,
+            now
+        ))
+        task_id = cursor.lastrowid
+        self._insert_tags(connection, task_id, task_data.get("tags", []))
+        return task_id
+
+    def create_task(self, task_data: dict) -> TaskResponse:
+        """Create a new task"""
+        with self._transaction() as connection:
+            task_id = self._insert_task(connection, task_data, _timestamp(datetime.now()))
+            response = self._fetch_task(connection, task_id)
+            self._publish_tasks("created", [response])
+            return response
+
+    def create_tasks(self, tasks_data: List[dict]) -> List[TaskResponse]:
+        """Create many tasks in a single transaction"""
+        with self._transaction() as connection:
+            now = _timestamp(datetime.now())
+            ids = [self._insert_task(connection, task_data, now) for task_data in tasks_data]
+            if not ids:
+                return []
+            rows = connection.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE id BETWEEN ? AND ? ORDER BY id",
+                (ids[0], ids[-1])
+            ).fetchall()
+            responses = self._responses(connection, rows)
+            self._publish_tasks("created", responses)
+            return responses
+
+    def get_task(self, task_id: int) -> Optional[TaskResponse]:
+        """Get a task by ID"""
+        return self._fetch_task(self._connection(), task_id)
+
+    def get_tasks(self,
+                  status: Optional[TaskStatus] = None,
+                  priority: Optional[TaskPriority] = None,
+                  tags: Optional[List[str]] = None,
+                  page: int = 1,
+                  page_size: int = 10,
+                  cursor: Optional[Tuple[datetime, int]] = None,
+                  tag_mode: TagMode = TagMode.ANY) -> tuple[List[TaskResponse], int]:
+        """Get tasks with filtering and pagination
+
+        With a cursor, (created_at, id) of the last task already seen, the
+        page holds the page_size tasks that follow it and page is ignored.
+        tag_mode picks whether tasks need any or all of the tags.
+        """
+        connection = self._connection()
+        clauses, params = self._where(status, priority, tags, tag_mode)
+
+        # Count and page from one read snapshot
+        connection.execute("BEGIN")
+        try:
+            total = connection.execute(
+                f"SELECT COUNT(*) FROM tasks{self._sql_where(clauses)}", params
+            ).fetchone()[0]
+
+            if cursor is not None:
+                clauses = clauses + ["(created_at, id) < (?, ?)"]
+                params = params + [_timestamp(cursor[0]), cursor[1]]
+                offset = 0
+            else:
+                offset = (page - 1) * page_size
+
+            rows = connection.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks{self._sql_where(clauses)} "
+                f"ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, offset]
+            ).fetchall()
+            return self._responses(connection, rows), total
+        finally:
+            connection.execute("COMMIT")
+
+    def _update_ids(self, connection: sqlite3.Connection, ids: List[int], update_data: dict) -> str:
+        """Apply non-null fields to the given tasks; returns the new updated_at"""
+        now = _timestamp(datetime.now())
+        fields = {field: value for field, value in update_data.items()
+                  if value is not None and field in UPDATABLE_FIELDS}
+        assignments = "".join(f"{field} = ?, " for field in fields)
+        values = [_optional_datetime(value) if field == "due_date" else _enum_value(value)
+                  for field, value in fields.items()]
+        connection.executemany(
+            f"UPDATE tasks SET {assignments}updated_at = ? WHERE id = ?",
+            [(*values, now, task_id) for task_id in ids]
+        )
+
+        tags = update_data.get("tags")
+        if tags is not None:
+            connection.executemany(DELETE_TAGS, [(task_id,) for task_id in ids])
+            connection.executemany(INSERT_TAG, [(task_id, position, tag)
+                                                for task_id in ids
+                                                for position, tag in enumerate(dict.fromkeys(tags))])
+        return now
+
+    def update_task(self, task_id: int, update_data: dict) -> Optional[TaskResponse]:
+        """Update a task, returning None if it does not exist"""
+        with self._transaction() as connection:
+            if connection.execute("SELECT 1 FROM tasks WHERE id = ?", (task_id,)).fetchone() is None:
+                return None
+            self._update_ids(connection, [task_id], update_data)
+            response = self._fetch_task(connection, task_id)
+            self._publish_tasks("updated", [response])
+            return response
+
+    def _matching_ids(self, connection: sqlite3.Connection, status, priority, tags, tag_mode) -> List[int]:
+        clauses, params = self._where(status, priority, tags, tag_mode)
+        return [row[0] for row in connection.execute(
+            f"SELECT id FROM tasks{self._sql_where(clauses)}", params)]
+
+    def update_tasks_where(self,
+                           update_data: dict,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Update every task matching the filters, returning how many changed"""
+        with self._transaction() as connection:
+            ids = self._matching_ids(connection, status, priority, tags, tag_mode)
+            if ids:
+                self._update_ids(connection, ids, update_data)
+                if self.changes.wants("task"):
+                    self._publish_tasks("updated", self._fetch_tasks(connection, ids))
+            return len(ids)
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task, returning False if it does not exist"""
+        with self._transaction() as connection:
+            # Subscribers get the last state, which has to be read first
+            deleted = self._fetch_task(connection, task_id) if self.changes.wants("task") else None
+            # Tag rows go with it through ON DELETE CASCADE
+            if connection.execute(DELETE_TASK, (task_id,)).rowcount == 0:
+                return False
+            if deleted is not None:
+                self._publish_tasks("deleted", [deleted])
+            return True
+
+    def delete_tasks_where(self,
+                           status: Optional[TaskStatus] = None,
+                           priority: Optional[TaskPriority] = None,
+                           tags: Optional[List[str]] = None,
+                           tag_mode: TagMode = TagMode.ANY) -> int:
+        """Delete every task matching the filters, returning how many were removed"""
+        with self._transaction() as connection:
+            clauses, params = self._where(status, priority, tags, tag_mode)
+            if self.changes.wants("task"):
+                ids = self._matching_ids(connection, status, priority, tags, tag_mode)
+                self._publish_tasks("deleted", self._fetch_tasks(connection, ids))
+            return connection.execute(
+                f"DELETE FROM tasks{self._sql_where(clauses)}", params
+            ).rowcount
+
+    def get_tasks_by_status(self, status: TaskStatus) -> List[TaskResponse]:
+        """Get tasks filtered by status"""
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            rows = connection.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks WHERE status = ? ORDER BY created_at DESC, id DESC",
+                (_enum_value(status),)
+            ).fetchall()
+            return self._responses(connection, rows)
+        finally:
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _counts(total: int, statuses: dict, priorities: dict, tags: dict) -> dict:
+        return {
+            "total": total,
+            "active": statuses.get(TaskStatus.ACTIVE.value, 0),
+            "completed": statuses.get(TaskStatus.COMPLETED.value, 0),
+            "archived": statuses.get(TaskStatus.ARCHIVED.value, 0),
+            "by_priority": {priority.value: priorities.get(priority.value, 0)
+                            for priority in TaskPriority},
+            "by_tag": tags
+        }
+
+    def _index_counts(self, connection: sqlite3.Connection) -> dict:
+        """Count tasks through the indexes"""
+        return self._counts(
+            connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0],
+            dict(connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")),
+            dict(connection.execute("SELECT priority, COUNT(*) FROM tasks GROUP BY priority")),
+            dict(connection.execute("SELECT tag, COUNT(*) FROM task_tags GROUP BY tag"))
+        )
+
+    def _recount(self, connection: sqlite3.Connection) -> dict:
+        """Count tasks with full table scans, bypassing the indexes"""
+        return self._counts(
+            connection.execute("SELECT COUNT(*) FROM tasks NOT INDEXED").fetchone()[0],
+            dict(connection.execute("SELECT status, COUNT(*) FROM tasks NOT INDEXED GROUP BY status")),
+            dict(connection.execute("SELECT priority, COUNT(*) FROM tasks NOT INDEXED GROUP BY priority")),
+            dict(connection.execute(
+                "SELECT tag, COUNT(*) FROM task_tags NOT INDEXED "
+                "WHERE task_id IN (SELECT id FROM tasks NOT INDEXED) GROUP BY tag"))
+        )
+
+    def get_task_statistics(self) -> dict:
+        """Get task statistics"""
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            return self._index_counts(connection)
+        finally:
+            connection.execute("COMMIT")
+
+    def check_task_statistics(self) -> dict:
+        """Recount task statistics with table scans and compare them to the indexed counts"""
+        connection = self._connection()
+        connection.execute("BEGIN")
+        try:
+            counters = self._index_counts(connection)
+            actual = self._recount(connection)
+        finally:
+            connection.execute("COMMIT")
+
+        mismatches = {}
+        for key in ("total", "active", "completed", "archived"):
+            if counters[key] != actual[key]:
+                mismatches[key] = {"counter": counters[key], "actual": actual[key]}
+        for group in ("by_priority", "by_tag"):
+            for key in counters[group].keys() | actual[group].keys():
+                counted = counters[group].get(key, 0)
+                recounted = actual[group].get(key, 0)
+                if counted != recounted:
+                    mismatches[f"{group}.{key}"] = {"counter": counted, "actual": recounted}
+
+        return {
+            "consistent": not mismatches,
+            "mismatches": mismatches
+        }
+
+    @staticmethod
+    def _background_task(row: tuple) -> BackgroundTaskStatus:
+        task_id, status, progress, message, started_at, completed_at, result = row
+        return BackgroundTaskStatus(
+            task_id=task_id,
+            status=status,
+            progress=progress,
+            message=message,
+            started_at=started_at,
+            completed_at=completed_at,
+            result=json.loads(result) if result is not None else None
+        )
+
+    def create_background_task(self, task_id: str, message: str,
+                               status: str = "running") -> BackgroundTaskStatus:
+        """Create a background task entry"""
+        bg_task = BackgroundTaskStatus(
+            task_id=task_id,
+            status=status,
+            progress=0,
+            message=message,
+            started_at=datetime.now()
+        )
+        with self._transaction() as connection:
+            connection.execute(
+                f"INSERT INTO background_tasks ({BACKGROUND_COLUMNS}) VALUES (?, ?, ?, ?, ?, NULL, NULL)",
+                (task_id, bg_task.status, bg_task.progress, bg_task.message, _timestamp(bg_task.started_at))
+            )
+            if self.changes.wants("background_task"):
+                self.changes.publish([Change("background_task", task_id, "created", bg_task)])
+        return bg_task
+
+    def update_background_task(self, task_id: str, status: str,
+                             progress: int, message: str,
+                             result: Optional[dict] = None) -> Optional[BackgroundTaskStatus]:
+        """Update a background task"""
+        completed_at = _timestamp(datetime.now()) if status in FINISHED_STATUSES else None
+        with self._transaction() as connection:
+            updated = connection.execute(
+                "UPDATE background_tasks SET status = ?, progress = ?, message = ?, result = ?, "
+                "completed_at = COALESCE(?, completed_at) WHERE task_id = ?",
+                (status, progress, message,
+                 json.dumps(result) if result is not None else None,
+                 completed_at, task_id)
+            ).rowcount
+            if not updated:
+                return None
+            row = connection.execute(
+                f"SELECT {BACKGROUND_COLUMNS} FROM background_tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            bg_task = self._background_task(row)
+            if self.changes.wants("background_task"):
+                self.changes.publish([Change("background_task", task_id, "updated", bg_task)])
+        return bg_task
+
+    def get_background_task(self, task_id: str) -> Optional[BackgroundTaskStatus]:
+        """Get a background task status"""
+        row = self._connection().execute(
+            f"SELECT {BACKGROUND_COLUMNS} FROM background_tasks WHERE task_id = ?", (task_id,)
+        ).fetchone()
+        return self._background_task(row) if row is not None else None
+
+    def get_background_tasks(self,
+                             status: Optional[str] = None,
+                             page: int = 1,
+                             page_size: int = 50) -> Tuple[List[BackgroundTaskStatus], int]:
+        """Get one page of background tasks, oldest first, and the total number of matches"""
+        where, params = (" WHERE status = ?", [status]) if status is not None else ("", [])
+        connection = self._connection()
+        total = connection.execute(f"SELECT COUNT(*) FROM background_tasks{where}", params).fetchone()[0]
+        rows = connection.execute(
+            f"SELECT {BACKGROUND_COLUMNS} FROM background_tasks{where} ORDER BY started_at, rowid LIMIT ? OFFSET ?",
+            [*params, page_size, (page - 1) * page_size]
+        ).fetchall()
+        return [self._background_task(row) for row in rows], total
+
+    def evict_background_tasks(self,
+                               finished_before: Optional[datetime] = None,
+                               keep_finished: Optional[int] = None) -> int:
+        """Remove finished background tasks, returning how many were removed
+
+        Drops those completed before finished_before, then all but the
+        keep_finished most recently finished. Reads are not tracked here
+        (they would turn every status poll into a write), so recency is
+        completion time. Queued and running tasks stay.
+        """
+        clauses, params = [], []
+        if finished_before is not None:
+            clauses.append("completed_at < ?")
+            params.append(_timestamp(finished_before))
+        if keep_finished is not None:
+            clauses.append(f"task_id IN (SELECT task_id FROM background_tasks WHERE {BACKGROUND_FINISHED} "
+                           "ORDER BY completed_at DESC LIMIT -1 OFFSET ?)")
+            params.append(keep_finished)
+        if not clauses:
+            return 0
+        where = f"{BACKGROUND_FINISHED} AND ({' OR '.join(clauses)})"
+        with self._transaction() as connection:
+            if self.changes.wants("background_task"):
+                rows = connection.execute(f"SELECT {BACKGROUND_COLUMNS} FROM background_tasks WHERE {where}",
+                                          params).fetchall()
+                if rows:
+                    self.changes.publish([Change("background_task", row[0], "deleted", self._background_task(row))
+                                          for row in rows])
+            return connection.execute(f"DELETE FROM background_tasks WHERE {where}", params).rowcount
+
+    def get_lock_statistics(self) -> dict:
+        """Get wait times of this process's writers for the SQLite write lock"""
+        return {
+            "mode": "sqlite",
+            "tasks": self.lock.stats()
+        }
+
+    def clear_all(self):
+        """Clear all data (for testing)"""
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM task_tags")
+            connection.execute("DELETE FROM tasks")
+            connection.execute("DELETE FROM background_tasks")
+            # Restart ids at 1 like the in-memory database
+            connection.execute("DELETE FROM sqlite_sequence WHERE name = 'tasks'")
+
+    def close(self):
+        """Close every connection opened by this database"""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
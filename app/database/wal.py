@@ -0,0 +1,222 @@
+"""
+Append-only write-ahead log for the in-memory database
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from enum import Enum
+from typing import Iterator, Optional
+
+from app.models.task_models import TaskStatus, TaskPriority
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# When appended records are fsynced:
+#   always   - before append() returns (one fsync per mutation)
+#   group    - by a flusher thread; writers block in commit() until their
+#              record is durable, so concurrent writers share one fsync
+#   interval - by a flusher thread every fsync_interval seconds; writers
+#              never wait and at most one interval of writes can be lost
+#   off      - never; the flusher only hands data to the OS every interval
+FSYNC_MODES = ("always", "group", "interval", "off")
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def encode_record(record: dict) -> bytes:
+    """Serialize a log record to one line of JSON"""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(record, default=_default, separators=(",", ":")).encode() + b"\n"
+
+
+def decode_task_fields(fields: dict) -> dict:
+    """Turn the JSON form of task fields back into their stored types"""
+    decoded = dict(fields)
+    if "status" in decoded:
+        decoded["status"] = TaskStatus(decoded["status"])
+    if "priority" in decoded:
+        decoded["priority"] = TaskPriority(decoded["priority"])
+    for field in ("due_date", "created_at", "updated_at"):
+        if decoded.get(field) is not None:
+            decoded[field] = datetime.fromisoformat(decoded[field])
+    return decoded
+
+
+class WriteAheadLog:
+    """Append-only log of task mutations, one JSON record per line
+
+    Appends must be serialised by the caller (the database's write lock);
+    each record is stamped with a log sequence number (lsn).
+    """
+
+    def __init__(self, path: str, fsync_mode: str = "interval", fsync_interval: float = 0.05):
+        if fsync_mode not in FSYNC_MODES:
+            raise ValueError(f"Unknown fsync mode: {fsync_mode!r} (expected one of {FSYNC_MODES})")
+        self.path = path
+        self.fsync_mode = fsync_mode
+        self.fsync_interval = fsync_interval
+
+        # Records covered by an in-progress snapshot are moved here
+        self.rotated_path = f"{path}.prev"
+
+        self.lsn = 0
+        self._durable_lsn = 0
+        self._file = None
+        self._cond = threading.Condition()
+        # Serialises flushes with rotate() and close()
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+    def replay(self) -> Iterator[dict]:
+        """Yield every complete record in the log, oldest first
+
+        Records rotated out for a snapshot that never completed come first.
+        A torn final record (from a crash mid-append) is cut off so new
+        appends start on a clean line.
+        """
+        for path in (self.rotated_path, self.path):
+            if os.path.exists(path):
+                yield from self._replay_file(path)
+
+    def _replay_file(self, path: str) -> Iterator[dict]:
+        good_offset = 0
+        with open(path, "rb") as log:
+            for line in log:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                good_offset += len(line)
+                self.advance(record["lsn"])
+                yield record
+
+        if good_offset != os.path.getsize(path):
+            with open(path, "r+b") as log:
+                log.truncate(good_offset)
+
+    def advance(self, lsn: int):
+        """Continue numbering after lsn (e.g. the lsn a snapshot covers)"""
+        if lsn > self.lsn:
+            self.lsn = self._durable_lsn = lsn
+
+    def open(self):
+        """Open the log for appending and start the flusher if needed"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab")
+        if self.fsync_mode != "always":
+            self._flusher = threading.Thread(target=self._run_flusher, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    def append(self, record: dict) -> int:
+        """Append a record and return its lsn"""
+        lsn = self.lsn + 1
+        record["lsn"] = lsn
+        self._file.write(encode_record(record))
+        # Publish the lsn only once the bytes are in the buffer, so a flush
+        # that observes it is guaranteed to cover the record.
+        self.lsn = lsn
+
+        if self.fsync_mode == "always":
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._durable_lsn = lsn
+        elif self.fsync_mode == "group":
+            with self._cond:
+                self._cond.notify_all()
+        return lsn
+
+    def commit(self, lsn: int):
+        """Wait until the record at lsn is durable (group mode only)
+
+        Call this after releasing the database lock so other writers can
+        append while this one waits for the shared fsync.
+        """
+        if self.fsync_mode != "group":
+            return
+        with self._cond:
+            while self._durable_lsn < lsn and not self._closed:
+                self._cond.wait()
+
+    def _sync(self, target: int):
+        with self._io_lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            if self.fsync_mode != "off":
+                os.fsync(self._file.fileno())
+        with self._cond:
+            if target > self._durable_lsn:
+                self._durable_lsn = target
+            self._cond.notify_all()
+
+    def _run_flusher(self):
+        while True:
+            with self._cond:
+                if self.fsync_mode == "group":
+                    while self.lsn <= self._durable_lsn and not self._closed:
+                        self._cond.wait()
+                else:
+                    self._cond.wait(timeout=self.fsync_interval)
+                if self._closed:
+                    return
+                target = self.lsn
+            if target > self._durable_lsn:
+                self._sync(target)
+
+    def rotate(self):
+        """Move the records written so far aside and start an empty log
+
+        Called with appends paused while a snapshot captures the state these
+        records produced. Once the snapshot is on disk, discard_rotated()
+        drops them; if it never gets there, replay() still reads them.
+        """
+        with self._io_lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            if os.path.exists(self.rotated_path):
+                # A previous snapshot failed; keep both segments in order
+                with open(self.rotated_path, "ab") as rotated, open(self.path, "rb") as current:
+                    shutil.copyfileobj(current, rotated)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, self.rotated_path)
+            self._file = open(self.path, "ab")
+
+    def discard_rotated(self):
+        """Delete records made redundant by a completed snapshot"""
+        if os.path.exists(self.rotated_path):
+            os.remove(self.rotated_path)
+
+    def close(self):
+        """Flush and fsync outstanding records and close the file"""
+        if self._file is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._io_lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
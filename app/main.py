@@ -1,13 +1,50 @@
 """
 Main FastAPI application
 """
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException, status
-from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.models.task_models import ErrorResponse
-from app.api import tasks, background, system
+from app.api import tasks, background, changes, system
+from app.api.dependencies import shutdown_job_engine, shutdown_process_pool, shutdown_store
+from app.database.database import InMemoryDatabase, get_database
+from app.database.sharded import ShardedDatabase
+from app.database.snapshot import Snapshotter
+from app.services.retention import RetentionSweeper
+from app.utils.responses import FastJSONResponse
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start-up and shutdown hooks"""
+    db = get_database()
+    snapshotter = None
+    if settings.snapshot_path and isinstance(db, (InMemoryDatabase, ShardedDatabase)):
+        snapshotter = Snapshotter(db, settings.snapshot_path, settings.snapshot_interval_seconds)
+        snapshotter.start()
+    sweeper = None
+    if settings.background_task_sweep_interval_seconds > 0:
+        sweeper = RetentionSweeper(db,
+                                   settings.background_task_max_age_seconds or None,
+                                   settings.background_task_max_finished or None,
+                                   settings.background_task_sweep_interval_seconds)
+        sweeper.start()
+    yield
+    if sweeper is not None:
+        sweeper.stop()
+    # Jobs go first: interrupted ones still record their failure in the store
+    await shutdown_job_engine()
+    shutdown_process_pool()
+    await shutdown_store()
+    # Snapshot once more so the next start has little log to replay, then
+    # make sure logged mutations reach disk before the process exits
+    if snapshotter is not None:
+        snapshotter.stop(final_snapshot=True)
+    db.close()
+
 
 # Create FastAPI app with metadata
 app = FastAPI(
@@ -44,7 +81,8 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT"
-    }
+    },
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -54,27 +92,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=settings.allowed_methods,
     allow_headers=settings.allowed_headers,
+    expose_headers=["Retry-After", "X-Total-Count"],
 )
 
 # Include routers
 app.include_router(system.router)
 app.include_router(tasks.router)
 app.include_router(background.router)
+app.include_router(changes.router)
 
 # Error handlers
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
         content=ErrorResponse(
             error=exc.detail,
             status_code=exc.status_code
-        ).model_dump()
+        ).model_dump(),
+        headers=exc.headers
     )
 
 @app.exception_handler(ValueError)
 async def validation_exception_handler(request, exc):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=ErrorResponse(
             error="Validation Error",
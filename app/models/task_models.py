@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, PrivateAttr, validator
+from typing import Optional, List, Set
 from datetime import datetime
 from enum import Enum
 
@@ -18,6 +18,30 @@ class TaskPriority(str, Enum):
     HIGH = "high"
 
 
+class TagMode(str, Enum):
+    """How a multi-tag filter combines its tags"""
+    ANY = "any"
+    ALL = "all"
+
+
+class BackgroundJobType(str, Enum):
+    """Where a background job does its work"""
+    SLEEP = "sleep"  # awaits on the event loop
+    CPU = "cpu"  # computes in a pool process
+
+
+class BackgroundState(str, Enum):
+    """Lifecycle of a background task"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+# States after which a background task no longer changes
+FINISHED_STATUSES = (BackgroundState.COMPLETED.value, BackgroundState.FAILED.value)
+
+
 class TaskBase(BaseModel):
     """Base model for task data"""
     title: str = Field(..., min_length=1, max_length=100, description="Task title")
@@ -37,7 +61,8 @@ class TaskBase(BaseModel):
     def validate_tags(cls, v):
         if len(v) > 5:
             raise ValueError('Maximum 5 tags allowed')
-        return [tag.strip().lower() for tag in v if tag.strip()]
+        # Lowercasing can turn distinct tags into repeats; keep the first
+        return list(dict.fromkeys(tag.strip().lower() for tag in v if tag.strip()))
 
 
 class TaskCreate(TaskBase):
@@ -65,7 +90,7 @@ class TaskUpdate(BaseModel):
         if v is not None:
             if len(v) > 5:
                 raise ValueError('Maximum 5 tags allowed')
-            return [tag.strip().lower() for tag in v if tag.strip()]
+            return list(dict.fromkeys(tag.strip().lower() for tag in v if tag.strip()))
         return v
 
 
@@ -75,16 +100,50 @@ class TaskResponse(TaskBase):
     created_at: datetime = Field(..., description="Task creation timestamp")
     updated_at: datetime = Field(..., description="Task last update timestamp")
 
+    # Serialized form, filled on first use. Stored instances are shared by
+    # readers and never mutated, so the bytes stay valid for their lifetime.
+    _json: Optional[bytes] = PrivateAttr(default=None)
+
     class Config:
         from_attributes = True
 
+    def json_bytes(self) -> bytes:
+        """Serialize to JSON bytes once and reuse the result"""
+        # Go through the private dict directly; attribute access to private
+        # fields costs more than the cached serialization saves.
+        private = self.__pydantic_private__
+        cached = private.get("_json")
+        if cached is None:
+            cached = private["_json"] = self.__pydantic_serializer__.to_json(self)
+        return cached
+
 
 class TasksResponse(BaseModel):
     """Model for multiple tasks response"""
     tasks: List[TaskResponse]
     total: int
-    page: int
+    page: Optional[int] = Field(None, description="Page number (offset mode only)")
     page_size: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class BulkItemError(BaseModel):
+    """Validation errors for one item of a bulk request"""
+    index: int = Field(..., description="Position of the item in the request")
+    errors: List[dict] = Field(..., description="Validation errors for the item")
+
+
+class BulkCreateResponse(BaseModel):
+    """Model for bulk task creation response"""
+    created: int = Field(..., description="Number of tasks created")
+    ids: List[int] = Field(..., description="IDs of the created tasks, in request order")
+    errors: List[BulkItemError] = Field(default_factory=list, description="Items that failed validation")
+
+
+class BulkOperationResponse(BaseModel):
+    """Model for bulk update/delete by filter response"""
+    affected: int = Field(..., description="Number of tasks updated or deleted")
+    message: str = Field(..., description="Summary of the operation")
 
 
 class BackgroundTaskResponse(BaseModel):
@@ -105,6 +164,32 @@ class BackgroundTaskStatus(BaseModel):
     result: Optional[dict] = None
 
 
+class TaskFilter(BaseModel):
+    """Tasks a change subscription covers; unset fields match every task"""
+    status: Optional[TaskStatus] = None
+    priority: Optional[TaskPriority] = None
+    tags: Optional[List[str]] = None
+    tag_mode: TagMode = TagMode.ANY
+
+    def matches(self, task: TaskResponse) -> bool:
+        if self.status and task.status != self.status:
+            return False
+        if self.priority and task.priority != self.priority:
+            return False
+        if self.tags:
+            if self.tag_mode == TagMode.ALL:
+                return set(self.tags).issubset(task.tags)
+            return not set(self.tags).isdisjoint(task.tags)
+        return True
+
+
+class ChangeSubscription(BaseModel):
+    """What a change stream client receives; each message replaces the last"""
+    jobs: Set[str] = Field(default_factory=set, description="Background task IDs to follow")
+    tasks: List[TaskFilter] = Field(default_factory=list,
+                                    description="Task filters; a change is sent if any filter matches")
+
+
 class ErrorResponse(BaseModel):
     """Model for error responses"""
     error: str = Field(..., description="Error message")
@@ -0,0 +1,151 @@
+"""
+Bounded job engine for background work
+"""
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# A job is a zero-argument coroutine function; bind arguments with functools.partial
+Job = Callable[[], Awaitable[Any]]
+
+
+class JobQueueFull(Exception):
+    """Raised by JobEngine.submit when every queue slot is taken"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class JobEngine:
+    """Fixed pool of asyncio workers draining a bounded job queue
+
+    At most ``workers`` jobs run at once and at most ``queue_size`` wait;
+    submit raises JobQueueFull beyond that instead of spawning another
+    coroutine, so a burst of requests turns into backpressure rather than
+    unbounded memory and event-loop load.
+
+    Workers start on the event loop of the first submit (or start). If a
+    later call comes from a different loop, the previous one has gone away
+    together with its workers and jobs, and a fresh pool is started.
+
+    On shutdown running jobs are cancelled, and jobs still waiting never
+    start; their on_dropped callbacks run instead, so whatever recorded
+    them as queued can record that they will not run.
+    """
+
+    def __init__(self, workers: int = 4, queue_size: int = 100):
+        if workers < 1 or queue_size < 1:
+            raise ValueError("A job engine needs at least one worker and one queue slot")
+        self.workers = workers
+        self.queue_size = queue_size
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._runtime = 0.0  # seconds spent in finished jobs, for Retry-After
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._busy = 0
+        self._tasks = [loop.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def start(self):
+        """Start the worker pool on the running loop"""
+        self._ensure_started()
+
+    def ensure_capacity(self):
+        """Raise JobQueueFull if a submit right now would be rejected
+
+        Lets callers refuse work before preparing it; the refusal counts as
+        a rejection.
+        """
+        self._ensure_started()
+        if self._queue.full():
+            self.rejected += 1
+            raise JobQueueFull(self.retry_after())
+
+    def submit(self, job: Job, on_dropped: Optional[Job] = None):
+        """Queue a job without waiting for it, or raise JobQueueFull
+
+        on_dropped is awaited instead of the job if shutdown comes first.
+        """
+        self.ensure_capacity()
+        self._queue.put_nowait((job, on_dropped))
+        self.submitted += 1
+
+    def retry_after(self) -> int:
+        """Whole seconds until a queue slot is likely to free up
+
+        A slot frees whenever any worker finishes, so this is the mean job
+        runtime divided by the worker count; 1 until a job has finished.
+        """
+        finished = self.completed + self.failed
+        if not finished:
+            return 1
+        return max(1, math.ceil(self._runtime / finished / self.workers))
+
+    async def _work(self):
+        worker = asyncio.current_task()
+        while True:
+            job, _ = await self._queue.get()
+            self._busy += 1
+            start = time.perf_counter()
+            try:
+                await job()
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Background job failed")
+            finally:
+                self._busy -= 1
+                self._runtime += time.perf_counter() - start
+                self._queue.task_done()
+            if worker.cancelling():
+                # The job caught or replaced our cancellation; stop anyway
+                raise asyncio.CancelledError
+
+    def stats(self) -> dict:
+        """Queue depth, worker utilisation and job counters"""
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "utilisation": round(self._busy / self.workers, 3),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed
+        }
+
+    async def shutdown(self):
+        """Cancel running jobs, stop the workers and drop queued jobs"""
+        tasks, self._tasks = self._tasks, []
+        queue = self._queue
+        if self._loop is not asyncio.get_running_loop():
+            tasks, queue = [], None  # they died with their loop
+        self._loop = self._queue = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while queue is not None and not queue.empty():
+            _, on_dropped = queue.get_nowait()
+            if on_dropped is None:
+                continue
+            try:
+                await on_dropped()
+            except Exception:
+                logger.exception("Recording a dropped background job failed")
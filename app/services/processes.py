@@ -0,0 +1,126 @@
+"""
+Process pool for CPU-bound background jobs
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+# Progress queue of the current pool process; None in the parent
+_progress: Optional[multiprocessing.Queue] = None
+
+
+def _init_process(progress: multiprocessing.Queue):
+    global _progress
+    _progress = progress
+
+
+def report_progress(job_id: str, progress: int, message: str):
+    """Send a progress update from a pool process to the parent (no-op elsewhere)"""
+    if _progress is not None:
+        _progress.put((job_id, progress, message))
+
+
+def burn_cpu(job_id: str, steps: int) -> dict:
+    """CPU-bound stand-in for real work: about one second of hashing per step"""
+    digest = b""
+    hashes = 0
+    for step in range(steps):
+        deadline = time.process_time() + 1
+        while time.process_time() < deadline:
+            for _ in range(1000):
+                digest = hashlib.sha256(digest).digest()
+            hashes += 1000
+        report_progress(job_id, int((step + 1) / steps * 100), f"Processing step {step + 1}/{steps}")
+    return {
+        "processed_items": steps,
+        "hashes": hashes,
+        "success": True,
+        "completion_time": datetime.now().isoformat()
+    }
+
+
+class ProcessPool:
+    """ProcessPoolExecutor whose jobs report progress back over a queue
+
+    Pool processes are spawned (not forked, since the server has threads)
+    on the first job. Each one gets the same multiprocessing queue; a
+    thread in the parent reads it and hands every update to the event loop
+    awaiting that job, which applies them in order before the job's result.
+    """
+
+    def __init__(self, processes: int = 2):
+        self.processes = processes
+        self._context = multiprocessing.get_context("spawn")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[multiprocessing.Queue] = None
+        self._reader: Optional[threading.Thread] = None
+        self._listeners: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = {}
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._queue = self._context.Queue()
+                self._executor = ProcessPoolExecutor(self.processes, mp_context=self._context,
+                                                     initializer=_init_process, initargs=(self._queue,))
+                self._reader = threading.Thread(target=self._read_progress, args=(self._queue,),
+                                                name="process-progress", daemon=True)
+                self._reader.start()
+            return self._executor
+
+    def _read_progress(self, queue: multiprocessing.Queue):
+        while True:
+            update = queue.get()
+            if update is None:
+                return
+            listener = self._listeners.get(update[0])
+            if listener is not None:
+                loop, updates = listener
+                try:
+                    loop.call_soon_threadsafe(updates.put_nowait, update[1:])
+                except RuntimeError:
+                    pass  # that loop has closed
+
+    async def run(self,
+                  function: Callable[..., Any],
+                  job_id: str,
+                  *args,
+                  on_progress: Callable[[int, str], Awaitable[Any]]) -> Any:
+        """Run function(job_id, *args) in a pool process and return its result
+
+        on_progress is awaited for each report_progress call the function
+        makes, in order; updates still in flight when it returns are dropped.
+        """
+        executor = self._ensure_started()
+        loop = asyncio.get_running_loop()
+        updates: asyncio.Queue = asyncio.Queue()
+        self._listeners[job_id] = (loop, updates)
+        result = loop.run_in_executor(executor, function, job_id, *args)
+        update = asyncio.ensure_future(updates.get())
+        try:
+            while True:
+                done, _ = await asyncio.wait({result, update}, return_when=asyncio.FIRST_COMPLETED)
+                if update in done:
+                    await on_progress(*update.result())
+                    update = asyncio.ensure_future(updates.get())
+                if result in done:
+                    return result.result()
+        finally:
+            # On cancellation a job that has not started yet is dropped
+            update.cancel()
+            result.cancel()
+            del self._listeners[job_id]
+
+    def shutdown(self):
+        """Stop taking jobs; processes finish their current job and exit"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if executor is None:
+                return
+            executor.shutdown(wait=False, cancel_futures=True)
+            self._queue.put(None)
@@ -0,0 +1,54 @@
+"""
+Retention of finished background tasks
+"""
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.database.base import TaskStore
+
+logger = logging.getLogger(__name__)
+
+
+class RetentionSweeper:
+    """Background thread that evicts finished background tasks at a fixed interval
+
+    Tasks that finished more than max_age seconds ago are dropped, then the
+    least recently used ones beyond max_finished. None disables either
+    limit. Queued and running tasks are never touched; the job queue
+    already bounds how many of those there can be.
+    """
+
+    def __init__(self, db: TaskStore, max_age: Optional[float], max_finished: Optional[int], interval: float):
+        self.db = db
+        self.max_age = max_age
+        self.max_finished = max_finished
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="retention-sweeper", daemon=True)
+        self._thread.start()
+
+    def sweep(self) -> int:
+        """Evict once; return how many background tasks were removed"""
+        finished_before = datetime.now() - timedelta(seconds=self.max_age) if self.max_age is not None else None
+        return self.db.evict_background_tasks(finished_before, self.max_finished)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    logger.info("Evicted %d finished background tasks", evicted)
+            except Exception:
+                # Keep the thread alive; the next sweep catches up
+                logger.exception("Background task retention sweep failed")
+
+    def stop(self):
+        """Stop the thread"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,61 @@
+"""
+Response classes for fast JSON serialization
+"""
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from app.models.task_models import TaskResponse, TasksResponse
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize a model, or a list of models, with pydantic-core
+
+    Tasks reuse their cached JSON, so a page of stored tasks is mostly a
+    byte join rather than a fresh serialization of every row.
+    """
+    if isinstance(content, TaskResponse):
+        return content.json_bytes()
+    if isinstance(content, TasksResponse):
+        # "tasks" is the first field, so splicing it in front of the rest
+        # yields the same bytes as serializing the whole model.
+        rest = content.__pydantic_serializer__.to_json(content, exclude={"tasks"})
+        return b'{"tasks":' + dump_json(content.tasks) + b"," + rest[1:]
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if isinstance(content, list):
+        return b"[" + b",".join([dump_json(item) for item in content]) + b"]"
+    raise TypeError(f"Cannot serialize {type(content).__name__} as a model")
+
+
+class ModelJSONResponse(Response):
+    """JSON response for already-validated models
+
+    FastAPI returns Response instances as-is, so routes that wrap their
+    result in this class skip the response_model validation pass.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when it is installed
+
+    Falls back to the stdlib encoder otherwise. Both produce compact UTF-8
+    output, and FastAPI hands over content already converted to JSON types,
+    so datetimes and enums serialize the same either way.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -1,15 +1,24 @@
 """
 FastAPI Task Management API Launcher
 """
+import sys
+
 import uvicorn
-from app.main import app
+
+# Only settings here: CPU-pool processes are spawned and re-import this
+# module, so it must not build the app (and with it the database)
 from app.core.config import settings
 
 if __name__ == "__main__":
+    if settings.workers > 1 and not settings.database_url:
+        # Each worker process would get its own in-memory store
+        sys.exit("workers > 1 needs a shared database: set database_url=sqlite:///<path>")
+
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug,
+        reload=settings.debug and settings.workers == 1,
+        workers=settings.workers,
         log_level="info"
-    )
\ No newline at end of file
+    )
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark backfilling tasks through POST /tasks vs. POST /tasks/bulk
+
+Usage:
+    python scripts/benchmark_bulk.py --tasks 1000000 --batch 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database.database import get_database
+
+
+def make_item(i: int) -> dict:
+    return {
+        "title": f"Backfill {i}",
+        "description": "Imported task",
+        "priority": ["low", "medium", "high"][i % 3],
+        "tags": ["import", f"batch{i % 10}"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks to backfill in bulk")
+    parser.add_argument("--batch", type=int, default=10_000, help="Items per bulk request")
+    parser.add_argument("--single", type=int, default=2_000, help="Tasks created one request at a time")
+    args = parser.parse_args()
+
+    db = get_database()
+    client = TestClient(app)
+
+    db.clear_all()
+    start = time.perf_counter()
+    for i in range(args.single):
+        assert client.post("/tasks", json=make_item(i)).status_code == 201
+    single_rate = args.single / (time.perf_counter() - start)
+
+    db.clear_all()
+    start = time.perf_counter()
+    for offset in range(0, args.tasks, args.batch):
+        items = [make_item(i) for i in range(offset, min(offset + args.batch, args.tasks))]
+        response = client.post("/tasks/bulk", json=items)
+        assert response.status_code == 200 and not response.json()["errors"]
+    bulk_elapsed = time.perf_counter() - start
+    bulk_rate = args.tasks / bulk_elapsed
+
+    print(f"{'mode':<10}{'tasks/s':>12}{'time for --tasks':>20}")
+    print("-" * 42)
+    print(f"{'single':<10}{single_rate:>12,.0f}{args.tasks / single_rate:>19,.1f}s (extrapolated)")
+    print(f"{'bulk':<10}{bulk_rate:>12,.0f}{bulk_elapsed:>19,.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar engine against the id-list indexes
+
+Both engines are filled with the same pseudo-random tasks; each filter
+from benchmark_filters plus a few multi-filter queries and the statistics
+call are timed, reporting p50/p99 latency. Needs numpy.
+
+Usage:
+    python scripts/benchmark_columnar.py --tasks 1000000 --queries 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.columnar import ColumnarDatabase
+from app.database.database import InMemoryDatabase
+from app.models.task_models import TaskStatus, TaskPriority
+from benchmark_filters import QUERIES, measure, percentile
+from benchmark_storage import fill
+
+ENGINES = {"rows": InMemoryDatabase, "columnar": ColumnarDatabase}
+
+CASES = {
+    **QUERIES,
+    "status+prio+tag": {"status": TaskStatus.ACTIVE, "priority": TaskPriority.HIGH, "tags": ["tag3"]},
+    "five tags": {"tags": ["tag1", "tag2", "tag3", "tag4", "tag5"]},
+    "deep page": {"status": TaskStatus.ACTIVE, "page": 500},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Number of stored tasks")
+    parser.add_argument("--queries", type=int, default=200, help="Runs per query")
+    args = parser.parse_args()
+
+    databases = {}
+    for name, engine in ENGINES.items():
+        start = time.perf_counter()
+        databases[name] = db = engine()
+        fill(db, args.tasks)
+        db._responses.clear()
+        print(f"{name}: filled {args.tasks:,} tasks in {time.perf_counter() - start:.1f}s")
+
+    print(f"\n{'query':<18}{'engine':<10}{'p50 ms':>10}{'p99 ms':>10}{'speed-up':>10}")
+    print("-" * 58)
+    cases = {name: (lambda db, filters=filters: db.get_tasks(page_size=20, **filters))
+             for name, filters in CASES.items()}
+    cases["statistics"] = lambda db: db.get_task_statistics()
+    for case, call in cases.items():
+        medians = {}
+        for name, db in databases.items():
+            timings = measure(lambda: call(db), args.queries)
+            medians[name] = statistics.median(timings)
+            speedup = f"{medians['rows'] / medians[name]:>9.1f}x" if name != "rows" else ""
+            print(f"{case:<18}{name:<10}{medians[name]:>10.3f}{percentile(timings, 99):>10.3f}{speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark API latency while CPU-bound background jobs run
+
+The app is served by uvicorn in a background thread and a client process
+times GET /tasks requests one after another. Three runs: no jobs, CPU
+jobs computed on the event loop (what an async job that does real work
+amounts to), and the same jobs through POST /background-tasks?job_type=cpu
+in the process pool. The jobs keep the CPU busy for the whole run.
+
+Usage:
+    python scripts/benchmark_cpu_jobs.py --seconds 5 --processes 2
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+
+from app.main import app
+from app.api.dependencies import get_job_engine, get_process_pool, get_store
+from app.database.async_store import AsyncStore
+from app.database.database import InMemoryDatabase
+from app.services.jobs import JobEngine
+from app.services.processes import ProcessPool
+from benchmark_event_loop import free_port
+from benchmark_filters import percentile
+from benchmark_storage import fill
+
+
+class EventLoopPool:
+    """ProcessPool stand-in that computes on the calling event loop"""
+
+    async def run(self, function, job_id, *args, on_progress):
+        return function(job_id, *args)
+
+    def shutdown(self):
+        pass
+
+
+def probe(args: tuple) -> list:
+    """Client process: GET /tasks back to back for some seconds, returning latencies in ms"""
+    url, seconds = args
+    latencies = []
+    with httpx.Client(base_url=url, timeout=120) as http:
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            http.get("/tasks", params={"status": "active", "page_size": 20})
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def serve(store: AsyncStore, pool, port: int, stop: threading.Event, ready: threading.Event):
+    """Run uvicorn until stop is set, then wait for running jobs"""
+    engine = JobEngine(workers=8, queue_size=100)
+
+    async def current_store():
+        return store
+
+    async def current_engine():
+        return engine
+
+    async def current_pool():
+        return pool
+
+    app.dependency_overrides.update({get_store: current_store, get_job_engine: current_engine,
+                                     get_process_pool: current_pool})
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off"))
+
+    async def main():
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        if engine._queue is not None:
+            await engine._queue.join()
+        server.should_exit = True
+        await serving
+        await engine.shutdown()
+
+    asyncio.run(main())
+    app.dependency_overrides.clear()
+
+
+def run(store: AsyncStore, pool, jobs: int, seconds: float) -> list:
+    """Start the jobs, then probe latency for seconds"""
+    port = free_port()
+    stop, ready = threading.Event(), threading.Event()
+    server = threading.Thread(target=serve, args=(store, pool, port, stop, ready))
+    server.start()
+    ready.wait()
+
+    url = f"http://127.0.0.1:{port}"
+    with httpx.Client(base_url=url, timeout=120) as http:
+        for _ in range(jobs):
+            params = {"duration": max(1, round(seconds)), "job_type": "cpu"}
+            response = http.post("/background-tasks", params=params)
+            response.raise_for_status()
+    with multiprocessing.get_context("spawn").Pool(1) as clients:
+        latencies = clients.map(probe, [(url, seconds)])[0]
+    stop.set()
+    server.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000, help="Tasks loaded before the run")
+    parser.add_argument("--processes", type=int, default=2, help="Pool processes, and CPU jobs started")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Probe duration and CPU seconds per job")
+    args = parser.parse_args()
+
+    db = InMemoryDatabase()
+    fill(db, args.tasks)
+    store = AsyncStore.with_threads(db, 8)
+    pool = ProcessPool(args.processes)
+
+    print(f"{os.cpu_count()} CPUs, {args.processes} CPU jobs of {args.seconds:.0f}s")
+    print(f"{'jobs':<14}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    print("-" * 54)
+    runs = {"none": (None, 0), "event loop": (EventLoopPool(), args.processes), "process pool": (pool, args.processes)}
+    for name, (runner, jobs) in runs.items():
+        latencies = run(store, runner, jobs, args.seconds)
+        print(f"{name:<14}{len(latencies):>10,}{statistics.median(latencies):>10.2f}"
+              f"{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}")
+    pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark event-loop lag while the API is under load
+
+The app is served by uvicorn in a background thread; a probe coroutine on
+the server's event loop repeatedly sleeps 1ms and records how late it
+wakes up. Client processes drive a request mix (list, get, create,
+update) over HTTP. Each backend runs twice: with every store call inline
+on the event loop (the behaviour before AsyncStore) and with blocking
+calls offloaded to the store thread pool.
+
+Usage:
+    python scripts/benchmark_event_loop.py --tasks 100000 --seconds 5
+    python scripts/benchmark_event_loop.py --backends sqlite --clients 4
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+
+from app.main import app
+from app.api.dependencies import get_store
+from app.database.async_store import AsyncStore
+from benchmark_filters import percentile
+from benchmark_storage import BACKENDS, fill
+
+PROBE_INTERVAL = 0.001
+
+
+async def probe(lags: list, stop: threading.Event):
+    """Record how late a 1ms sleep wakes up, in milliseconds"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append((time.perf_counter() - start - PROBE_INTERVAL) * 1000)
+
+
+async def client_loop(url: str, tasks: int, deadline: float, seed: int, concurrency: int) -> int:
+    async def worker(rng: random.Random) -> int:
+        requests = 0
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < 0.5:
+                await http.get("/tasks", params={"status": "active", "page_size": 20})
+            elif roll < 0.7:
+                await http.get(f"/tasks/{rng.randint(1, tasks)}")
+            elif roll < 0.9:
+                await http.post("/tasks", json={"title": "Load", "tags": ["load"]})
+            else:
+                await http.put(f"/tasks/{rng.randint(1, tasks)}", json={"priority": "high"})
+            requests += 1
+        return requests
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as http:
+        counts = await asyncio.gather(*(worker(random.Random(seed * 1000 + n)) for n in range(concurrency)))
+    return sum(counts)
+
+
+def client(args: tuple) -> int:
+    """Client process entry point: returns the number of completed requests"""
+    url, tasks, seconds, seed, concurrency = args
+    return asyncio.run(client_loop(url, tasks, time.perf_counter() + seconds, seed, concurrency))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(store: AsyncStore, port: int, lags: list, stop: threading.Event, ready: threading.Event):
+    """Run uvicorn and the lag probe on one event loop until stop is set"""
+    async def current_store():
+        return store
+
+    app.dependency_overrides[get_store] = current_store
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off"))
+
+    async def main():
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.01)
+        ready.set()
+        await probe(lags, stop)
+        server.should_exit = True
+        await serving
+        await store.shutdown()
+
+    asyncio.run(main())
+    app.dependency_overrides.clear()
+
+
+def run(store: AsyncStore, tasks: int, clients: int, concurrency: int, seconds: float):
+    """Load the app through store and return (requests/s, lag samples)"""
+    port = free_port()
+    lags, stop, ready = [], threading.Event(), threading.Event()
+    server = threading.Thread(target=serve, args=(store, port, lags, stop, ready))
+    server.start()
+    ready.wait()
+
+    url = f"http://127.0.0.1:{port}"
+    with multiprocessing.get_context("spawn").Pool(clients) as pool:
+        counts = pool.map(client, [(url, tasks, seconds, seed, concurrency) for seed in range(clients)])
+    stop.set()
+    server.join()
+    return sum(counts) / seconds, lags
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default="sqlite,memory+wal,memory+fsync",
+                        help=f"Comma-separated backends from: {', '.join(BACKENDS)}")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Tasks loaded before the run")
+    parser.add_argument("--clients", type=int, default=2, help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight requests per client")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Load duration per run")
+    parser.add_argument("--threads", type=int, default=8, help="Store thread pool size")
+    parser.add_argument("--dir", default=None, help="Directory for backend files (default: a temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'backend':<14}{'calls':<8}{'req/s':>10}{'lag p50 ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    print("-" * 68)
+    for name in args.backends.split(","):
+        for mode in ("inline", "pool"):
+            with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+                store = BACKENDS[name](directory)
+                fill(store, args.tasks)
+                async_store = (AsyncStore.with_threads(store, args.threads) if mode == "pool"
+                               else AsyncStore(store))
+                rate, lags = run(async_store, args.tasks, args.clients, args.concurrency, args.seconds)
+                store.close()
+            print(f"{name:<14}{mode:<8}{rate:>10,.0f}{statistics.median(lags):>12.2f}"
+                  f"{percentile(lags, 99):>12.2f}{max(lags):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
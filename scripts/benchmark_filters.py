@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark filtered task queries against the in-memory database
+
+Compares the indexed get_tasks() with the previous full-scan approach and
+reports p50/p99 latency for a set of representative filters.
+
+Usage:
+    python scripts/benchmark_filters.py --tasks 1000000 --queries 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.database import InMemoryDatabase
+from app.models.task_models import TaskStatus, TaskPriority
+
+TAGS = [f"tag{i}" for i in range(50)]
+
+QUERIES = {
+    "status": {"status": TaskStatus.ARCHIVED},
+    "priority": {"priority": TaskPriority.HIGH},
+    "status+priority": {"status": TaskStatus.ACTIVE, "priority": TaskPriority.LOW},
+    "rare tag": {"tags": ["rare"]},
+    "two tags": {"tags": ["tag1", "tag2"]},
+}
+
+
+def generate_tasks(count: int, seed: int = 42):
+    """Yield pseudo-random task data"""
+    rng = random.Random(seed)
+    statuses = [TaskStatus.ACTIVE] * 8 + [TaskStatus.COMPLETED] * 3 + [TaskStatus.ARCHIVED]
+    priorities = list(TaskPriority)
+    for i in range(count):
+        tags = rng.sample(TAGS, rng.randint(0, 3))
+        if i % 100_000 == 0:
+            tags.append("rare")
+        yield {
+            "title": f"Task {i}",
+            "status": rng.choice(statuses),
+            "priority": rng.choice(priorities),
+            "tags": tags,
+        }
+
+
+def populate(db: InMemoryDatabase, count: int, seed: int = 42):
+    """Fill the database with pseudo-random tasks"""
+    for task_data in generate_tasks(count, seed):
+        db.create_task(task_data)
+
+
+def full_scan(db: InMemoryDatabase, status=None, priority=None, tags=None,
+              page: int = 1, page_size: int = 10):
+    """The pre-index implementation of get_tasks, kept as a baseline"""
+    with db.lock.read():
+        tasks = list(db.tasks.values())
+        if status:
+            tasks = [task for task in tasks if task.status == status]
+        if priority:
+            tasks = [task for task in tasks if task.priority == priority]
+        if tags:
+            tasks = [task for task in tasks
+                     if any(tag in task.tags for tag in tags)]
+        tasks.sort(key=lambda x: x.created_at, reverse=True)
+        start = (page - 1) * page_size
+        return tasks[start:start + page_size], len(tasks)
+
+
+def measure(func, runs: int) -> list:
+    """Run func repeatedly and return latencies in milliseconds"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def percentile(values: list, pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Number of stored tasks")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per filter")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only measure get_tasks()")
+    args = parser.parse_args()
+
+    db = InMemoryDatabase()
+    print(f"Populating {args.tasks:,} tasks...")
+    start = time.perf_counter()
+    populate(db, args.tasks)
+    print(f"  done in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'filter':<18}{'impl':<10}{'matches':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print("-" * 58)
+    for name, filters in QUERIES.items():
+        _, total = db.get_tasks(**filters)
+        runs = {"indexed": lambda: db.get_tasks(**filters)}
+        if not args.skip_baseline:
+            runs["scan"] = lambda: full_scan(db, **filters)
+        for impl, func in runs.items():
+            timings = measure(func, args.queries)
+            print(f"{name:<18}{impl:<10}{total:>10,}"
+                  f"{statistics.median(timings):>10.2f}{percentile(timings, 99):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
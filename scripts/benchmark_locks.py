@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Mixed read/write load test for the database lock modes
+
+Runs reader and writer threads against InMemoryDatabase in each lock mode
+and reports throughput together with the lock wait statistics.
+
+Usage:
+    python scripts/benchmark_locks.py --tasks 100000 --threads 8 --seconds 5
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmark_filters import InMemoryDatabase, TaskStatus, populate
+
+
+def worker(db: InMemoryDatabase, write_ratio: float, stop: threading.Event,
+           counts: list, index: int, seed: int):
+    """Issue a random mix of reads and writes until stopped"""
+    rng = random.Random(seed)
+    max_id = db.next_task_id - 1
+    done = 0
+    while not stop.is_set():
+        if rng.random() < write_ratio:
+            db.update_task(rng.randint(1, max_id), {"status": rng.choice(list(TaskStatus))})
+        elif rng.random() < 0.5:
+            db.get_task(rng.randint(1, max_id))
+        else:
+            db.get_tasks(status=TaskStatus.COMPLETED, page_size=20)
+        done += 1
+    counts[index] = done
+
+
+def run(lock_mode: str, args) -> None:
+    db = InMemoryDatabase(lock_mode=lock_mode)
+    populate(db, args.tasks)
+    db.lock.reset_stats()
+
+    stop = threading.Event()
+    counts = [0] * args.threads
+    threads = [threading.Thread(target=worker, args=(db, args.write_ratio, stop, counts, i, i))
+               for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    stats = db.get_lock_statistics()["tasks"]
+    print(f"{lock_mode:<10}{sum(counts) / args.seconds:>12,.0f}", end="")
+    for mode in ("read", "write"):
+        print(f"{stats[mode]['avg_wait_us']:>14.1f}{stats[mode]['max_wait_ms']:>14.2f}", end="")
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100_000, help="Number of stored tasks")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration per lock mode")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="Fraction of operations that write")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'ops/s':>12}{'read avg us':>14}{'read max ms':>14}"
+          f"{'write avg us':>14}{'write max ms':>14}")
+    print("-" * 78)
+    for lock_mode in ("exclusive", "rw"):
+        run(lock_mode, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Measure memory per stored task for each task row layout
+
+Each layout and task count is measured in a fresh process, reporting the
+RSS growth divided by the number of tasks and the total RSS:
+
+- dict: the previous layout, one 9-key dict per task with a tag list
+- record: TaskRecord rows (slots, tag tuples of interned strings)
+- database: InMemoryDatabase with its ordered id list and indexes, after
+  every task has been read once, so the response cache is full at its
+  default bound (steady state for a running server)
+- unbounded: the same with a response cache large enough for every task,
+  as before the cache was bounded
+
+Tags are decoded from JSON per task, like request bodies, so repeated tag
+names start out as separate strings.
+
+Usage:
+    python scripts/benchmark_memory.py --tasks 1000000,10000000
+    python scripts/benchmark_memory.py --layouts record,database --tasks 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.database import InMemoryDatabase
+from app.database.records import TaskRecord, intern_tags
+from benchmark_filters import generate_tasks
+
+LAYOUTS = ("dict", "record", "database", "unbounded")
+BATCH_SIZE = 1000
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process"""
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def parsed_tasks(count: int):
+    """Yield task data whose tags are fresh strings, as decoded from a request"""
+    for task_data in generate_tasks(count):
+        task_data["tags"] = json.loads(json.dumps(task_data["tags"]))
+        yield task_data
+
+
+def build_table(layout: str, count: int) -> dict:
+    """Hold count tasks in the given row layout"""
+    table = {}
+    now = datetime.now()
+    for task_id, task_data in enumerate(parsed_tasks(count), start=1):
+        if task_id % BATCH_SIZE == 0:
+            # Tasks created in one batch share a timestamp
+            now = datetime.now()
+        if layout == "dict":
+            table[task_id] = {"id": task_id, "title": task_data["title"], "description": None,
+                              "status": task_data["status"], "priority": task_data["priority"],
+                              "due_date": None, "tags": task_data["tags"],
+                              "created_at": now, "updated_at": now}
+        else:
+            table[task_id] = TaskRecord(task_id, task_data["title"], None, task_data["status"],
+                                        task_data["priority"], None, intern_tags(task_data["tags"]),
+                                        now, now)
+    return table
+
+
+def build_database(count: int, response_cache_size: int = 10_000) -> InMemoryDatabase:
+    """Fill an InMemoryDatabase through create_tasks, then read every task once"""
+    db = InMemoryDatabase(response_cache_size=response_cache_size)
+    batch = []
+    for task_data in parsed_tasks(count):
+        batch.append(task_data)
+        if len(batch) == BATCH_SIZE:
+            db.create_tasks(batch)
+            batch = []
+    if batch:
+        db.create_tasks(batch)
+    for task_id in range(1, count + 1):
+        db.get_task(task_id)
+    return db
+
+
+def measure(layout: str, count: int) -> dict:
+    """Child process body: build one layout and report its memory"""
+    baseline = rss_bytes()
+    start = time.perf_counter()
+    if layout == "database":
+        stored = build_database(count)
+    elif layout == "unbounded":
+        stored = build_database(count, response_cache_size=count)
+    else:
+        stored = build_table(layout, count)
+    elapsed = time.perf_counter() - start
+    rss = rss_bytes()
+    del stored
+    return {"bytes_per_task": (rss - baseline) / count, "rss": rss, "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", default="1000000,10000000", help="Comma-separated task counts")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS),
+                        help=f"Comma-separated layouts from: {', '.join(LAYOUTS)}")
+    parser.add_argument("--child", nargs=2, metavar=("LAYOUT", "COUNT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], int(args.child[1]))))
+        return
+
+    print(f"{'layout':<10}{'tasks':>12}{'bytes/task':>12}{'RSS MB':>10}{'build s':>10}")
+    print("-" * 54)
+    for count in (int(value) for value in args.tasks.split(",")):
+        for layout in args.layouts.split(","):
+            output = subprocess.run([sys.executable, __file__, "--child", layout, str(count)],
+                                    capture_output=True, text=True)
+            if output.returncode != 0:
+                print(f"{layout:<10}{count:>12,}  failed: {output.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(output.stdout)
+            print(f"{layout:<10}{count:>12,}{result['bytes_per_task']:>12,.0f}"
+                  f"{result['rss'] / 2**20:>10,.0f}{result['seconds']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
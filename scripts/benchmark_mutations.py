@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of update and delete throughput
+
+Compares the previous route pattern (get_task existence check followed by
+the mutation) with a single store call that reports not-found itself.
+
+Usage:
+    python scripts/benchmark_mutations.py --tasks 100000
+"""
+
+import argparse
+import time
+
+from benchmark_filters import InMemoryDatabase, TaskStatus, populate
+
+STATUSES = list(TaskStatus)
+
+
+def update_checked(db: InMemoryDatabase, task_id: int, data: dict):
+    if not db.get_task(task_id):
+        return None
+    return db.update_task(task_id, data)
+
+
+def update_single(db: InMemoryDatabase, task_id: int, data: dict):
+    return db.update_task(task_id, data)
+
+
+def delete_checked(db: InMemoryDatabase, task_id: int):
+    if not db.get_task(task_id):
+        return False
+    return db.delete_task(task_id)
+
+
+def delete_single(db: InMemoryDatabase, task_id: int):
+    return db.delete_task(task_id)
+
+
+def rate(count: int, func) -> float:
+    """Run func(i) for i in 1..count and return operations per second"""
+    start = time.perf_counter()
+    for task_id in range(1, count + 1):
+        func(task_id)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=100_000, help="Number of tasks mutated")
+    args = parser.parse_args()
+
+    print(f"{'operation':<12}{'check + op/s':>16}{'single op/s':>16}{'speedup':>10}")
+    print("-" * 54)
+
+    results = {}
+    for name, impl in (("before", (update_checked, delete_checked)),
+                       ("after", (update_single, delete_single))):
+        update, delete = impl
+        db = InMemoryDatabase()
+        populate(db, args.tasks)
+        results[name] = (
+            rate(args.tasks, lambda i: update(db, i, {"status": STATUSES[i % 3]})),
+            rate(args.tasks, lambda i: delete(db, i)),
+        )
+
+    for index, operation in enumerate(("update", "delete")):
+        before, after = results["before"][index], results["after"][index]
+        print(f"{operation:<12}{before:>16,.0f}{after:>16,.0f}{after / before:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Benchmark page-1 and deep-page latency of get_tasks
+
+Compares the ordered-index pagination with the previous
+filter-then-sort-then-slice implementation.
+
+Usage:
+    python scripts/benchmark_pagination.py --tasks 1000000
+"""
+
+import argparse
+import statistics
+
+from benchmark_filters import InMemoryDatabase, TaskStatus, populate, full_scan, measure, percentile
+
+PAGE_SIZE = 100
+
+FILTERS = {
+    "unfiltered": {},
+    "status": {"status": TaskStatus.ACTIVE},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Number of stored tasks")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per case")
+    parser.add_argument("--skip-baseline", action="store_true", help="Only measure get_tasks()")
+    args = parser.parse_args()
+
+    db = InMemoryDatabase()
+    print(f"Populating {args.tasks:,} tasks...")
+    populate(db, args.tasks)
+
+    print(f"\n{'filter':<12}{'page':>8}{'impl':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    print("-" * 50)
+    for name, filters in FILTERS.items():
+        _, total = db.get_tasks(**filters)
+        last_page = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+        for page in (1, last_page // 2, last_page):
+            runs = {"ordered": lambda: db.get_tasks(page=page, page_size=PAGE_SIZE, **filters)}
+            if not args.skip_baseline:
+                runs["sort"] = lambda: full_scan(db, page=page, page_size=PAGE_SIZE, **filters)
+            for impl, func in runs.items():
+                timings = measure(func, args.queries)
+                print(f"{name:<12}{page:>8}{impl:>10}"
+                      f"{statistics.median(timings):>10.2f}{percentile(timings, 99):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
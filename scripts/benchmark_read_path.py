@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /tasks?page_size=100 throughput
+
+Compares the current route (trusted model construction serialized straight
+to bytes) with the previous read path, where every stored row was
+revalidated into a TaskResponse and FastAPI validated the result again
+against response_model.
+
+Usage:
+    python scripts/benchmark_read_path.py --tasks 10000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database.database import get_database
+from app.models.task_models import TaskResponse, TasksResponse
+
+db = get_database()
+
+legacy_app = FastAPI()
+
+
+@legacy_app.get("/tasks", response_model=TasksResponse)
+async def legacy_get_tasks(page: int = 1, page_size: int = 10):
+    """The read path before trusted construction"""
+    with db.lock.read():
+        ids = db._matching_ids()
+        total = len(ids)
+        page_ids = db._page_desc(ids, page, page_size)
+        tasks = [TaskResponse(**db.tasks[task_id].as_dict()) for task_id in page_ids]
+    return TasksResponse(tasks=tasks, total=total, page=page, page_size=page_size)
+
+
+async def call(asgi_app, path: str, query: str) -> int:
+    """Drive one GET request through the ASGI app without a network or HTTP client"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": query.encode(), "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await asgi_app(scope, receive, send)
+    return status
+
+
+def throughput(asgi_app, requests: int) -> float:
+    """Issue GET /tasks?page_size=100 repeatedly and return requests per second"""
+    async def run():
+        await call(asgi_app, "/tasks", "page_size=100")
+        start = time.perf_counter()
+        for _ in range(requests):
+            status = await call(asgi_app, "/tasks", "page_size=100")
+        assert status == 200
+        return requests / (time.perf_counter() - start)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000, help="Number of stored tasks")
+    parser.add_argument("--requests", type=int, default=2_000, help="Requests per variant")
+    args = parser.parse_args()
+
+    db.clear_all()
+    for i in range(args.tasks):
+        db.create_task({"title": f"Task {i}", "description": "Benchmark task", "tags": ["bench", f"t{i % 7}"]})
+
+    with TestClient(legacy_app) as legacy_client, TestClient(app) as current_client:
+        assert (legacy_client.get("/tasks?page_size=100").json()["tasks"]
+                == current_client.get("/tasks?page_size=100").json()["tasks"])
+
+    legacy = throughput(legacy_app, args.requests)
+    current = throughput(app, args.requests)
+    print(f"{'variant':<12}{'req/s':>10}")
+    print("-" * 22)
+    print(f"{'validated':<12}{legacy:>10,.0f}")
+    print(f"{'trusted':<12}{current:>10,.0f}")
+    print(f"\nspeedup: {current / legacy:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start time to the first served request
+
+Builds a write-ahead log holding the creation of --tasks tasks plus
+--updates single-task updates, then restarts the database two ways:
+replaying the whole log, and loading a snapshot taken before the last
+--tail updates and replaying only those. Each restart is timed until
+the first get_tasks() call returns.
+
+Usage:
+    python scripts/benchmark_recovery.py --tasks 1000000 --updates 200000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.database import InMemoryDatabase
+from app.database.wal import WriteAheadLog
+from app.models.task_models import TaskStatus
+from benchmark_filters import populate
+
+
+def update(db: InMemoryDatabase, count: int, seed: int):
+    """Flip the status of count random tasks, one log record each"""
+    rng = random.Random(seed)
+    statuses = list(TaskStatus)
+    high = db.next_task_id - 1
+    for _ in range(count):
+        db.update_task(rng.randint(1, high), {"status": rng.choice(statuses)})
+
+
+def cold_start(wal_path: str, snapshot_path=None) -> float:
+    """Seconds from constructing the database to the first served page"""
+    start = time.perf_counter()
+    db = InMemoryDatabase(wal=WriteAheadLog(wal_path, fsync_mode="off"), snapshot_path=snapshot_path)
+    db.get_tasks(page_size=10)
+    elapsed = time.perf_counter() - start
+    db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Tasks in the table")
+    parser.add_argument("--updates", type=int, default=200_000, help="Updates logged before the snapshot")
+    parser.add_argument("--tail", type=int, default=10_000, help="Updates logged after the snapshot")
+    parser.add_argument("--dir", default=None, help="Directory for the files (default: a temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        wal_path = os.path.join(directory, "tasks.wal")
+        full_wal_path = os.path.join(directory, "full.wal")
+        snapshot_path = os.path.join(directory, "tasks.snapshot")
+
+        print(f"Building history: {args.tasks:,} creates, {args.updates + args.tail:,} updates...")
+        db = InMemoryDatabase(wal=WriteAheadLog(wal_path, fsync_mode="off"))
+        populate(db, args.tasks)
+        update(db, args.updates, seed=1)
+
+        # Keep a copy of the complete log for the replay-only run
+        db.wal._file.flush()
+        with open(wal_path, "rb") as source, open(full_wal_path, "wb") as target:
+            target.write(source.read())
+
+        start = time.perf_counter()
+        db.snapshot(snapshot_path)
+        snapshot_seconds = time.perf_counter() - start
+
+        update(db, args.tail, seed=2)
+        db.close()
+        with open(wal_path, "rb") as source, open(full_wal_path, "ab") as target:
+            target.write(source.read())
+
+        print(f"Snapshot written in {snapshot_seconds:.2f}s "
+              f"({os.path.getsize(snapshot_path) / 2**20:.1f} MiB, "
+              f"full log {os.path.getsize(full_wal_path) / 2**20:.1f} MiB)")
+        print()
+        print(f"{'recovery':<22}{'seconds':>10}")
+        print("-" * 32)
+        print(f"{'full WAL replay':<22}{cold_start(full_wal_path):>10.2f}")
+        print(f"{'snapshot + WAL tail':<22}{cold_start(wal_path, snapshot_path):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
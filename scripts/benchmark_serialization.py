@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON rendering of large TasksResponse payloads
+
+Compares the stdlib JSONResponse, the orjson-backed FastJSONResponse and the
+pydantic-core ModelJSONResponse used by the task read routes.
+
+Usage:
+    python scripts/benchmark_serialization.py --tasks 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.task_models import TaskResponse, TasksResponse, TaskStatus, TaskPriority
+from app.utils import responses
+from app.utils.responses import FastJSONResponse, ModelJSONResponse
+
+
+def make_payload(count: int) -> TasksResponse:
+    now = datetime.now()
+    tasks = [
+        TaskResponse(
+            id=i,
+            title=f"Task {i}",
+            description="Benchmark task with a moderately long description",
+            status=list(TaskStatus)[i % 3],
+            priority=list(TaskPriority)[i % 3],
+            due_date=now + timedelta(days=i % 30),
+            tags=["bench", f"t{i % 7}"],
+            created_at=now,
+            updated_at=now
+        )
+        for i in range(1, count + 1)
+    ]
+    return TasksResponse(tasks=tasks, total=count, page=1, page_size=count)
+
+
+def timed(func, runs: int) -> float:
+    """Return the best of runs in milliseconds"""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000, help="Tasks in the payload")
+    parser.add_argument("--runs", type=int, default=20, help="Runs per encoder")
+    args = parser.parse_args()
+
+    payload = make_payload(args.tasks)
+    content = jsonable_encoder(payload)
+    stdlib = JSONResponse(content).body
+    assert FastJSONResponse(content).body == stdlib
+    assert ModelJSONResponse(payload).body == stdlib
+
+    if responses.orjson is None:
+        print("orjson is not installed; FastJSONResponse uses the stdlib fallback\n")
+
+    results = {
+        "JSONResponse (stdlib json)": timed(lambda: JSONResponse(content), args.runs),
+        "FastJSONResponse (orjson)": timed(lambda: FastJSONResponse(content), args.runs),
+        "ModelJSONResponse (warm cache)": timed(lambda: ModelJSONResponse(payload), args.runs),
+    }
+    baseline = results["JSONResponse (stdlib json)"]
+    print(f"{'encoder':<34}{'ms':>10}{'speedup':>10}")
+    print("-" * 54)
+    for name, elapsed in results.items():
+        print(f"{name:<34}{elapsed:>10.2f}{baseline / elapsed:>9.1f}x")
+    print(f"\npayload: {len(stdlib) / 1024:,.0f} KiB for {args.tasks:,} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark every storage backend with the same workload
+
+Each backend in BACKENDS is filled with the same pseudo-random tasks and
+then runs the same mix of reads and writes through the TaskStore
+interface, reporting p50/p99 latency and throughput per operation. New
+backends only need an entry in BACKENDS.
+
+Usage:
+    python scripts/benchmark_storage.py --tasks 100000 --runs 500
+    python scripts/benchmark_storage.py --backends memory,sqlite
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.base import TaskStore
+from app.database.database import InMemoryDatabase
+from app.database.sharded import ShardedDatabase
+from app.database.sqlite import SQLiteDatabase
+from app.database.wal import WriteAheadLog
+from app.models.task_models import TaskStatus, TaskPriority
+from benchmark_filters import generate_tasks, measure, percentile
+
+# Backend name -> factory building an empty store inside a scratch directory
+BACKENDS: Dict[str, Callable[[str], TaskStore]] = {
+    "memory": lambda directory: InMemoryDatabase(),
+    "memory+wal": lambda directory: InMemoryDatabase(
+        wal=WriteAheadLog(os.path.join(directory, "tasks.wal"))),
+    "memory+fsync": lambda directory: InMemoryDatabase(
+        wal=WriteAheadLog(os.path.join(directory, "tasks.wal"), fsync_mode="always")),
+    "sharded": lambda directory: ShardedDatabase(shards=4),
+    "sqlite": lambda directory: SQLiteDatabase(os.path.join(directory, "tasks.db")),
+}
+
+
+def fill(store: TaskStore, count: int, batch_size: int = 1000):
+    """Load count tasks through create_tasks in batches"""
+    batch = []
+    for task_data in generate_tasks(count):
+        batch.append(task_data)
+        if len(batch) == batch_size:
+            store.create_tasks(batch)
+            batch = []
+    if batch:
+        store.create_tasks(batch)
+
+
+def workload(store: TaskStore, count: int, seed: int = 7) -> Dict[str, Callable[[], object]]:
+    """The operations every backend is measured on"""
+    rng = random.Random(seed)
+    middle, _ = store.get_tasks(page=count // 20 or 1, page_size=10)
+    cursor = (middle[-1].created_at, middle[-1].id) if middle else None
+
+    return {
+        "get_task": lambda: store.get_task(rng.randint(1, count)),
+        "list page 1": lambda: store.get_tasks(page_size=20),
+        "list cursor": lambda: store.get_tasks(page_size=20, cursor=cursor),
+        "list status+prio": lambda: store.get_tasks(status=TaskStatus.COMPLETED,
+                                                    priority=TaskPriority.HIGH, page_size=20),
+        "list tag": lambda: store.get_tasks(tags=["tag7"], page_size=20),
+        "statistics": store.get_task_statistics,
+        "create_task": lambda: store.create_task({"title": "Benchmark", "tags": ["bench"]}),
+        "update_task": lambda: store.update_task(rng.randint(1, count),
+                                                 {"priority": rng.choice(list(TaskPriority))}),
+    }
+
+
+def run(name: str, factory: Callable[[str], TaskStore], tasks: int, runs: int, directory: str):
+    """Fill one backend, run the workload and print a result row per operation"""
+    store = factory(directory)
+    start = time.perf_counter()
+    fill(store, tasks)
+    print(f"{name}: filled {tasks:,} tasks in {time.perf_counter() - start:.1f}s")
+
+    for operation, func in workload(store, tasks).items():
+        timings = measure(func, runs)
+        print(f"  {operation:<18}{statistics.median(timings):>10.3f}{percentile(timings, 99):>10.3f}"
+              f"{runs / (sum(timings) / 1000):>12,.0f}")
+    store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", default=",".join(BACKENDS),
+                        help=f"Comma-separated backends (default: all of {', '.join(BACKENDS)})")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Tasks loaded into each backend")
+    parser.add_argument("--runs", type=int, default=500, help="Calls per operation")
+    parser.add_argument("--dir", default=None, help="Directory for backend files (default: a temp dir)")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.backends.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)}")
+
+    print(f"  {'operation':<18}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>12}")
+    for name in names:
+        with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+            run(name, BACKENDS[name], args.tasks, args.runs, directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark multi-tag queries: tag bitmaps vs. sorted id lists
+
+The database answers tag filters from per-tag bitmaps (unions for ANY,
+intersections for ALL). The baseline is the previous approach with a
+sorted id list per tag: a set union plus sort for ANY, and walking the
+smallest list while checking each task's tags for ALL. Both produce the
+first page and the total.
+
+Usage:
+    python scripts/benchmark_tags.py --tasks 1000000 --queries 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.database import InMemoryDatabase
+from app.models.task_models import TagMode
+from benchmark_filters import measure, percentile
+from benchmark_storage import fill
+
+CASES = {
+    "1 tag": ["tag1"],
+    "2 tags": ["tag1", "tag2"],
+    "5 tags": ["tag1", "tag2", "tag3", "tag4", "tag5"],
+    "rare + common": ["rare", "tag1"],
+}
+
+
+def sorted_lists(db: InMemoryDatabase, tag_lists: dict, tags: list, tag_mode: TagMode, page_size: int = 20):
+    """The id-list implementation of a tag-only get_tasks, kept as a baseline"""
+    buckets = [tag_lists.get(tag, []) for tag in set(tags)]
+    if len(buckets) == 1:
+        ids = buckets[0]
+    elif tag_mode == TagMode.ALL:
+        wanted = set(tags)
+        smallest = min(buckets, key=len)
+        ids = [i for i in smallest if wanted.issubset(db.tasks[i].tags)]
+    else:
+        ids = sorted(set().union(*buckets))
+    page = ids[-page_size:][::-1]
+    return [db._response(task_id) for task_id in page], len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=1_000_000, help="Number of stored tasks")
+    parser.add_argument("--queries", type=int, default=200, help="Runs per query")
+    args = parser.parse_args()
+
+    db = InMemoryDatabase()
+    fill(db, args.tasks)
+    tag_lists = {tag: list(bitmap) for tag, bitmap in db._tag_index.items()}
+
+    print(f"{'query':<16}{'mode':<6}{'lists p50':>12}{'bitmap p50':>12}{'bitmap p99':>12}{'speed-up':>10}")
+    print("-" * 68)
+    for name, tags in CASES.items():
+        for tag_mode in TagMode:
+            expected = sorted_lists(db, tag_lists, tags, tag_mode)
+            assert db.get_tasks(tags=tags, tag_mode=tag_mode, page_size=20) == expected
+            baseline = measure(lambda: sorted_lists(db, tag_lists, tags, tag_mode), args.queries)
+            bitmap = measure(lambda: db.get_tasks(tags=tags, tag_mode=tag_mode, page_size=20), args.queries)
+            print(f"{name:<16}{tag_mode.value:<6}{statistics.median(baseline):>12.3f}"
+                  f"{statistics.median(bitmap):>12.3f}{percentile(bitmap, 99):>12.3f}"
+                  f"{statistics.median(baseline) / statistics.median(bitmap):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
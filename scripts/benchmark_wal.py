@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark write throughput under each write-ahead log durability mode
+
+Every mode runs the same number of create_task calls spread over writer
+threads; "memory" is the database without a log.
+
+Usage:
+    python scripts/benchmark_wal.py --writes 50000 --threads 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.database.database import InMemoryDatabase
+from app.database.wal import WriteAheadLog, FSYNC_MODES
+
+
+def run(db: InMemoryDatabase, writes: int, threads: int) -> float:
+    """Create writes tasks from threads writers and return writes per second"""
+    per_thread = writes // threads
+
+    def writer(offset: int):
+        for i in range(per_thread):
+            db.create_task({"title": f"Task {offset + i}", "tags": ["wal"]})
+
+    workers = [threading.Thread(target=writer, args=(n * per_thread,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    db.close()
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writes", type=int, default=50_000, help="Writes per mode")
+    parser.add_argument("--always-writes", type=int, default=2_000, help="Writes for the per-write fsync mode")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent writer threads")
+    parser.add_argument("--interval-ms", type=int, default=50, help="Flush interval for interval/off modes")
+    parser.add_argument("--dir", default=None, help="Directory for the log files (default: a temp dir)")
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'writes/s':>12}{'log MiB':>10}")
+    print("-" * 32)
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        rate = run(InMemoryDatabase(), args.writes, args.threads)
+        print(f"{'memory':<10}{rate:>12,.0f}{'-':>10}")
+
+        for mode in FSYNC_MODES:
+            path = os.path.join(directory, f"{mode}.wal")
+            wal = WriteAheadLog(path, fsync_mode=mode, fsync_interval=args.interval_ms / 1000)
+            writes = args.always_writes if mode == "always" else args.writes
+            rate = run(InMemoryDatabase(wal=wal), writes, args.threads)
+            print(f"{mode:<10}{rate:>12,.0f}{os.path.getsize(path) / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
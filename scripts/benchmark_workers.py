@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark API throughput against the number of uvicorn worker processes
+
+Every worker serves the same SQLite file (database_url), reading it
+through a shared memory map (sqlite_mmap_size_mb). For each worker count
+the app is started with `uvicorn --workers N` and client processes drive
+a read-heavy request mix over HTTP for a fixed time. Run it once with
+--mmap-mb 0 to compare against reads copied into per-process caches.
+
+Usage:
+    python scripts/benchmark_workers.py --tasks 100000 --workers 1,2,4,8
+    python scripts/benchmark_workers.py --write-ratio 0.2 --mmap-mb 0
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+from app.database.sqlite import SQLiteDatabase
+from benchmark_event_loop import free_port
+from benchmark_storage import fill
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+
+async def client_loop(url: str, tasks: int, deadline: float, seed: int,
+                      concurrency: int, write_ratio: float) -> int:
+    async def worker(rng: random.Random) -> int:
+        requests = 0
+        while time.perf_counter() < deadline:
+            roll = rng.random()
+            if roll < write_ratio:
+                await http.put(f"/tasks/{rng.randint(1, tasks)}", json={"priority": "high"})
+            elif roll < (1 + write_ratio) / 2:
+                await http.get("/tasks", params={"status": "active", "page_size": 20})
+            else:
+                await http.get(f"/tasks/{rng.randint(1, tasks)}")
+            requests += 1
+        return requests
+
+    async with httpx.AsyncClient(base_url=url, timeout=60) as http:
+        counts = await asyncio.gather(*(worker(random.Random(seed * 1000 + n)) for n in range(concurrency)))
+    return sum(counts)
+
+
+def client(args: tuple) -> int:
+    """Client process entry point: returns the number of completed requests"""
+    url, tasks, seconds, seed, concurrency, write_ratio = args
+    return asyncio.run(client_loop(url, tasks, time.perf_counter() + seconds, seed, concurrency, write_ratio))
+
+
+def start_server(path: str, workers: int, port: int, mmap_mb: int) -> subprocess.Popen:
+    """Start uvicorn with the given worker count and wait until it answers"""
+    env = dict(os.environ, database_url=f"sqlite:///{path}", sqlite_mmap_size_mb=str(mmap_mb))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    parser.add_argument("--tasks", type=int, default=100_000, help="Tasks loaded before the runs")
+    parser.add_argument("--clients", type=int, default=4, help="Client processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="In-flight requests per client")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Load duration per worker count")
+    parser.add_argument("--write-ratio", type=float, default=0.0, help="Fraction of requests that update")
+    parser.add_argument("--mmap-mb", type=int, default=256, help="sqlite_mmap_size_mb for the workers")
+    parser.add_argument("--dir", default=None, help="Directory for the database file (default: a temp dir)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        path = os.path.join(directory, "tasks.db")
+        store = SQLiteDatabase(path)
+        fill(store, args.tasks)
+        store.close()
+
+        print(f"{os.cpu_count()} CPUs, mmap {args.mmap_mb} MB, write ratio {args.write_ratio}")
+        print(f"{'workers':<10}{'req/s':>10}{'speed-up':>10}")
+        print("-" * 30)
+        baseline = None
+        for workers in (int(count) for count in args.workers.split(",")):
+            port = free_port()
+            server = start_server(path, workers, port, args.mmap_mb)
+            try:
+                url = f"http://127.0.0.1:{port}"
+                jobs = [(url, args.tasks, args.seconds, seed, args.concurrency, args.write_ratio)
+                        for seed in range(args.clients)]
+                with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+                    rate = sum(pool.map(client, jobs)) / args.seconds
+            finally:
+                server.terminate()
+                server.wait()
+            baseline = baseline or rate
+            print(f"{workers:<10}{rate:>10,.0f}{rate / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ Make sure to start the FastAPI server before running this demo:
 
 or
 
-    uvicorn main:app --reload
+    uvicorn app.main:app --reload
 """
 
 import requests
@@ -47,7 +47,7 @@ def check_server():
             return False
     except requests.exceptions.ConnectionError:
         print("❌ Cannot connect to server. Please start the FastAPI server first.")
-        print("Run: python main.py or uvicorn main:app --reload")
+        print("Run: python main.py or uvicorn app.main:app --reload")
         return False
 
 def demo_basic_endpoints():
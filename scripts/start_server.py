@@ -58,7 +58,7 @@ def main():
     try:
         # Start the server
         uvicorn.run(
-            "main:app",
+            "app.main:app",
             host="0.0.0.0",
             port=8000,
             reload=True,
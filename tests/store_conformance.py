@@ -0,0 +1,359 @@
+"""
+Conformance suite for TaskStore backends
+
+Subclass TaskStoreConformance in a test module and implement make_store();
+every backend then runs the same behavioural checks:
+
+    class TestMyStore(TaskStoreConformance):
+        def make_store(self, tmp_path):
+            return MyStore(...)
+"""
+import time
+from datetime import datetime
+from typing import Optional
+
+import pytest
+
+from app.database.base import TaskStore
+from app.models.task_models import TaskStatus, TaskPriority, TagMode
+
+
+class TaskStoreConformance:
+    """Behaviour every TaskStore must share"""
+
+    def make_store(self, tmp_path) -> TaskStore:
+        raise NotImplementedError
+
+    def reopen(self, store: TaskStore, tmp_path) -> Optional[TaskStore]:
+        """Snapshot the store and open a new one from it; None if the backend has no snapshots"""
+        return None
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = self.make_store(tmp_path)
+        yield store
+        store.close()
+
+    @pytest.fixture
+    def populated(self, store):
+        """Ten tasks: ids 1-10, alternating even/odd tags, every third one high priority"""
+        store.create_tasks([
+            {"title": f"Task {i}",
+             "tags": ["even" if i % 2 == 0 else "odd"] + (["third"] if i % 3 == 0 else []),
+             "priority": TaskPriority.HIGH if i % 3 == 0 else TaskPriority.LOW,
+             "status": TaskStatus.COMPLETED if i >= 8 else TaskStatus.ACTIVE}
+            for i in range(10)
+        ])
+        return store
+
+    def test_implements_protocol(self, store):
+        """Test that the store structurally matches TaskStore"""
+        assert isinstance(store, TaskStore)
+
+    def test_restore_after_deletions(self, store, tmp_path):
+        """Test that a store restored from a snapshot with many deleted ids answers every query"""
+        kept = store.create_task({"title": "Kept", "tags": ["a"]})
+        store.create_tasks([{"title": f"Gone {i}", "tags": ["gone"]} for i in range(5000)])
+        assert store.delete_tasks_where(tags=["gone"]) == 5000
+        restored = self.reopen(store, tmp_path)
+        if restored is None:
+            pytest.skip("backend has no snapshots")
+        try:
+            for filters in ({"tags": ["a", "b"]}, {"status": TaskStatus.ACTIVE, "tags": ["a"]},
+                            {"tags": ["a", "b"], "tag_mode": TagMode.ALL}, {"tags": ["a"]}, {}):
+                tasks, total = restored.get_tasks(**filters)
+                expected = [] if filters.get("tag_mode") == TagMode.ALL else [kept]
+                assert (tasks, total) == (expected, len(expected)), filters
+            assert restored.create_task({"title": "New", "tags": ["a"]}).id == 5002
+            assert restored.get_tasks(priority=TaskPriority.MEDIUM, tags=["a"])[1] == 2
+        finally:
+            restored.close()
+
+    def test_create_and_get(self, store):
+        """Test that created tasks get defaults and read back unchanged"""
+        due = datetime(2030, 6, 1, 8, 0)
+        created = store.create_task({"title": "First", "description": "d", "due_date": due,
+                                     "tags": ["b", "a"]})
+        assert created.id == 1
+        assert created.status == TaskStatus.ACTIVE
+        assert created.priority == TaskPriority.MEDIUM
+        assert created.tags == ["b", "a"]
+        assert created.due_date == due
+        assert created.created_at == created.updated_at
+        assert store.get_task(created.id) == created
+        assert store.get_task(999) is None
+
+    def test_create_tasks_keeps_order(self, store):
+        """Test that a batch gets ascending ids in request order"""
+        created = store.create_tasks([{"title": f"Task {i}"} for i in range(5)])
+        assert [task.id for task in created] == [1, 2, 3, 4, 5]
+        assert [task.title for task in created] == [f"Task {i}" for i in range(5)]
+        assert store.create_tasks([]) == []
+
+    def test_ids_are_not_reused(self, store):
+        """Test that deleting the newest task does not free its id"""
+        store.create_tasks([{"title": "A"}, {"title": "B"}])
+        store.delete_task(2)
+        assert store.create_task({"title": "C"}).id == 3
+
+    def test_listing_is_newest_first(self, populated):
+        """Test offset pages, totals and a page past the end"""
+        tasks, total = populated.get_tasks(page=1, page_size=4)
+        assert total == 10
+        assert [task.id for task in tasks] == [10, 9, 8, 7]
+        tasks, _ = populated.get_tasks(page=3, page_size=4)
+        assert [task.id for task in tasks] == [2, 1]
+        assert populated.get_tasks(page=4, page_size=4) == ([], 10)
+
+    def test_filters(self, populated):
+        """Test status, priority and any-of tag filters, alone and combined"""
+        assert populated.get_tasks(status=TaskStatus.COMPLETED)[1] == 2
+        assert populated.get_tasks(priority=TaskPriority.HIGH)[1] == 4
+        assert populated.get_tasks(tags=["third"])[1] == 4
+        assert populated.get_tasks(tags=["even", "third"])[1] == 7
+        assert populated.get_tasks(tags=["missing"]) == ([], 0)
+
+        tasks, total = populated.get_tasks(tags=["even"], priority=TaskPriority.HIGH)
+        assert total == 2
+        assert [task.title for task in tasks] == ["Task 6", "Task 0"]
+
+        tasks, total = populated.get_tasks(status=TaskStatus.ACTIVE, tags=["third"])
+        assert [task.id for task in tasks] == [7, 4, 1]
+
+    def test_all_tags_filter(self, populated):
+        """Test that tag_mode=ALL keeps only tasks carrying every requested tag"""
+        tasks, total = populated.get_tasks(tags=["even", "third"], tag_mode=TagMode.ALL)
+        assert total == 2
+        assert [task.id for task in tasks] == [7, 1]
+        assert populated.get_tasks(tags=["third", "third"], tag_mode=TagMode.ALL)[1] == 4
+        assert populated.get_tasks(tags=["even", "missing"], tag_mode=TagMode.ALL) == ([], 0)
+
+        tasks, _ = populated.get_tasks(tags=["odd", "third"], tag_mode=TagMode.ALL, status=TaskStatus.COMPLETED)
+        assert [task.id for task in tasks] == [10]
+        tasks, _ = populated.get_tasks(tags=["even", "third"], tag_mode=TagMode.ALL,
+                                       page_size=1, cursor=(tasks[0].created_at, 7))
+        assert [task.id for task in tasks] == [1]
+
+        assert populated.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["odd", "third"],
+                                            tag_mode=TagMode.ALL) == 2
+        assert [task.id for task in populated.get_tasks_by_status(TaskStatus.ARCHIVED)] == [10, 4]
+        assert populated.delete_tasks_where(tags=["even", "third"], tag_mode=TagMode.ALL) == 2
+        assert populated.get_tasks(tags=["third"])[1] == 2
+
+    def test_cursor_pages(self, populated):
+        """Test that cursor pages continue exactly after the previous page"""
+        seen = []
+        cursor = None
+        while True:
+            tasks, total = populated.get_tasks(tags=["odd"], page_size=2, cursor=cursor)
+            if not tasks:
+                break
+            assert total == 5
+            seen.extend(task.id for task in tasks)
+            cursor = (tasks[-1].created_at, tasks[-1].id)
+        assert seen == [10, 8, 6, 4, 2]
+
+    def test_cursor_survives_deleted_task(self, populated):
+        """Test that a cursor still works after the task it points at is gone"""
+        tasks, _ = populated.get_tasks(page_size=3)
+        cursor = (tasks[-1].created_at, tasks[-1].id)
+        populated.delete_task(tasks[-1].id)
+        following, _ = populated.get_tasks(page_size=3, cursor=cursor)
+        assert [task.id for task in following] == [7, 6, 5]
+
+    def test_get_tasks_by_status(self, populated):
+        """Test that tasks by status come newest first"""
+        assert [task.id for task in populated.get_tasks_by_status(TaskStatus.COMPLETED)] == [10, 9]
+        assert populated.get_tasks_by_status(TaskStatus.ARCHIVED) == []
+
+    def test_update_task(self, store):
+        """Test that updates skip None values and refresh updated_at"""
+        created = store.create_task({"title": "Before", "description": "kept", "tags": ["x"]})
+        time.sleep(0.001)
+        updated = store.update_task(created.id, {"title": "After", "description": None,
+                                                 "priority": TaskPriority.HIGH, "tags": ["y", "z"]})
+        assert updated.title == "After"
+        assert updated.description == "kept"
+        assert updated.priority == TaskPriority.HIGH
+        assert updated.tags == ["y", "z"]
+        assert updated.created_at == created.created_at
+        assert updated.updated_at > created.updated_at
+        assert store.get_task(created.id) == updated
+        assert store.get_tasks(tags=["x"]) == ([], 0)
+        assert store.update_task(999, {"title": "Missing"}) is None
+
+    def test_update_tasks_where(self, populated):
+        """Test that filtered updates touch exactly the matching tasks"""
+        assert populated.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["third"]) == 4
+        assert [task.id for task in populated.get_tasks_by_status(TaskStatus.ARCHIVED)] == [10, 7, 4, 1]
+        assert populated.update_tasks_where({"tags": ["moved"]}, priority=TaskPriority.HIGH) == 4
+        assert populated.get_tasks(tags=["third"]) == ([], 0)
+        assert populated.get_tasks(tags=["moved"])[1] == 4
+        assert populated.update_tasks_where({"title": "None"}, tags=["missing"]) == 0
+
+    def test_delete(self, populated):
+        """Test single and filtered deletes"""
+        assert populated.delete_task(1)
+        assert not populated.delete_task(1)
+        assert populated.get_task(1) is None
+        assert populated.delete_tasks_where(status=TaskStatus.COMPLETED) == 2
+        assert populated.delete_tasks_where(tags=["even"]) == 3
+        tasks, total = populated.get_tasks()
+        assert total == 4
+        assert [task.id for task in tasks] == [8, 6, 4, 2]
+
+    def test_statistics(self, populated):
+        """Test the statistics shape and counts, and that they stay consistent"""
+        stats = populated.get_task_statistics()
+        assert stats["total"] == 10
+        assert (stats["active"], stats["completed"], stats["archived"]) == (8, 2, 0)
+        assert stats["by_priority"] == {"low": 6, "medium": 0, "high": 4}
+        assert stats["by_tag"] == {"even": 5, "odd": 5, "third": 4}
+
+        populated.update_task(1, {"tags": ["solo"], "status": TaskStatus.ARCHIVED})
+        populated.delete_tasks_where(tags=["even"])
+        stats = populated.get_task_statistics()
+        assert stats["total"] == 6
+        assert stats["archived"] == 1
+        assert stats["by_tag"].get("solo") == 1
+        assert populated.check_task_statistics() == {"consistent": True, "mismatches": {}}
+
+    def test_repeated_tags_count_once(self, store):
+        """Test that a tag given twice is stored and counted once"""
+        created = store.create_task({"title": "Twice", "tags": ["bug", "ui", "bug"]})
+        assert created.tags == ["bug", "ui"]
+        store.update_task(created.id, {"tags": ["ux", "ux"]})
+        store.create_tasks([{"title": "Again", "tags": ["bug", "bug"]}])
+        assert store.get_task(created.id).tags == ["ux"]
+        assert store.get_task_statistics()["by_tag"] == {"bug": 1, "ux": 1}
+        assert store.check_task_statistics() == {"consistent": True, "mismatches": {}}
+
+    def test_background_tasks(self, store):
+        """Test the background task lifecycle"""
+        created = store.create_background_task("job-1", "Starting")
+        assert created.status == "running"
+        assert created.progress == 0
+        assert store.create_background_task("job-2", "Waiting", status="queued").status == "queued"
+
+        running = store.update_background_task("job-1", "running", 50, "Halfway")
+        assert running.progress == 50
+        assert running.completed_at is None
+        done = store.update_background_task("job-1", "completed", 100, "Done", {"items": 2})
+        assert done.completed_at is not None
+        assert store.get_background_task("job-1").result == {"items": 2}
+        assert store.get_background_task("missing") is None
+        assert store.update_background_task("missing", "failed", 0, "") is None
+        assert [task.task_id for task in store.get_background_tasks()[0]] == ["job-1", "job-2"]
+
+    def test_background_task_pages(self, store):
+        """Test that background tasks are listed oldest first, by page and by status"""
+        for i in range(5):
+            store.create_background_task(f"job-{i}", "Waiting", status="queued")
+        store.update_background_task("job-1", "completed", 100, "Done")
+        store.update_background_task("job-3", "failed", 0, "Broke")
+
+        def listed(**filters):
+            bg_tasks, total = store.get_background_tasks(**filters)
+            return [task.task_id for task in bg_tasks], total
+
+        assert listed() == ([f"job-{i}" for i in range(5)], 5)
+        assert listed(page=2, page_size=2) == (["job-2", "job-3"], 5)
+        assert listed(page=4, page_size=2) == ([], 5)
+        assert listed(status="queued") == (["job-0", "job-2", "job-4"], 3)
+        assert listed(status="failed", page=2, page_size=1) == ([], 1)
+
+    def test_evict_background_tasks(self, store):
+        """Test that eviction drops expired, then least recently finished, tasks and keeps unfinished ones"""
+        store.create_background_task("running", "Working")
+        finished = {}
+        for i in range(5):
+            store.create_background_task(f"job-{i}", "Working")
+            finished[i] = store.update_background_task(f"job-{i}", "completed", 100, "Done").completed_at
+            time.sleep(0.002)
+        changes = []
+        store.changes.subscribe(changes.extend)
+
+        assert store.evict_background_tasks() == 0
+        assert store.evict_background_tasks(finished_before=finished[2]) == 2
+        assert store.evict_background_tasks(keep_finished=2) == 1
+        assert [task.task_id for task in store.get_background_tasks()[0]] == ["running", "job-3", "job-4"]
+        assert store.evict_background_tasks(finished_before=datetime.now(), keep_finished=5) == 2
+        assert store.get_background_tasks()[1] == 1
+        assert sorted((change.key, change.action) for change in changes) == [
+            (f"job-{i}", "deleted") for i in range(5)]
+
+    def test_background_task_reads_do_not_change(self, store):
+        """Test that a background task already read is not altered by later updates"""
+        store.create_background_task("job-1", "Waiting", status="queued")
+        running = store.update_background_task("job-1", "running", 40, "Working")
+        seen = store.get_background_task("job-1")
+        store.update_background_task("job-1", "completed", 100, "Done", {"items": 1})
+        assert (seen.status, seen.progress, seen.message, seen.result, seen.completed_at) == (
+            "running", 40, "Working", None, None)
+        assert (running.status, running.progress) == ("running", 40)
+        assert store.get_background_task("job-1").result == {"items": 1}
+
+    def test_background_task_changes(self, store):
+        """Test that background task writes are published, in order, until unsubscribed"""
+        changes = []
+        unsubscribe = store.changes.subscribe(changes.extend)
+        assert store.changes.wants("background_task")
+        store.create_background_task("job-1", "Waiting", status="queued")
+        store.update_background_task("job-1", "running", 40, "Working")
+        store.update_background_task("missing", "running", 40, "Working")
+        unsubscribe()
+        store.update_background_task("job-1", "completed", 100, "Done")
+        assert not store.changes.wants("background_task")
+        assert [(change.kind, change.key, change.action, change.data.status, change.data.progress)
+                for change in changes] == [("background_task", "job-1", "created", "queued", 0),
+                                           ("background_task", "job-1", "updated", "running", 40)]
+
+    def test_job_subscribers_skip_task_changes(self, populated):
+        """Test that a subscriber to background tasks alone gets no task changes"""
+        changes = []
+        populated.changes.subscribe(changes.extend, kinds=("background_task",))
+        assert populated.changes.wants("background_task")
+        assert not populated.changes.wants("task")
+        populated.create_tasks([{"title": "First"}, {"title": "Second"}])
+        populated.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["third"])
+        populated.delete_tasks_where(status=TaskStatus.ARCHIVED)
+        populated.create_background_task("job-1", "Waiting", status="queued")
+        assert [(change.kind, change.key) for change in changes] == [("background_task", "job-1")]
+
+    def test_task_changes(self, populated):
+        """Test that task mutations are published, deletions with the last state"""
+        batches = []
+        populated.changes.subscribe(batches.append)
+
+        def published():
+            # Sharded stores publish one batch per shard a mutation touches
+            changes = sorted((change.key, change.kind, change.action, change.data.status)
+                             for batch in batches for change in batch)
+            batches.clear()
+            return changes
+
+        created = populated.create_tasks([{"title": "First"}, {"title": "Second"}])
+        assert published() == [(task.id, "task", "created", TaskStatus.ACTIVE) for task in created]
+        populated.update_task(created[0].id, {"priority": TaskPriority.HIGH})
+        assert published() == [(created[0].id, "task", "updated", TaskStatus.ACTIVE)]
+        populated.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["third"])
+        assert published() == [(i, "task", "updated", TaskStatus.ARCHIVED) for i in (1, 4, 7, 10)]
+        populated.delete_task(created[1].id)
+        assert published() == [(created[1].id, "task", "deleted", TaskStatus.ACTIVE)]
+        populated.delete_tasks_where(status=TaskStatus.ARCHIVED)
+        assert published() == [(i, "task", "deleted", TaskStatus.ARCHIVED) for i in (1, 4, 7, 10)]
+        assert populated.update_tasks_where({"title": "None"}, tags=["missing"]) == 0
+        assert published() == []
+
+    def test_lock_statistics(self, store):
+        """Test that lock statistics name the backend's locking mode"""
+        assert "mode" in store.get_lock_statistics()
+
+    def test_clear_all(self, populated):
+        """Test that clear_all empties tasks and background tasks and restarts ids"""
+        populated.create_background_task("job", "Starting")
+        populated.clear_all()
+        assert populated.get_tasks() == ([], 0)
+        assert populated.get_background_tasks() == ([], 0)
+        assert populated.get_task_statistics()["total"] == 0
+        assert populated.create_task({"title": "Fresh"}).id == 1
@@ -1,11 +1,20 @@
+import asyncio
+
 import pytest
 import httpx
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocket, WebSocketDisconnect
 from datetime import datetime
 import json
+import threading
+import time
 
-from main import app
-from database import get_database
+from app.main import app
+from app.core.config import settings
+from app.database.database import get_database
+from app.api.dependencies import get_job_engine
+from app.database.async_store import AsyncStore
+from app.services.jobs import JobEngine
 
 # Create test client
 client = TestClient(app)
@@ -84,6 +93,70 @@ class TestTaskManagementAPI:
         response = client.post("/tasks", json=invalid_task)
         assert response.status_code == 422
 
+    def test_bulk_create(self):
+        """Test bulk task creation with per-item errors"""
+        items = [
+            {**sample_task, "title": "Bulk 1"},
+            {"title": ""},
+            {"title": "Bulk 2", "tags": ["a", "b", "c", "d", "e", "f"]},
+            "not an object",
+            {"title": "Bulk 3", "priority": "low"}
+        ]
+        response = client.post("/tasks/bulk", json=items)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert [error["index"] for error in data["errors"]] == [1, 2, 3]
+        assert data["errors"][1]["errors"][0]["loc"] == ["tags"]
+
+        titles = [client.get(f"/tasks/{task_id}").json()["title"] for task_id in data["ids"]]
+        assert titles == ["Bulk 1", "Bulk 3"]
+        assert client.get("/tasks?priority=low").json()["total"] == 1
+
+    def test_bulk_create_too_many_items(self):
+        """Test bulk creation rejects oversized batches"""
+        items = [{"title": f"Task {i}"} for i in range(settings.bulk_max_items + 1)]
+        response = client.post("/tasks/bulk", json=items)
+        assert response.status_code == 413
+
+    def test_bulk_update_and_delete_by_filter(self):
+        """Test updating and deleting all tasks matching a filter"""
+        tasks = [
+            {**sample_task, "title": "Done 1", "status": "completed", "tags": ["a"]},
+            {**sample_task, "title": "Done 2", "status": "completed", "tags": ["b"]},
+            {**sample_task, "title": "Open", "status": "active", "tags": ["a"]}
+        ]
+        response = client.post("/tasks/bulk", json=tasks)
+        assert response.json()["created"] == 3
+
+        response = client.put("/tasks/bulk?status=completed", json={"status": "archived"})
+        assert response.status_code == 200
+        assert response.json()["affected"] == 2
+
+        stats = client.get("/statistics?verify=true").json()
+        assert stats["statistics"]["archived"] == 2
+        assert stats["statistics"]["completed"] == 0
+        assert stats["consistency"]["consistent"]
+        archived = client.get("/tasks?status=archived").json()["tasks"]
+        assert [task["title"] for task in archived] == ["Done 2", "Done 1"]
+
+        response = client.delete("/tasks/bulk?status=archived&tags=a")
+        assert response.status_code == 200
+        assert response.json()["affected"] == 1
+
+        titles = [task["title"] for task in client.get("/tasks").json()["tasks"]]
+        assert titles == ["Open", "Done 2"]
+        assert client.get("/statistics?verify=true").json()["consistency"]["consistent"]
+
+    def test_bulk_update_and_delete_require_filter(self):
+        """Test bulk changes without a filter are rejected"""
+        response = client.put("/tasks/bulk", json={"status": "archived"})
+        assert response.status_code == 400
+        response = client.delete("/tasks/bulk")
+        assert response.status_code == 400
+        response = client.put("/tasks/bulk?status=active", json={})
+        assert response.status_code == 400
+
     def test_get_task_success(self):
         """Test successful task retrieval"""
         # Create a task first
@@ -189,6 +262,23 @@ class TestTaskManagementAPI:
         assert data["priority"] == sample_task_update["priority"]
         assert data["id"] == task_id
 
+    def test_reads_reflect_updates(self):
+        """Test that cached task responses are replaced on update"""
+        create_response = client.post("/tasks", json=sample_task)
+        task_id = create_response.json()["id"]
+
+        # Read once so the stored task has been serialized
+        assert client.get(f"/tasks/{task_id}").json() == create_response.json()
+
+        response = client.put(f"/tasks/{task_id}", json=sample_task_update)
+        assert response.status_code == 200
+
+        for data in (client.get(f"/tasks/{task_id}").json(),
+                     client.get("/tasks").json()["tasks"][0],
+                     client.get("/tasks/status/completed").json()[0]):
+            assert data == response.json()
+            assert data["title"] == sample_task_update["title"]
+
     def test_update_task_not_found(self):
         """Test task update with non-existent ID"""
         response = client.put("/tasks/999", json=sample_task_update)
@@ -264,6 +354,50 @@ class TestTaskManagementAPI:
         assert stats["completed"] == 1
         assert stats["archived"] == 1
 
+    def test_statistics_breakdown_and_verify(self):
+        """Test priority/tag breakdowns and the consistency check"""
+        tasks = [
+            {**sample_task, "title": "Task 1", "priority": "high", "tags": ["bug"]},
+            {**sample_task, "title": "Task 2", "priority": "low", "tags": ["Bug", "ui", "bug"]},
+            {**sample_task, "title": "Task 3", "priority": "low", "tags": []}
+        ]
+
+        ids = []
+        for task in tasks:
+            response = client.post("/tasks", json=task)
+            assert response.status_code == 201
+            ids.append(response.json()["id"])
+
+        client.put(f"/tasks/{ids[0]}", json={"status": "completed", "tags": ["ui"]})
+        client.delete(f"/tasks/{ids[2]}")
+
+        response = client.get("/statistics?verify=true")
+        assert response.status_code == 200
+        data = response.json()
+        stats = data["statistics"]
+        assert stats["total"] == 2
+        assert stats["active"] == 1
+        assert stats["completed"] == 1
+        assert stats["by_priority"] == {"low": 1, "medium": 0, "high": 1}
+        assert stats["by_tag"] == {"bug": 1, "ui": 2}
+        assert data["consistency"] == {"consistent": True, "mismatches": {}}
+
+        # Without verify no recount is reported
+        assert "consistency" not in client.get("/statistics").json()
+
+    def test_lock_statistics(self):
+        """Test lock wait statistics endpoint"""
+        client.post("/tasks", json=sample_task)
+        client.get("/tasks")
+
+        response = client.get("/statistics/locks")
+        assert response.status_code == 200
+        locks = response.json()["locks"]
+        assert locks["mode"] in ["rw", "exclusive"]
+        assert locks["tasks"]["write"]["acquisitions"] >= 1
+        assert locks["tasks"]["read"]["acquisitions"] >= 1
+        assert "max_wait_ms" in locks["background_tasks"]["read"]
+
     def test_start_background_task(self):
         """Test starting a background task"""
         response = client.post("/background-tasks?duration=2")
@@ -275,19 +409,163 @@ class TestTaskManagementAPI:
 
     def test_get_background_task_status(self):
         """Test getting background task status"""
-        # Start a background task
-        start_response = client.post("/background-tasks?duration=1")
-        assert start_response.status_code == 200
-        task_id = start_response.json()["task_id"]
-
-        # Get task status
-        response = client.get(f"/background-tasks/{task_id}")
+        # Jobs run on the app's event loop, which lives as long as the client context
+        with TestClient(app) as local_client:
+            # Start a background task
+            start_response = local_client.post("/background-tasks?duration=1")
+            assert start_response.status_code == 200
+            task_id = start_response.json()["task_id"]
+
+            # Get task status
+            response = local_client.get(f"/background-tasks/{task_id}")
         assert response.status_code == 200
         data = response.json()
         assert data["task_id"] == task_id
-        assert data["status"] in ["running", "completed"]
+        assert data["status"] in ["queued", "running", "completed"]
         assert "progress" in data
 
+    def test_background_task_events(self, monkeypatch):
+        """Test that one event stream delivers every progress step of a job"""
+        store = get_database()
+        lookups = []
+        get_background_task = store.get_background_task
+        monkeypatch.setattr(store, "get_background_task",
+                            lambda task_id: lookups.append(task_id) or get_background_task(task_id))
+
+        with TestClient(app) as local_client:
+            task_id = local_client.post("/background-tasks?duration=2").json()["task_id"]
+            response = local_client.get(f"/background-tasks/{task_id}/events")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines()
+                  if line.startswith("data: ")]
+        # Polling would need a request (and a lookup) per step; the stream needs
+        # one to answer 404 and one once it has subscribed
+        assert lookups == [task_id, task_id]
+        assert {50, 100} <= {event["progress"] for event in events}
+        assert events[-1]["status"] == "completed"
+        assert client.get("/background-tasks/missing/events").status_code == 404
+
+    def test_background_task_events_subscribe_with_the_body(self):
+        """Test that an event stream whose body never runs leaves no subscription behind"""
+        from app.api import background
+        store = get_database()
+        store.create_background_task("unread", "Queued sleep task", status="queued")
+        response = asyncio.run(background.stream_background_task("unread", AsyncStore(store)))
+        assert response.media_type == "text/event-stream"
+        assert not store.changes.wants("background_task")
+
+    def test_background_task_events_from_another_worker(self, monkeypatch):
+        """Test that an event stream ends when another worker finishes the job"""
+        from app.api import background
+        store = get_database()
+        store.create_background_task("elsewhere", "Queued sleep task", status="queued")
+        # Another worker's writes never reach this process's change feed
+        monkeypatch.setattr(store.changes, "publish", lambda changes: None)
+        monkeypatch.setattr(background, "SSE_KEEPALIVE_SECONDS", 0.05)
+        finish = threading.Timer(0.3, store.update_background_task,
+                                 ("elsewhere", "completed", 100, "Task completed successfully"))
+        finish.start()
+        try:
+            response = client.get("/background-tasks/elsewhere/events")
+        finally:
+            finish.join()
+        events = [json.loads(line[len("data: "):]) for line in response.text.splitlines()
+                  if line.startswith("data: ")]
+        assert [event["status"] for event in events] == ["queued", "completed"]
+        assert ": keep-alive" in response.text
+
+    def test_change_stream(self):
+        """Test that one WebSocket receives the task and job changes it subscribed to"""
+        with client.websocket_connect("/ws/changes") as websocket:
+            job_id = client.post("/background-tasks?duration=1").json()["task_id"]
+            websocket.send_json({"jobs": [job_id], "tasks": [{"status": "active", "tags": ["documentation"]}]})
+            ack = websocket.receive_json()
+            assert ack["type"] == "subscribed"
+            assert ack["subscription"]["jobs"] == [job_id]
+
+            client.post("/tasks", json={**sample_task, "status": "archived"})
+            created = client.post("/tasks", json=sample_task).json()
+            message = websocket.receive_json()
+            assert message["type"] == "changes"
+            assert [(c["kind"], c["key"], c["action"]) for c in message["changes"]] == [
+                ("task", created["id"], "created")]
+            assert message["changes"][0]["data"]["title"] == sample_task["title"]
+
+            websocket.send_json({"tasks": "everything"})
+            assert websocket.receive_json()["type"] == "error"
+
+            websocket.send_bytes(b'{"tasks": [{}]}')
+            with pytest.raises(WebSocketDisconnect) as closed:
+                websocket.receive_json()
+        assert closed.value.code == 1003
+
+    def test_change_stream_drops_slow_consumers(self, monkeypatch):
+        """Test that a client with more unsent changes than its buffer allows is disconnected"""
+        monkeypatch.setattr(settings, "websocket_send_buffer", 2)
+        with client.websocket_connect("/ws/changes") as websocket:
+            websocket.send_json({"tasks": [{}]})
+            assert websocket.receive_json()["type"] == "subscribed"
+            # More tasks than the buffer in one request reach a client that keeps up
+            client.post("/tasks/bulk", json=[sample_task] * 12)
+            received = 0
+            while received < 12:
+                received += len(websocket.receive_json()["changes"])
+            assert received == 12
+
+            # A client whose sends stall lets single changes pile up behind the one in flight
+            send_text = WebSocket.send_text
+
+            async def slow_send_text(self, data):
+                await asyncio.sleep(0.5)
+                await send_text(self, data)
+
+            monkeypatch.setattr(WebSocket, "send_text", slow_send_text)
+            for _ in range(6):
+                client.post("/tasks", json=sample_task)
+            with pytest.raises(WebSocketDisconnect) as closed:
+                while True:
+                    websocket.receive_json()
+        assert closed.value.code == 1013
+
+    def test_cpu_background_task(self):
+        """Test that a CPU-bound job runs in the process pool and reports progress"""
+        with TestClient(app) as local_client:
+            start_response = local_client.post("/background-tasks?duration=1&job_type=cpu")
+            assert start_response.status_code == 200
+            task_id = start_response.json()["task_id"]
+            deadline = time.monotonic() + 60
+            while time.monotonic() < deadline:
+                data = local_client.get(f"/background-tasks/{task_id}").json()
+                if data["status"] not in ["queued", "running"]:
+                    break
+                time.sleep(0.1)
+        assert data["status"] == "completed"
+        assert data["progress"] == 100
+        assert data["result"]["processed_items"] == 1
+        assert client.post("/background-tasks?job_type=gpu").status_code == 422
+
+    def test_background_queue_full(self):
+        """Test that a saturated job engine answers 503 with Retry-After"""
+        engine = JobEngine(workers=1, queue_size=1)
+        app.dependency_overrides[get_job_engine] = lambda: engine
+        try:
+            with TestClient(app) as local_client:
+                assert local_client.post("/background-tasks?duration=60").status_code == 200
+                assert local_client.post("/background-tasks?duration=60").status_code == 200
+                response = local_client.post("/background-tasks?duration=60")
+                assert response.status_code == 503
+                assert int(response.headers["Retry-After"]) >= 1
+                jobs = local_client.get("/statistics/jobs").json()["jobs"]
+                assert (jobs["busy_workers"], jobs["queued"], jobs["rejected"]) == (1, 1, 1)
+                local_client.portal.call(engine.shutdown)
+        finally:
+            app.dependency_overrides.pop(get_job_engine)
+        # The running job is cancelled and the queued one never starts
+        messages = sorted(task["message"] for task in client.get("/background-tasks").json()
+                          if task["status"] == "failed")
+        assert messages == ["Task cancelled by shutdown", "Task cancelled by shutdown before it started"]
+
     def test_get_background_task_not_found(self):
         """Test getting non-existent background task"""
         response = client.get("/background-tasks/non-existent-id")
@@ -307,6 +585,25 @@ class TestTaskManagementAPI:
         assert isinstance(data, list)
         assert len(data) >= 1
 
+    def test_background_task_pages(self):
+        """Test paging and status filtering of the background task list"""
+        db = get_database()
+        for i in range(5):
+            db.create_background_task(f"job-{i}", "Waiting", status="queued")
+        db.update_background_task("job-4", "failed", 0, "Broke")
+
+        response = client.get("/background-tasks", params={"page": 2, "page_size": 2})
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "5"
+        assert [task["task_id"] for task in response.json()] == ["job-2", "job-3"]
+
+        response = client.get("/background-tasks", params={"status": "failed"})
+        assert response.headers["X-Total-Count"] == "1"
+        assert [task["task_id"] for task in response.json()] == ["job-4"]
+
+        assert client.get("/background-tasks", params={"status": "done"}).status_code == 422
+        assert client.get("/background-tasks", params={"page_size": 101}).status_code == 422
+
     def test_invalid_task_id_format(self):
         """Test endpoints with invalid task ID format"""
         # Test with string ID
@@ -362,6 +659,60 @@ class TestTaskManagementAPI:
         data = response.json()
         assert len(data["tasks"]) == 2
 
+        # Tasks carrying both tags
+        response = client.get("/tasks?tags=urgent&tags=feature&tag_mode=all")
+        assert response.status_code == 200
+        data = response.json()
+        assert [task["title"] for task in data["tasks"]] == ["Task 3"]
+        assert client.get("/tasks?tags=urgent&tag_mode=some").status_code == 422
+
+    def test_combined_filters(self):
+        """Test combining status, priority and tag filters"""
+        tasks = [
+            {**sample_task, "title": "Task 1", "status": "active", "priority": "high", "tags": ["bug"]},
+            {**sample_task, "title": "Task 2", "status": "active", "priority": "low", "tags": ["bug"]},
+            {**sample_task, "title": "Task 3", "status": "completed", "priority": "high", "tags": ["feature"]},
+            {**sample_task, "title": "Task 4", "status": "active", "priority": "high", "tags": ["feature"]}
+        ]
+
+        for task in tasks:
+            response = client.post("/tasks", json=task)
+            assert response.status_code == 201
+
+        response = client.get("/tasks?status=active&priority=high")
+        assert response.status_code == 200
+        titles = {task["title"] for task in response.json()["tasks"]}
+        assert titles == {"Task 1", "Task 4"}
+
+        response = client.get("/tasks?status=active&tags=bug&tags=feature")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+
+        response = client.get("/tasks?priority=high&tags=missing")
+        assert response.status_code == 200
+        assert response.json()["total"] == 0
+
+    def test_filters_follow_updates_and_deletes(self):
+        """Test that filtering reflects updated and deleted tasks"""
+        create_response = client.post("/tasks", json={**sample_task, "tags": ["urgent"]})
+        assert create_response.status_code == 201
+        task_id = create_response.json()["id"]
+
+        response = client.put(f"/tasks/{task_id}", json={"status": "completed", "tags": ["done"]})
+        assert response.status_code == 200
+
+        assert client.get("/tasks?status=active").json()["total"] == 0
+        assert client.get("/tasks?status=completed").json()["total"] == 1
+        assert client.get("/tasks?tags=urgent").json()["total"] == 0
+        assert client.get("/tasks?tags=done").json()["total"] == 1
+
+        response = client.delete(f"/tasks/{task_id}")
+        assert response.status_code == 200
+
+        assert client.get("/tasks?status=completed").json()["total"] == 0
+        assert client.get("/tasks?tags=done").json()["total"] == 0
+
     def test_pagination(self):
         """Test task pagination"""
         # Create 15 tasks
@@ -386,6 +737,61 @@ class TestTaskManagementAPI:
         assert data["total"] == 15
         assert data["page"] == 2
 
+    def test_pagination_newest_first(self):
+        """Test that pages are ordered by creation time, newest first"""
+        for i in range(5):
+            task = {**sample_task, "title": f"Task {i+1}", "priority": "high" if i % 2 else "low"}
+            response = client.post("/tasks", json=task)
+            assert response.status_code == 201
+
+        response = client.get("/tasks?page=1&page_size=2")
+        assert [task["title"] for task in response.json()["tasks"]] == ["Task 5", "Task 4"]
+
+        response = client.get("/tasks?page=3&page_size=2")
+        assert [task["title"] for task in response.json()["tasks"]] == ["Task 1"]
+
+        response = client.get("/tasks?page=4&page_size=2")
+        assert response.json()["tasks"] == []
+
+        response = client.get("/tasks?priority=low&page=1&page_size=2")
+        assert [task["title"] for task in response.json()["tasks"]] == ["Task 5", "Task 3"]
+
+        response = client.get("/tasks/status/active")
+        assert [task["title"] for task in response.json()] == [f"Task {i}" for i in range(5, 0, -1)]
+
+    def test_cursor_pagination(self):
+        """Test keyset pagination with next_cursor"""
+        for i in range(5):
+            response = client.post("/tasks", json={**sample_task, "title": f"Task {i+1}"})
+            assert response.status_code == 201
+
+        response = client.get("/tasks?page_size=2")
+        data = response.json()
+        assert [task["title"] for task in data["tasks"]] == ["Task 5", "Task 4"]
+        assert data["next_cursor"]
+
+        # Tasks created after the first page do not shift later pages
+        client.post("/tasks", json={**sample_task, "title": "Task 6"})
+
+        titles = []
+        cursor = data["next_cursor"]
+        while cursor:
+            response = client.get(f"/tasks?page_size=2&cursor={cursor}")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["page"] is None
+            assert data["total"] == 6
+            titles.extend(task["title"] for task in data["tasks"])
+            cursor = data["next_cursor"]
+
+        assert titles == ["Task 3", "Task 2", "Task 1"]
+
+    def test_cursor_pagination_invalid_cursor(self):
+        """Test that a malformed cursor is rejected"""
+        response = client.get("/tasks?cursor=not-a-cursor")
+        assert response.status_code == 400
+        assert "Invalid cursor" in response.json()["error"]
+
 # Run tests
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,129 @@
+import asyncio
+import threading
+import time
+
+from app.database.async_store import AsyncStore
+from app.database.base import AsyncTaskStore
+from app.database.database import InMemoryDatabase
+from app.database.sqlite import SQLiteDatabase
+
+
+class SlowStore(InMemoryDatabase):
+    """In-memory store whose writes block like a slow disk"""
+
+    def create_task(self, task_data: dict):
+        time.sleep(0.2)
+        return super().create_task(task_data)
+
+
+class TestAsyncStore:
+    """Test suite for the awaitable store wrapper"""
+
+    def test_implements_protocol(self):
+        """Test that the wrapper structurally matches AsyncTaskStore"""
+        assert isinstance(AsyncStore(InMemoryDatabase()), AsyncTaskStore)
+
+    def test_offloads_all_but_inline_methods(self, tmp_path):
+        """Test that writes and disk-backed reads run on the pool, cheap reads on the loop"""
+        threads = {}
+
+        def spy(store):
+            for name in ("create_task", "get_task", "get_tasks_by_status"):
+                method = getattr(store, name)
+
+                def wrapper(*args, _method=method, _name=name, **kwargs):
+                    threads[_name] = threading.current_thread().name
+                    return _method(*args, **kwargs)
+
+                setattr(store, name, wrapper)
+            return store
+
+        async def exercise(store):
+            async_store = AsyncStore.with_threads(store, max_workers=2)
+            task = await async_store.create_task({"title": "Task"})
+            assert (await async_store.get_task(task.id)).title == "Task"
+            assert len(await async_store.get_tasks_by_status("active")) == 1
+            await async_store.close()
+            return dict(threads)
+
+        loop_thread = threading.current_thread().name
+        memory = asyncio.run(exercise(spy(InMemoryDatabase())))
+        assert memory["create_task"].startswith("store")
+        assert memory["get_task"] == loop_thread
+        # Builds every matching task, so it must not hold up the loop
+        assert memory["get_tasks_by_status"].startswith("store")
+
+        sqlite = asyncio.run(exercise(spy(SQLiteDatabase(str(tmp_path / "tasks.db")))))
+        assert sqlite["create_task"].startswith("store")
+        assert sqlite["get_task"].startswith("store")
+
+    def test_event_loop_keeps_running(self):
+        """Test that other coroutines progress while a slow call is in flight"""
+        async def exercise(async_store):
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            await async_store.create_task({"title": "Slow"})
+            ticking.cancel()
+            await async_store.shutdown()
+            return ticks
+
+        assert asyncio.run(exercise(AsyncStore.with_threads(SlowStore(), max_workers=1))) >= 5
+        # Without a pool the slow call stalls the loop for its whole duration
+        assert asyncio.run(exercise(AsyncStore(SlowStore()))) == 0
+
+    def test_inline_reads_skip_a_busy_lock(self):
+        """Test that an inline read goes to the pool instead of waiting on the loop for a writer"""
+        db = InMemoryDatabase()
+        task = db.create_task({"title": "Task"})
+        writing = threading.Event()
+
+        def hold_write_lock():
+            with db.lock.write():
+                writing.set()
+                time.sleep(0.2)
+
+        async def exercise():
+            async_store = AsyncStore.with_threads(db, max_workers=1)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticking = asyncio.create_task(ticker())
+            writer = threading.Thread(target=hold_write_lock)
+            writer.start()
+            writing.wait()
+            fetched = await async_store.get_task(task.id)
+            ticking.cancel()
+            writer.join()
+            await async_store.shutdown()
+            return fetched, ticks
+
+        fetched, ticks = asyncio.run(exercise())
+        assert fetched.title == "Task"
+        assert ticks >= 5
+
+    def test_close_waits_for_queued_calls(self):
+        """Test that close lets every queued write finish before closing the store"""
+        store = SlowStore()
+
+        async def exercise():
+            async_store = AsyncStore.with_threads(store, max_workers=1)
+            pending = [asyncio.ensure_future(async_store.create_task({"title": f"Task {i}"}))
+                       for i in range(3)]
+            await asyncio.sleep(0)
+            await async_store.close()
+            return await asyncio.gather(*pending)
+
+        created = asyncio.run(exercise())
+        assert [task.id for task in created] == [1, 2, 3]
@@ -0,0 +1,96 @@
+import random
+import sys
+
+from app.database.bitmap import ARRAY_MAX, ARRAY_MIN, CHUNK_BITS, Bitmap
+
+
+class TestBitmap:
+    """Test suite for the chunked id bitmaps behind the tag index"""
+
+    def test_matches_a_set(self):
+        """Test adds, removals, unions and intersections across chunk boundaries"""
+        rng = random.Random(5)
+        universe = range(1, 4 * CHUNK_BITS)
+        sets = [set(rng.sample(universe, 3000)) for _ in range(3)]
+        bitmaps = [Bitmap(ids) for ids in sets]
+        for bitmap, ids in zip(bitmaps, sets):
+            removed = set(rng.sample(sorted(ids), 500))
+            bitmap.difference_update(removed)
+            ids -= removed
+            extra = rng.randint(1, 4 * CHUNK_BITS)
+            bitmap.add(extra)
+            ids.add(extra)
+            gone = next(iter(ids))
+            bitmap.discard(gone)
+            ids.discard(gone)
+            assert list(bitmap) == sorted(ids)
+            assert len(bitmap) == len(ids)
+            assert gone not in bitmap and extra in bitmap
+
+        assert list(Bitmap.union(bitmaps)) == sorted(set().union(*sets))
+        assert list(Bitmap.intersection(bitmaps)) == sorted(set.intersection(*sets))
+        assert list(Bitmap.intersection([])) == []
+
+    def test_matches_a_set_with_dense_chunks(self):
+        """Test the same operations when chunks mix sorted arrays and bitsets"""
+        rng = random.Random(7)
+        universe = range(0, 3 * CHUNK_BITS)
+        sets = [set(rng.sample(universe, size)) for size in (30000, 12000, 500)]
+        bitmaps = [Bitmap(ids) for ids in sets]
+        for bitmap, ids in zip(bitmaps, sets):
+            for task_id in rng.sample(universe, 300):
+                bitmap.add(task_id)
+                ids.add(task_id)
+            for task_id in rng.sample(sorted(ids), 200):
+                bitmap.discard(task_id)
+                ids.discard(task_id)
+            removed = set(rng.sample(sorted(ids), len(ids) // 2))
+            bitmap.difference_update(removed)
+            ids -= removed
+            assert list(bitmap) == sorted(ids)
+            assert len(bitmap) == len(ids)
+
+        assert list(Bitmap.union(bitmaps)) == sorted(set().union(*sets))
+        assert list(Bitmap.intersection(bitmaps)) == sorted(set.intersection(*sets))
+        assert list(Bitmap.intersection(bitmaps[:2])) == sorted(sets[0] & sets[1])
+        newest_first = sorted(sets[0], reverse=True)
+        assert bitmaps[0].descending(100, 50) == newest_first[100:150]
+        before = CHUNK_BITS + 5
+        assert bitmaps[0].descending(3, 5, before=before) == [i for i in newest_first if i < before][3:8]
+
+    def test_chunks_switch_between_arrays_and_bitsets(self):
+        """Test that sparse chunks stay small arrays and dense ones become bitsets and back"""
+        single = Bitmap([CHUNK_BITS - 1])
+        assert type(single._chunks[0]) is not int
+        assert sys.getsizeof(single._chunks[0]) < 100
+
+        bitmap = Bitmap()
+        for task_id in range(ARRAY_MAX + 1):
+            bitmap.add(task_id)
+        assert type(bitmap._chunks[0]) is int
+        for task_id in range(ARRAY_MAX + 1 - ARRAY_MIN):
+            bitmap.discard(task_id)
+        assert type(bitmap._chunks[0]) is int
+        bitmap.discard(ARRAY_MAX)
+        assert type(bitmap._chunks[0]) is not int
+        assert list(bitmap) == list(range(ARRAY_MAX + 1 - ARRAY_MIN, ARRAY_MAX))
+        assert len(bitmap) == ARRAY_MIN - 1
+
+    def test_descending_pages(self):
+        """Test skip/limit paging from the newest id and seeking below a cursor id"""
+        ids = [1, 2, 5, CHUNK_BITS - 1, CHUNK_BITS, 3 * CHUNK_BITS + 7] + list(range(10, 200))
+        bitmap = Bitmap(ids)
+        newest_first = sorted(ids, reverse=True)
+        for skip, limit in ((0, 3), (2, 5), (5, 100), (150, 80), (196, 10)):
+            assert bitmap.descending(skip, limit) == newest_first[skip:skip + limit]
+        for before in (3, 11, CHUNK_BITS, CHUNK_BITS + 1, 10 * CHUNK_BITS):
+            expected = [task_id for task_id in newest_first if task_id < before][:4]
+            assert bitmap.descending(0, 4, before=before) == expected
+
+    def test_empty_chunks_are_dropped(self):
+        """Test that removing the last id of a chunk frees it"""
+        bitmap = Bitmap([3, CHUNK_BITS + 3])
+        bitmap.discard(CHUNK_BITS + 3)
+        bitmap.difference_update([3])
+        assert not bitmap
+        assert len(bitmap) == 0
@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.core.config import settings
+from app.database.columnar import ColumnarDatabase
+from app.database.database import InMemoryDatabase, create_database
+from app.database.sharded import ShardedDatabase
+from app.database.wal import WriteAheadLog
+from app.models.task_models import TaskStatus, TaskPriority, TagMode
+
+from store_conformance import TaskStoreConformance
+
+
+class TestColumnarStore(TaskStoreConformance):
+    """Conformance of the columnar engine"""
+
+    def make_store(self, tmp_path):
+        return ColumnarDatabase()
+
+    def reopen(self, store, tmp_path):
+        store.snapshot(str(tmp_path / "tasks.snapshot"))
+        return ColumnarDatabase(snapshot_path=str(tmp_path / "tasks.snapshot"))
+
+
+class TestShardedColumnarStore(TaskStoreConformance):
+    """Conformance of the sharded database built from columnar shards"""
+
+    def make_store(self, tmp_path):
+        return ShardedDatabase(shards=3, database_class=ColumnarDatabase)
+
+    def reopen(self, store, tmp_path):
+        store.snapshot(str(tmp_path / "tasks.snapshot"))
+        return ShardedDatabase(shards=3, snapshot_path=str(tmp_path / "tasks.snapshot"),
+                               database_class=ColumnarDatabase)
+
+
+class TestColumnarDatabase:
+    """Test suite for behaviour specific to the columnar engine"""
+
+    def test_matches_row_engine(self):
+        """Test that masks give the same pages, totals and counts as the id-list indexes"""
+        rng = random.Random(3)
+        columnar, rows = ColumnarDatabase(), InMemoryDatabase()
+        tasks = [{"title": f"Task {i}", "tags": rng.sample(["a", "b", "c", "d"], rng.randint(0, 2)),
+                  "status": rng.choice(list(TaskStatus)), "priority": rng.choice(list(TaskPriority))}
+                 for i in range(3000)]
+        for db in (columnar, rows):
+            db.create_tasks(tasks)
+            db.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["d"], priority=TaskPriority.LOW)
+            db.delete_tasks_where(status=TaskStatus.COMPLETED, tags=["a"])
+            db.update_task(5, {"tags": ["e"]})
+            db.delete_task(7)
+
+        def ids(result):
+            tasks, total = result
+            return [task.id for task in tasks], total
+
+        for filters in ({"status": TaskStatus.ACTIVE}, {"priority": TaskPriority.HIGH},
+                        {"tags": ["b", "e"]}, {"status": TaskStatus.ARCHIVED, "tags": ["d"]},
+                        {"tags": ["missing"]}):
+            for page in (1, 3, 1000):
+                assert (ids(columnar.get_tasks(page=page, page_size=25, **filters))
+                        == ids(rows.get_tasks(page=page, page_size=25, **filters)))
+            cursor = (None, 1500)
+            assert (ids(columnar.get_tasks(page_size=25, cursor=cursor, **filters))
+                    == ids(rows.get_tasks(page_size=25, cursor=cursor, **filters)))
+        assert columnar.get_task_statistics() == rows.get_task_statistics()
+        assert columnar.check_task_statistics()["consistent"]
+
+    def test_columns_grow_and_recover(self, tmp_path):
+        """Test that columns grow past their initial size and are rebuilt on replay"""
+        wal_path = str(tmp_path / "tasks.wal")
+        db = ColumnarDatabase(wal=WriteAheadLog(wal_path))
+        db.create_tasks([{"title": f"Task {i}", "tags": ["bulk"]} for i in range(5000)])
+        db.update_tasks_where({"priority": TaskPriority.HIGH}, tags=["bulk"])
+        db.close()
+
+        restored = ColumnarDatabase(wal=WriteAheadLog(wal_path))
+        assert restored.get_tasks(priority=TaskPriority.HIGH, tags=["bulk"])[1] == 5000
+        assert restored.get_task_statistics()["by_tag"] == {"bulk": 5000}
+        restored.clear_all()
+        assert restored.get_tasks(tags=["bulk"])[1] == 0
+        restored.close()
+
+    def test_rows_stay_in_id_order(self):
+        """Test that ids arriving out of order (as shards see them) still page newest first"""
+        rng = random.Random(5)
+        columnar, rows = ColumnarDatabase(), InMemoryDatabase()
+        ids = list(range(1, 2001))
+        rng.shuffle(ids)
+        for start in range(0, len(ids), 250):
+            batch = sorted(ids[start:start + 250])
+            tasks = [{"title": f"Task {i}", "tags": rng.sample(["a", "b", "c"], 2),
+                      "status": rng.choice(list(TaskStatus))} for i in batch]
+            for db in (columnar, rows):
+                db.create_tasks(tasks, task_ids=batch)
+        for db in (columnar, rows):
+            db.delete_tasks_where(status=TaskStatus.ARCHIVED, tags=["a"])
+            db.update_task(10, {"tags": ["a", "b"]})
+
+        def ids_of(result):
+            tasks, total = result
+            return [task.id for task in tasks], total
+
+        for filters in ({"status": TaskStatus.ACTIVE, "tags": ["a"]},
+                        {"tags": ["a", "b"], "tag_mode": TagMode.ALL}):
+            for page in (1, 7):
+                assert (ids_of(columnar.get_tasks(page=page, page_size=30, **filters))
+                        == ids_of(rows.get_tasks(page=page, page_size=30, **filters)))
+            assert (ids_of(columnar.get_tasks(page_size=30, cursor=(None, 1000), **filters))
+                    == ids_of(rows.get_tasks(page_size=30, cursor=(None, 1000), **filters)))
+        assert columnar._used == 2000
+
+    def test_shards_hold_only_their_rows(self):
+        """Test that each columnar shard sizes its columns by its own tasks, not the global ids"""
+        db = ShardedDatabase(shards=4, database_class=ColumnarDatabase)
+        db.create_tasks([{"title": f"Task {i}", "tags": ["x"]} for i in range(8000)])
+        assert [shard._used for shard in db.shards] == [2000] * 4
+        assert all(len(shard._alive) == 2048 for shard in db.shards)
+        assert db.get_tasks(status=TaskStatus.ACTIVE, tags=["x"], page=3, page_size=5)[0][0].id == 7990
+
+    def test_settings_select_columnar_shards(self, monkeypatch):
+        """Test that database_engine applies to every shard of a sharded store"""
+        for name in ("database_url", "wal_path", "snapshot_path"):
+            monkeypatch.setattr(settings, name, None)
+        monkeypatch.setattr(settings, "database_engine", "columnar")
+        monkeypatch.setattr(settings, "database_shards", 2)
+        db = create_database()
+        assert all(isinstance(shard, ColumnarDatabase) for shard in db.shards)
+        db.close()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.database.events import Change, ChangeFeed, SlowConsumer, Subscription
+from app.models.task_models import BackgroundTaskStatus
+
+
+def job_change(key: str, progress: int) -> Change:
+    return Change("background_task", key, "updated",
+                  BackgroundTaskStatus(task_id=key, status="running", progress=progress,
+                                       message="", started_at="2030-01-01T00:00:00"))
+
+
+class TestChangeFeed:
+    """Test suite for store change notifications"""
+
+    def test_subscription_batches_matching_changes_from_other_threads(self):
+        """Test that changes published on any thread arrive filtered and batched, in order"""
+        async def scenario():
+            feed = ChangeFeed()
+            with Subscription(feed, lambda change: change.key == "mine") as subscription:
+                publisher = threading.Thread(target=lambda: [
+                    feed.publish([job_change("mine", 10), job_change("other", 20)]),
+                    feed.publish([job_change("mine", 30)])
+                ])
+                publisher.start()
+                publisher.join()
+                changes = await subscription.get()
+            return changes, feed.wants("background_task")
+
+        changes, subscribed = asyncio.run(scenario())
+        assert [change.data.progress for change in changes] == [10, 30]
+        assert not subscribed
+
+    def test_slow_consumer_is_cut_off(self):
+        """Test that a subscriber falling more than limit changes behind gets SlowConsumer"""
+        async def scenario():
+            feed = ChangeFeed()
+            subscription = Subscription(feed, lambda change: True, limit=2)
+            feed.publish([job_change("a", 1), job_change("a", 2)])
+            await asyncio.sleep(0)
+            assert len(await subscription.get()) == 2
+            feed.publish([job_change("a", 3), job_change("a", 4)])
+            feed.publish([job_change("a", 5)])
+            await asyncio.sleep(0)
+            with pytest.raises(SlowConsumer):
+                await subscription.get()
+            return feed.wants("background_task")
+
+        assert asyncio.run(scenario()) is False
+
+    def test_consumer_that_keeps_up_takes_large_batches(self):
+        """Test that batches over the limit reach a consumer with nothing pending"""
+        async def scenario():
+            feed = ChangeFeed()
+            with Subscription(feed, lambda change: True, limit=2) as subscription:
+                # Nothing pending: one batch over the limit is accepted
+                feed.publish([job_change("a", progress) for progress in range(5)])
+                await asyncio.sleep(0)
+                first = await subscription.get()
+                # Waiting in get(): every batch of a mutation split across shards is taken at once
+                waiting = asyncio.ensure_future(subscription.get())
+                await asyncio.sleep(0)
+                publisher = threading.Thread(target=lambda: [
+                    feed.publish([job_change("b", progress) for progress in range(3)]) for _ in range(3)
+                ])
+                publisher.start()
+                publisher.join()
+                second = await waiting
+            return len(first), len(second)
+
+        assert asyncio.run(scenario()) == (5, 9)
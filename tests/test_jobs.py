@@ -0,0 +1,119 @@
+import asyncio
+import functools
+
+import pytest
+
+from app.services.jobs import JobEngine, JobQueueFull
+
+
+class TestJobEngine:
+    """Test suite for the bounded background job engine"""
+
+    def test_runs_at_most_workers_jobs_at_once(self):
+        """Test that jobs beyond the worker count wait in the queue"""
+        async def scenario():
+            engine = JobEngine(workers=2, queue_size=10)
+            running = peak = 0
+            done = []
+
+            async def job(n):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+                done.append(n)
+
+            for n in range(6):
+                engine.submit(lambda n=n: job(n))
+            assert engine.stats()["queued"] == 6
+            await engine._queue.join()
+            stats = engine.stats()
+            await engine.shutdown()
+            return peak, sorted(done), stats
+
+        peak, done, stats = asyncio.run(scenario())
+        assert peak == 2
+        assert done == list(range(6))
+        assert stats["completed"] == 6
+        assert stats["busy_workers"] == 0 and stats["queued"] == 0
+
+    def test_rejects_when_queue_is_full(self):
+        """Test that a full queue raises with a Retry-After estimate and counts the rejection"""
+        async def scenario():
+            engine = JobEngine(workers=1, queue_size=1)
+            release = asyncio.Event()
+            engine.submit(release.wait)
+            await asyncio.sleep(0)  # the worker takes the first job
+            engine.submit(release.wait)
+            with pytest.raises(JobQueueFull):
+                engine.ensure_capacity()
+            with pytest.raises(JobQueueFull) as error:
+                engine.submit(release.wait)
+            stats = engine.stats()
+            release.set()
+            await engine._queue.join()
+            await engine.shutdown()
+            return error.value.retry_after, stats
+
+        retry_after, stats = asyncio.run(scenario())
+        assert retry_after >= 1
+        assert stats["rejected"] == 2
+        assert (stats["busy_workers"], stats["utilisation"], stats["queued"]) == (1, 1.0, 1)
+
+    def test_failures_are_counted_and_shutdown_cancels(self):
+        """Test that a failing job does not stop its worker and shutdown cancels running jobs"""
+        async def scenario():
+            engine = JobEngine(workers=1, queue_size=5)
+            cancelled = asyncio.Event()
+
+            async def fail():
+                raise RuntimeError("boom")
+
+            async def forever():
+                try:
+                    await asyncio.sleep(3600)
+                except asyncio.CancelledError:
+                    cancelled.set()
+                    raise
+
+            engine.submit(fail)
+            engine.submit(forever)
+            await asyncio.sleep(0.01)
+            await engine.shutdown()
+            return engine.stats(), cancelled.is_set()
+
+        stats, cancelled = asyncio.run(scenario())
+        assert stats["failed"] == 1
+        assert cancelled
+
+    def test_shutdown_reports_dropped_jobs(self):
+        """Test that jobs still queued at shutdown never run and get their on_dropped call"""
+        async def scenario():
+            engine = JobEngine(workers=1, queue_size=5)
+            ran, dropped = [], []
+
+            async def job(n):
+                ran.append(n)
+
+            async def record(n):
+                dropped.append(n)
+
+            engine.submit(asyncio.Event().wait, on_dropped=functools.partial(record, "running"))
+            engine.submit(functools.partial(job, 0), on_dropped=functools.partial(record, 0))
+            engine.submit(functools.partial(job, 1))
+            engine.submit(functools.partial(job, 2), on_dropped=functools.partial(record, 2))
+            await asyncio.sleep(0)  # the worker takes the first job
+            await engine.shutdown()
+            return ran, dropped
+
+        ran, dropped = asyncio.run(scenario())
+        assert ran == []
+        assert dropped == [0, 2]
+
+    def test_needs_a_worker_and_a_slot(self):
+        """Test that an engine without workers or queue slots is refused"""
+        with pytest.raises(ValueError):
+            JobEngine(workers=0)
+        with pytest.raises(ValueError):
+            JobEngine(queue_size=0)
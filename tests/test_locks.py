@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from app.database.database import InMemoryDatabase
+from app.database.locks import ExclusiveLock, ReadWriteLock, WouldBlock, make_lock, nonblocking
+
+
+class TestLocks:
+    """Test suite for the database lock modes"""
+
+    def test_make_lock(self):
+        """Test lock construction by mode name"""
+        assert isinstance(make_lock("rw"), ReadWriteLock)
+        assert type(make_lock("exclusive")) is ExclusiveLock
+        with pytest.raises(ValueError):
+            make_lock("striped")
+
+    def test_readers_run_concurrently(self):
+        """Test that two readers can hold the rw lock at once"""
+        lock = ReadWriteLock()
+        both_inside = threading.Barrier(2, timeout=2)
+
+        def reader():
+            with lock.read():
+                both_inside.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert not both_inside.broken
+        assert lock.stats()["read"]["acquisitions"] == 2
+
+    def test_writer_excludes_readers(self):
+        """Test that a reader waits for an active writer"""
+        lock = ReadWriteLock()
+        events = []
+
+        def reader():
+            with lock.read():
+                events.append("read")
+
+        with lock.write():
+            thread = threading.Thread(target=reader)
+            thread.start()
+            time.sleep(0.05)
+            events.append("write done")
+        thread.join()
+
+        assert events == ["write done", "read"]
+        assert lock.stats()["read"]["max_wait_ms"] > 0
+
+    @pytest.mark.parametrize("lock_mode", ["rw", "exclusive"])
+    def test_nonblocking_refuses_a_busy_lock(self, lock_mode):
+        """Test that nonblocking() acquires a free lock and raises instead of waiting for a held one"""
+        lock = make_lock(lock_mode)
+        with nonblocking(), lock.read():
+            pass
+        held, release = threading.Event(), threading.Event()
+
+        def writer():
+            with lock.write():
+                held.set()
+                release.wait()
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        held.wait()
+        with pytest.raises(WouldBlock), nonblocking():
+            with lock.read():
+                pass
+        release.set()
+        thread.join()
+        with lock.read():
+            pass
+
+    @pytest.mark.parametrize("lock_mode", ["rw", "exclusive"])
+    def test_database_lock_modes(self, lock_mode):
+        """Test the database works the same in every lock mode"""
+        db = InMemoryDatabase(lock_mode=lock_mode)
+        task = db.create_task({"title": "Task"})
+        assert db.get_task(task.id).title == "Task"
+        assert db.get_tasks()[1] == 1
+
+        stats = db.get_lock_statistics()
+        assert stats["mode"] == lock_mode
+        assert stats["tasks"]["write"]["acquisitions"] == 1
+        assert stats["tasks"]["read"]["acquisitions"] == 2
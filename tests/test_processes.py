@@ -0,0 +1,41 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+from app.services.processes import ProcessPool, burn_cpu
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestProcessPool:
+    """Test suite for CPU-bound jobs in pool processes"""
+
+    def test_progress_is_reported_before_the_result(self):
+        """Test that a pool job's progress updates reach the parent in order"""
+        async def scenario():
+            pool = ProcessPool(processes=1)
+            updates = []
+
+            async def on_progress(progress, message):
+                updates.append((progress, message))
+
+            try:
+                result = await pool.run(burn_cpu, "job-1", 2, on_progress=on_progress)
+            finally:
+                pool.shutdown()
+            return result, updates
+
+        result, updates = asyncio.run(scenario())
+        assert result["processed_items"] == 2 and result["hashes"] > 0
+        assert [progress for progress, _ in updates] in ([50, 100], [50])
+        assert updates[0][1] == "Processing step 1/2"
+
+    def test_imports_do_not_open_the_database(self, tmp_path):
+        """Test that what a spawned pool process imports leaves the write-ahead log alone"""
+        wal_path = tmp_path / "tasks.wal"
+        env = {**os.environ, "wal_path": str(wal_path), "PYTHONPATH": ROOT}
+        env.pop("database_url", None)
+        subprocess.run([sys.executable, "-c", "import main, app.main, app.services.processes"],
+                       cwd=ROOT, env=env, check=True)
+        assert not wal_path.exists()
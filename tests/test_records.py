@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from app.database.database import InMemoryDatabase
+from app.database.records import TaskRecord
+
+
+class TestTaskRecords:
+    """Test suite for the compact stored task rows"""
+
+    def test_rows_are_slotted_with_interned_tags(self):
+        """Test that stored rows carry no per-task dict and share tag strings"""
+        db = InMemoryDatabase()
+        first, second = (db.create_task({"title": "Task", "tags": json.loads('["shared", "tag"]')})
+                         for _ in range(2))
+        row = db.tasks[first.id]
+        assert isinstance(row, TaskRecord)
+        assert not hasattr(row, "__dict__")
+        assert row.tags == ("shared", "tag")
+        assert row.tags[0] is db.tasks[second.id].tags[0]
+        assert first.tags == ["shared", "tag"]
+        with pytest.raises(AttributeError):
+            row.owner = "someone"
+
+    def test_update_keeps_unset_fields(self):
+        """Test that updates replace only non-null fields and re-intern tags"""
+        db = InMemoryDatabase()
+        task = db.create_task({"title": "Task", "description": "d", "tags": ["a"]})
+        updated = db.update_task(task.id, {"title": None, "tags": json.loads('["b"]')})
+        assert (updated.title, updated.description, updated.tags) == ("Task", "d", ["b"])
+        assert isinstance(db.tasks[task.id].tags, tuple)
+        assert db.check_task_statistics()["consistent"]
+
+    def test_job_subscribers_build_no_task_responses(self):
+        """Test that watching background tasks does not make task writes build responses"""
+        db = InMemoryDatabase()
+        db.changes.subscribe(lambda changes: None, kinds=("background_task",))
+        db.create_tasks([{"title": f"Task {i}"} for i in range(4)])
+        assert db.update_tasks_where({"title": "Renamed"}) == 4
+        assert len(db._responses) == 0
+
+    def test_response_cache_is_bounded(self):
+        """Test that only the most recently read tasks keep a cached response"""
+        db = InMemoryDatabase(response_cache_size=2)
+        tasks = db.create_tasks([{"title": f"Task {i}"} for i in range(4)])
+        assert len(db._responses) == 0
+        first = db.get_task(tasks[0].id)
+        assert db.get_task(tasks[0].id) is first
+        db.get_task(tasks[1].id)
+        db.get_task(tasks[0].id)
+        db.get_task(tasks[2].id)
+        assert len(db._responses) == 2
+        assert db.get_task(tasks[0].id) is first
+        assert db._responses.get(tasks[1].id) is None
+        updated = db.update_task(tasks[0].id, {"title": "Renamed"})
+        assert db.get_task(tasks[0].id) is updated and updated.title == "Renamed"
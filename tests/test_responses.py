@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.models.task_models import TaskResponse, TasksResponse, TaskStatus, TaskPriority
+from app.utils import responses
+from app.utils.responses import FastJSONResponse, ModelJSONResponse
+
+
+def make_page() -> TasksResponse:
+    task = TaskResponse(
+        id=1,
+        title="Überprüfen",
+        description=None,
+        status=TaskStatus.COMPLETED,
+        priority=TaskPriority.HIGH,
+        due_date=datetime(2024, 5, 1, 12, 0),
+        tags=["docs"],
+        created_at=datetime(2024, 4, 1, 8, 30, 15, 123456),
+        updated_at=datetime(2024, 4, 2, 9, 0, 0, 1)
+    )
+    return TasksResponse(tasks=[task], total=1, page=1, page_size=10)
+
+
+class TestResponses:
+    """Test suite for the JSON response classes"""
+
+    def test_fast_json_matches_stdlib(self):
+        """Test orjson rendering is byte-identical to JSONResponse"""
+        content = jsonable_encoder(make_page())
+        assert FastJSONResponse(content).body == JSONResponse(content).body
+
+    def test_fast_json_fallback(self, monkeypatch):
+        """Test the stdlib fallback when orjson is unavailable"""
+        content = jsonable_encoder(make_page())
+        monkeypatch.setattr(responses, "orjson", None)
+        assert FastJSONResponse(content).body == JSONResponse(content).body
+
+    def test_model_json_matches_stdlib(self):
+        """Test the pydantic-core byte path matches JSONResponse"""
+        page = make_page()
+        expected = JSONResponse(jsonable_encoder(page)).body
+        assert ModelJSONResponse(page).body == expected
+        # Second render comes from the cached task bytes
+        assert ModelJSONResponse(page).body == expected
+        assert ModelJSONResponse(page.tasks).body == JSONResponse(jsonable_encoder(page.tasks)).body
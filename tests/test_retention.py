@@ -0,0 +1,47 @@
+import time
+
+from app.database.database import InMemoryDatabase
+from app.services.retention import RetentionSweeper
+
+
+def finish(db: InMemoryDatabase, *task_ids: str):
+    for task_id in task_ids:
+        db.create_background_task(task_id, "Working")
+        db.update_background_task(task_id, "completed", 100, "Done")
+
+
+class TestRetention:
+    """Test suite for background task retention"""
+
+    def test_reads_refresh_recency(self):
+        """Test that reading a finished task keeps it over ones finished after it"""
+        db = InMemoryDatabase()
+        finish(db, "a", "b", "c")
+        db.get_background_task("a")
+        assert db.evict_background_tasks(keep_finished=2) == 1
+        assert db.get_background_task("b") is None
+        assert db.get_background_task("a") is not None
+
+    def test_sweep_applies_both_limits(self):
+        """Test that a sweep evicts by age and by count"""
+        db = InMemoryDatabase()
+        finish(db, "a", "b", "c")
+        assert RetentionSweeper(db, max_age=None, max_finished=1, interval=60).sweep() == 2
+        assert RetentionSweeper(db, max_age=3600, max_finished=None, interval=60).sweep() == 0
+        assert RetentionSweeper(db, max_age=0, max_finished=None, interval=60).sweep() == 1
+        assert db.get_background_tasks() == ([], 0)
+
+    def test_sweeper_thread(self):
+        """Test that the sweeper keeps evicting until stopped"""
+        db = InMemoryDatabase()
+        db.create_background_task("running", "Working")
+        sweeper = RetentionSweeper(db, max_age=None, max_finished=0, interval=0.01)
+        sweeper.start()
+        try:
+            finish(db, "a")
+            deadline = time.monotonic() + 5
+            while db.get_background_tasks()[1] > 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            sweeper.stop()
+        assert [task.task_id for task in db.get_background_tasks()[0]] == ["running"]
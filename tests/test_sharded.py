@@ -0,0 +1,115 @@
+import pytest
+
+from app.database.database import InMemoryDatabase
+from app.database.sharded import ShardedDatabase, check_shard_count, shard_path
+from app.models.task_models import TaskStatus
+
+
+class TestShardedDatabase:
+    """Test suite for behaviour specific to the sharded database"""
+
+    def test_tasks_spread_across_shards(self):
+        """Test that ids are routed by modulo and each shard indexes only its own tasks"""
+        db = ShardedDatabase(shards=4)
+        db.create_tasks([{"title": f"Task {i}"} for i in range(8)])
+        db.create_task({"title": "Single"})
+
+        assert [sorted(shard.tasks) for shard in db.shards] == [[4, 8], [1, 5, 9], [2, 6], [3, 7]]
+        assert db.get_task(9).title == "Single"
+        assert len(db.get_lock_statistics()["shards"]) == 4
+
+    def test_pages_merge_across_shards(self):
+        """Test that offset and cursor pages match a single database holding the same tasks"""
+        sharded, single = ShardedDatabase(shards=3), InMemoryDatabase()
+        tasks = [{"title": f"Task {i}", "tags": ["even" if i % 2 == 0 else "odd"],
+                  "status": TaskStatus.COMPLETED if i % 3 == 0 else TaskStatus.ACTIVE}
+                 for i in range(40)]
+        for db in (sharded, single):
+            db.create_tasks(tasks[:25])
+            for task_data in tasks[25:]:
+                db.create_task(task_data)
+            db.delete_tasks_where(status=TaskStatus.COMPLETED, tags=["odd"])
+
+        def ids(result):
+            tasks, total = result
+            return [task.id for task in tasks], total
+
+        for filters in ({}, {"tags": ["even"]}, {"status": TaskStatus.ACTIVE}):
+            for page in (1, 2, 4):
+                assert (ids(sharded.get_tasks(page=page, page_size=7, **filters))
+                        == ids(single.get_tasks(page=page, page_size=7, **filters)))
+            first, _ = single.get_tasks(page_size=5, **filters)
+            cursor = (first[-1].created_at, first[-1].id)
+            assert (ids(sharded.get_tasks(page_size=5, cursor=cursor, **filters))
+                    == ids(single.get_tasks(page_size=5, cursor=cursor, **filters)))
+
+        assert sharded.get_task_statistics() == single.get_task_statistics()
+        assert sharded.check_task_statistics()["consistent"]
+
+    def test_deep_pages_build_only_their_tasks(self):
+        """Test that shards merge ids and build response models for the requested page alone"""
+        db = ShardedDatabase(shards=3, response_cache_size=0)
+        db.create_tasks([{"title": f"Task {i}"} for i in range(300)])
+        built = []
+        for shard in db.shards:
+            response = shard._response
+            shard._response = lambda task_id, response=response: built.append(task_id) or response(task_id)
+        tasks, total = db.get_tasks(page=20, page_size=10)
+        assert [task.id for task in tasks] == list(range(110, 100, -1)) and total == 300
+        assert sorted(built) == list(range(101, 111))
+
+    def test_recovers_every_shard(self, tmp_path):
+        """Test that per-shard snapshots and logs restore all tasks and the id counter"""
+        wal_path, snapshot_path = str(tmp_path / "tasks.wal"), str(tmp_path / "tasks.snapshot")
+        db = ShardedDatabase(shards=2, wal_path=wal_path, snapshot_path=snapshot_path)
+        db.create_tasks([{"title": f"Task {i}"} for i in range(5)])
+        db.snapshot(snapshot_path)
+        db.update_task(2, {"status": TaskStatus.COMPLETED})
+        db.delete_task(5)
+        db.close()
+
+        assert all((tmp_path / f"tasks.snapshot.shard{i}").exists() for i in range(2))
+        restored = ShardedDatabase(shards=2, wal_path=wal_path, snapshot_path=snapshot_path)
+        tasks, total = restored.get_tasks(page_size=10)
+        assert [task.id for task in tasks] == [4, 3, 2, 1] and total == 4
+        assert restored.get_task(2).status == TaskStatus.COMPLETED
+        # The deleted task's id is not handed out again
+        assert restored.create_task({"title": "New"}).id == 6
+        assert shard_path(wal_path, 1).endswith("tasks.wal.shard1")
+        restored.close()
+
+    def test_shard_count_in_a_new_directory(self, tmp_path):
+        """Test that stores can be opened on paths whose directory does not exist yet"""
+        check_shard_count(str(tmp_path / "single" / "tasks.wal"), 1)
+        db = ShardedDatabase(shards=2, wal_path=str(tmp_path / "sharded" / "tasks.wal"))
+        db.create_task({"title": "Task"})
+        db.close()
+        assert (tmp_path / "sharded" / "tasks.wal.shards").read_text() == "2"
+        restored = ShardedDatabase(shards=2, wal_path=str(tmp_path / "sharded" / "tasks.wal"))
+        assert restored.get_task(1).title == "Task"
+        restored.close()
+
+    def test_refuses_a_different_shard_count(self, tmp_path):
+        """Test that files written with one shard count cannot be opened with another"""
+        wal_path = str(tmp_path / "tasks.wal")
+        db = ShardedDatabase(shards=2, wal_path=wal_path)
+        db.create_tasks([{"title": f"Task {i}"} for i in range(6)])
+        db.close()
+
+        with pytest.raises(ValueError, match="2 shard"):
+            ShardedDatabase(shards=3, wal_path=wal_path)
+        (tmp_path / "tasks.wal.shards").unlink()  # files from before the count was recorded
+        with pytest.raises(ValueError, match="2 shard"):
+            ShardedDatabase(shards=3, wal_path=wal_path)
+        with pytest.raises(ValueError, match="2 shard"):
+            check_shard_count(wal_path, 1)
+
+        restored = ShardedDatabase(shards=2, wal_path=wal_path)
+        assert restored.get_task(3).title == "Task 2"
+        restored.close()
+        assert (tmp_path / "tasks.wal.shards").read_text() == "2"
+
+        # A store that was never sharded
+        (tmp_path / "tasks.snapshot").write_bytes(b"")
+        with pytest.raises(ValueError, match="1 shard"):
+            ShardedDatabase(shards=2, snapshot_path=str(tmp_path / "tasks.snapshot"))
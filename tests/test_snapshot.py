@@ -0,0 +1,126 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from app.database.database import InMemoryDatabase
+from app.database.snapshot import Snapshotter, read_snapshot
+from app.database.wal import WriteAheadLog
+from app.models.task_models import TaskStatus, TaskPriority
+
+
+def state(db: InMemoryDatabase) -> dict:
+    """Everything a restart has to reproduce"""
+    tasks, total = db.get_tasks(page_size=1000)
+    return {
+        "tasks": [task.model_dump() for task in tasks],
+        "total": total,
+        "statistics": db.get_task_statistics(),
+        "next_task_id": db.next_task_id
+    }
+
+
+class TestSnapshots:
+    """Test suite for snapshots and snapshot + log tail recovery"""
+
+    @pytest.fixture
+    def paths(self, tmp_path):
+        return str(tmp_path / "tasks.wal"), str(tmp_path / "tasks.snapshot")
+
+    def test_snapshot_round_trip(self, paths):
+        """Test that a snapshot alone restores every task field"""
+        _, snapshot_path = paths
+        db = InMemoryDatabase()
+        db.create_task({"title": "Due", "description": "d", "tags": ["a", "b"],
+                        "priority": TaskPriority.HIGH, "due_date": datetime(2030, 1, 1, 12, 30)})
+        db.create_task({"title": "Plain", "status": TaskStatus.ARCHIVED})
+        db.delete_task(1)
+        db.snapshot(snapshot_path)
+
+        restored = InMemoryDatabase(snapshot_path=snapshot_path)
+        assert state(restored) == state(db)
+        assert restored.check_task_statistics()["consistent"]
+        # Ids are not reused after deleting the newest task
+        db.delete_task(2)
+        db.snapshot(snapshot_path)
+        assert InMemoryDatabase(snapshot_path=snapshot_path).create_task({"title": "New"}).id == 3
+
+    def test_recovery_replays_only_the_tail(self, paths):
+        """Test that records written after the snapshot are replayed on top of it"""
+        wal_path, snapshot_path = paths
+        db = InMemoryDatabase(wal=WriteAheadLog(wal_path), snapshot_path=snapshot_path)
+        db.create_tasks([{"title": f"Task {i}", "tags": ["x"]} for i in range(10)])
+        db.snapshot(snapshot_path)
+        assert read_snapshot(snapshot_path).lsn == 1
+        assert os.path.getsize(wal_path) == 0
+        assert not os.path.exists(wal_path + ".prev")
+
+        db.update_tasks_where({"status": TaskStatus.COMPLETED}, tags=["x"])
+        db.delete_task(3)
+        db.create_task({"title": "After snapshot"})
+        expected = state(db)
+        db.close()
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(wal_path), snapshot_path=snapshot_path)
+        assert state(restored) == expected
+        assert restored.wal.lsn == 4
+        restored.close()
+
+    def test_records_covered_by_snapshot_are_skipped(self, paths):
+        """Test recovery after a crash between writing the snapshot and dropping the old log"""
+        wal_path, snapshot_path = paths
+        db = InMemoryDatabase(wal=WriteAheadLog(wal_path))
+        db.create_task({"title": "Once"})
+        db.snapshot(snapshot_path)
+        db.create_task({"title": "Twice"})
+        db.close()
+        # Put the already snapshotted record back in front of the log
+        with open(wal_path + ".prev", "wb") as rotated:
+            rotated.write(b'{"op":"create","tasks":[{"id":1,"title":"Once","description":null,'
+                          b'"status":"active","priority":"medium","due_date":null,"tags":[],'
+                          b'"created_at":"2030-01-01T00:00:00","updated_at":"2030-01-01T00:00:00"}],'
+                          b'"lsn":1}\n')
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(wal_path), snapshot_path=snapshot_path)
+        assert [task.title for task in restored.get_tasks()[0]] == ["Twice", "Once"]
+        restored.close()
+
+    def test_failed_snapshot_keeps_the_log(self, paths, monkeypatch):
+        """Test that records rotated out for a failed snapshot are still replayed"""
+        wal_path, snapshot_path = paths
+        db = InMemoryDatabase(wal=WriteAheadLog(wal_path))
+        db.create_task({"title": "First"})
+
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("app.database.database.write_snapshot", fail)
+        with pytest.raises(OSError):
+            db.snapshot(snapshot_path)
+        db.create_task({"title": "Second"})
+        with pytest.raises(OSError):
+            db.snapshot(snapshot_path)
+        db.create_task({"title": "Third"})
+        expected = state(db)
+        db.close()
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(wal_path), snapshot_path=snapshot_path)
+        assert state(restored) == expected
+        restored.close()
+
+    def test_snapshotter_skips_idle_periods(self, paths):
+        """Test that a snapshot is only written when tasks changed"""
+        _, snapshot_path = paths
+        db = InMemoryDatabase()
+        snapshotter = Snapshotter(db, snapshot_path, interval=60)
+        assert not snapshotter.snapshot_if_changed()
+        assert not os.path.exists(snapshot_path)
+
+        db.create_task({"title": "Changed"})
+        assert snapshotter.snapshot_if_changed()
+        assert not snapshotter.snapshot_if_changed()
+
+        db.create_task({"title": "Changed again"})
+        snapshotter.start()
+        snapshotter.stop(final_snapshot=True)
+        assert len(read_snapshot(snapshot_path).tasks) == 2
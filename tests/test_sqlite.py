@@ -0,0 +1,168 @@
+import multiprocessing
+import threading
+from datetime import datetime
+
+import pytest
+
+from app.database.sqlite import SQLiteDatabase, sqlite_path
+from app.models.task_models import TaskStatus, TaskPriority
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "tasks.db"))
+    yield database
+    database.close()
+
+
+def create_tasks_in_process(path: str, count: int):
+    db = SQLiteDatabase(path)
+    for i in range(count):
+        db.create_task({"title": f"Task {i}", "tags": ["worker"]})
+    db.close()
+
+
+class TestSQLiteDatabase:
+    """Test suite for the SQLite storage backend"""
+
+    def test_database_url(self):
+        """Test that sqlite:/// URLs map to file paths"""
+        assert sqlite_path("sqlite:///tasks.db") == "tasks.db"
+        assert sqlite_path("sqlite:////var/lib/tasks.db") == "/var/lib/tasks.db"
+        with pytest.raises(ValueError):
+            sqlite_path("postgresql://localhost/tasks")
+
+    def test_journal_mode_is_wal(self, db):
+        """Test that connections use write-ahead journaling"""
+        assert db._connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_round_trip(self, db):
+        """Test that every field, including tag order, is stored and repeated tags are dropped"""
+        due = datetime(2030, 1, 1, 9, 30)
+        created = db.create_task({"title": "Full", "description": "d", "status": TaskStatus.COMPLETED,
+                                  "priority": TaskPriority.HIGH, "due_date": due, "tags": ["b", "a", "b"]})
+        fetched = db.get_task(created.id)
+        assert fetched == created
+        assert fetched.tags == ["b", "a"]
+        assert fetched.due_date == due
+        assert db.get_task(999) is None
+
+    def test_filters_and_pagination(self, db):
+        """Test filtering, newest-first offset pages and cursor pages"""
+        db.create_tasks([{"title": f"Task {i}", "tags": ["even" if i % 2 == 0 else "odd"],
+                          "priority": TaskPriority.HIGH if i % 3 == 0 else TaskPriority.LOW}
+                         for i in range(10)])
+
+        tasks, total = db.get_tasks(page=1, page_size=4)
+        assert total == 10
+        assert [task.id for task in tasks] == [10, 9, 8, 7]
+
+        tasks, total = db.get_tasks(tags=["even"], priority=TaskPriority.HIGH)
+        assert total == 2
+        assert [task.title for task in tasks] == ["Task 6", "Task 0"]
+
+        first, _ = db.get_tasks(page_size=3)
+        cursor = (first[-1].created_at, first[-1].id)
+        following, _ = db.get_tasks(page_size=3, cursor=cursor)
+        assert [task.id for task in following] == [7, 6, 5]
+
+    def test_update_and_delete(self, db):
+        """Test single and filtered updates and deletes"""
+        first = db.create_task({"title": "First", "tags": ["x"]})
+        db.create_tasks([{"title": f"Task {i}", "tags": ["y"]} for i in range(3)])
+
+        updated = db.update_task(first.id, {"title": "Renamed", "tags": ["z"], "description": None})
+        assert updated.title == "Renamed"
+        assert updated.tags == ["z"]
+        assert updated.updated_at > first.updated_at
+        assert db.update_task(999, {"title": "Missing"}) is None
+
+        assert db.update_tasks_where({"status": TaskStatus.ARCHIVED}, tags=["y"]) == 3
+        assert len(db.get_tasks_by_status(TaskStatus.ARCHIVED)) == 3
+
+        assert db.delete_task(first.id)
+        assert not db.delete_task(first.id)
+        assert db.delete_tasks_where(status=TaskStatus.ARCHIVED) == 3
+        assert db.get_tasks()[1] == 0
+        # Tag rows are removed with their tasks
+        assert db._connection().execute("SELECT COUNT(*) FROM task_tags").fetchone()[0] == 0
+
+    def test_statistics(self, db):
+        """Test that indexed counts match a full recount"""
+        db.create_tasks([{"title": "A", "tags": ["t"], "priority": TaskPriority.HIGH},
+                         {"title": "B", "status": TaskStatus.COMPLETED}])
+        stats = db.get_task_statistics()
+        assert stats["total"] == 2
+        assert stats["active"] == 1
+        assert stats["completed"] == 1
+        assert stats["by_priority"] == {"low": 0, "medium": 1, "high": 1}
+        assert stats["by_tag"] == {"t": 1}
+        assert db.check_task_statistics()["consistent"]
+
+    def test_background_tasks(self, db):
+        """Test that background task progress is stored and read back"""
+        db.create_background_task("job", "Starting")
+        db.update_background_task("job", "completed", 100, "Done", {"items": 3})
+        job = db.get_background_task("job")
+        assert job.status == "completed"
+        assert job.result == {"items": 3}
+        assert job.completed_at is not None
+        assert [task.task_id for task in db.get_background_tasks()[0]] == ["job"]
+        assert db.update_background_task("missing", "running", 0, "") is None
+
+    def test_instances_share_state(self, tmp_path):
+        """Test that separate instances, like separate workers, see each other's writes"""
+        path = str(tmp_path / "shared.db")
+        writer, reader = SQLiteDatabase(path), SQLiteDatabase(path)
+        task = writer.create_task({"title": "Shared"})
+        assert reader.get_task(task.id) == task
+        writer.close()
+        reader.close()
+
+    def test_memory_mapped_reads(self, tmp_path):
+        """Test that connections read through a memory map unless it is disabled"""
+        mapped = SQLiteDatabase(str(tmp_path / "mapped.db"), mmap_size_mb=64)
+        plain = SQLiteDatabase(str(tmp_path / "plain.db"), mmap_size_mb=0)
+        assert mapped._connection().execute("PRAGMA mmap_size").fetchone()[0] == 64 * 1024 * 1024
+        assert plain._connection().execute("PRAGMA mmap_size").fetchone()[0] == 0
+        mapped.close()
+        plain.close()
+
+    def test_worker_processes_share_state(self, tmp_path):
+        """Test that concurrent writer processes, like uvicorn workers, neither fail nor lose tasks"""
+        path = str(tmp_path / "shared.db")
+        SQLiteDatabase(path).close()
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=create_tasks_in_process, args=(path, 50)) for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert [worker.exitcode for worker in workers] == [0, 0, 0]
+
+        db = SQLiteDatabase(path)
+        assert db.get_tasks()[1] == 150
+        assert db.check_task_statistics()["consistent"]
+        db.close()
+
+    def test_concurrent_writers(self, db):
+        """Test that threads writing at once neither fail nor lose tasks"""
+        def writer():
+            for i in range(50):
+                db.create_task({"title": f"Task {i}"})
+
+        threads = [threading.Thread(target=writer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert db.get_tasks()[1] == 200
+
+    def test_clear_all_restarts_ids(self, db):
+        """Test that clear_all empties every table and ids start over"""
+        db.create_task({"title": "Gone"})
+        db.create_background_task("job", "Starting")
+        db.clear_all()
+        assert db.get_tasks()[1] == 0
+        assert db.get_background_tasks() == ([], 0)
+        assert db.create_task({"title": "New"}).id == 1
@@ -0,0 +1,56 @@
+from app.database.database import InMemoryDatabase
+from app.database.sharded import ShardedDatabase
+from app.database.sqlite import SQLiteDatabase
+from app.database.wal import WriteAheadLog
+
+from store_conformance import TaskStoreConformance
+
+
+class TestInMemoryStore(TaskStoreConformance):
+    """Conformance of the in-memory database"""
+
+    def make_store(self, tmp_path):
+        return InMemoryDatabase()
+
+    def reopen(self, store, tmp_path):
+        store.snapshot(str(tmp_path / "tasks.snapshot"))
+        return InMemoryDatabase(snapshot_path=str(tmp_path / "tasks.snapshot"))
+
+
+class TestInMemoryExclusiveStore(TaskStoreConformance):
+    """Conformance of the in-memory database with a single mutex"""
+
+    def make_store(self, tmp_path):
+        return InMemoryDatabase(lock_mode="exclusive")
+
+
+class TestInMemoryLoggedStore(TaskStoreConformance):
+    """Conformance of the in-memory database with a write-ahead log"""
+
+    def make_store(self, tmp_path):
+        return InMemoryDatabase(wal=WriteAheadLog(str(tmp_path / "tasks.wal")))
+
+
+class TestSQLiteStore(TaskStoreConformance):
+    """Conformance of the SQLite database"""
+
+    def make_store(self, tmp_path):
+        return SQLiteDatabase(str(tmp_path / "tasks.db"))
+
+
+class TestShardedStore(TaskStoreConformance):
+    """Conformance of the sharded database"""
+
+    def make_store(self, tmp_path):
+        return ShardedDatabase(shards=4)
+
+    def reopen(self, store, tmp_path):
+        store.snapshot(str(tmp_path / "tasks.snapshot"))
+        return ShardedDatabase(shards=4, snapshot_path=str(tmp_path / "tasks.snapshot"))
+
+
+class TestShardedLoggedStore(TaskStoreConformance):
+    """Conformance of the sharded database with a write-ahead log per shard"""
+
+    def make_store(self, tmp_path):
+        return ShardedDatabase(shards=3, wal_path=str(tmp_path / "tasks.wal"))
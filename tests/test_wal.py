@@ -0,0 +1,86 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from app.database.database import InMemoryDatabase
+from app.database.wal import WriteAheadLog, FSYNC_MODES
+from app.models.task_models import TaskStatus, TaskPriority
+
+
+def snapshot(db: InMemoryDatabase) -> dict:
+    """Everything a restart has to reproduce"""
+    tasks, total = db.get_tasks(page_size=1000)
+    return {
+        "tasks": [task.model_dump() for task in tasks],
+        "total": total,
+        "statistics": db.get_task_statistics(),
+        "next_task_id": db.next_task_id
+    }
+
+
+class TestWriteAheadLog:
+    """Test suite for write-ahead logging and replay"""
+
+    @pytest.mark.parametrize("fsync_mode", FSYNC_MODES)
+    def test_replay_restores_state(self, tmp_path, fsync_mode):
+        """Test that every mutation survives a restart"""
+        path = str(tmp_path / "tasks.wal")
+        db = InMemoryDatabase(wal=WriteAheadLog(path, fsync_mode=fsync_mode, fsync_interval=0.01))
+
+        first = db.create_task({"title": "First", "tags": ["a"], "due_date": datetime(2030, 1, 1)})
+        db.create_tasks([{"title": f"Bulk {i}", "priority": TaskPriority.HIGH} for i in range(5)])
+        db.update_task(first.id, {"status": TaskStatus.COMPLETED, "tags": ["b"], "description": None})
+        db.update_tasks_where({"status": TaskStatus.ARCHIVED}, priority=TaskPriority.HIGH, tags=None)
+        db.delete_task(2)
+        db.delete_tasks_where(status=TaskStatus.ARCHIVED, tags=None)
+        db.create_task({"title": "Last"})
+        expected = snapshot(db)
+        db.close()
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(path, fsync_mode=fsync_mode))
+        assert snapshot(restored) == expected
+        assert restored.check_task_statistics()["consistent"]
+
+        # Appends continue after the replayed records
+        restored.create_task({"title": "After restart"})
+        restored.close()
+        again = InMemoryDatabase(wal=WriteAheadLog(path))
+        assert again.get_tasks()[1] == expected["total"] + 1
+        again.close()
+
+    def test_clear_is_logged(self, tmp_path):
+        """Test that clear_all is replayed too"""
+        path = str(tmp_path / "tasks.wal")
+        db = InMemoryDatabase(wal=WriteAheadLog(path))
+        db.create_task({"title": "Gone"})
+        db.clear_all()
+        db.create_task({"title": "Kept"})
+        db.close()
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(path))
+        tasks, total = restored.get_tasks()
+        assert total == 1
+        assert tasks[0].id == 1 and tasks[0].title == "Kept"
+        restored.close()
+
+    def test_torn_tail_is_discarded(self, tmp_path):
+        """Test that a partially written final record is ignored and cut off"""
+        path = str(tmp_path / "tasks.wal")
+        db = InMemoryDatabase(wal=WriteAheadLog(path, fsync_mode="always"))
+        db.create_task({"title": "Complete"})
+        db.close()
+        size = os.path.getsize(path)
+
+        with open(path, "ab") as log:
+            log.write(b'{"op":"create","tasks":[{"id":2,"ti')
+
+        restored = InMemoryDatabase(wal=WriteAheadLog(path))
+        assert restored.get_tasks()[1] == 1
+        assert os.path.getsize(path) == size
+        restored.close()
+
+    def test_invalid_fsync_mode(self, tmp_path):
+        """Test that unknown fsync modes are rejected"""
+        with pytest.raises(ValueError):
+            WriteAheadLog(str(tmp_path / "tasks.wal"), fsync_mode="sometimes")